@@ -0,0 +1,209 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Runs one program against many memory files on all cores, e.g. to grade a program against its test inputs:
+#   python Batch.py program.txt memory1.json memory2.json ... [--workers N] [--max-steps N] [--max-seconds S]
+#                   [--max-cells N] [--compile] [--no-cache]
+# prints a JSON list with the result of every memory file (see Engine.RunResult) in the order of the files.
+# The program is parsed once in the main process. On Linux the workers are forked and inherit the decoded
+# program, elsewhere every worker loads it from the ParseCache. The memory files are loaded by the workers, so
+# the main process only collects the results. Every worker runs whole chunks of memory files, the runs share
+# nothing, so the throughput grows with the number of cores.
+# The limits apply to every single run (see Engine.Watchdog), so untrusted programs can't stall a worker.
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from functools import partial
+from json import dumps
+import multiprocessing
+import os
+import sys
+from Assembler import Assembler
+from Compiler import CompiledProgram
+from Engine import load_program, execute, execute_compiled, RunResult, ERROR
+from Instruction import Instruction
+from ParseCache import ParseCache, CACHE_DIRECTORY
+from Parser import create_memory
+
+# Program of the current process: set before the workers are forked, or by _initialize in every worker
+_instructions: list[Instruction] = []
+_compiled: CompiledProgram | None = None
+
+# Number of chunks per worker. More chunks balance the load better, fewer chunks need less communication.
+CHUNKS_PER_WORKER = 4
+
+
+def _initialize(
+    program_path: str,
+    expect_semicolon: bool,
+    case_sensitive: bool,
+    cache_directory: str | None,
+) -> None:
+    """Loads the program in a worker that was not forked from the main process"""
+    global _instructions
+    _instructions = load_program(
+        program_path, expect_semicolon, case_sensitive, _cache(cache_directory)
+    ).instructions
+
+
+def _cache(cache_directory: str | None) -> ParseCache | None:
+    return None if cache_directory is None else ParseCache(cache_directory)
+
+
+def run_memory(
+    memory_path: str,
+    max_steps: int | None = None,
+    compiled: bool = False,
+    max_seconds: float | None = None,
+    max_cells: int | None = None,
+) -> dict:
+    """Runs the program of this process with the memory file at memory_path
+
+    Args:
+        memory_path (str): memory file, "" for an empty memory
+        max_steps (int | None): instruction budget, None for no limit
+        compiled (bool): compile the program into basic blocks
+        max_seconds (float | None): wall time limit, None for no limit
+        max_cells (int | None): limit of written memory cells, None for no limit
+
+    Returns:
+        dict: "memory_file" and the fields of the RunResult. Memory files that can not be loaded have the reason
+            ERROR and the error as message.
+    """
+    global _compiled
+    try:
+        memory, _ = create_memory(memory_path)
+    except (SyntaxError, FileNotFoundError, ValueError) as error:
+        return {
+            "memory_file": memory_path,
+            **asdict(RunResult(ERROR, 0, message=str(error))),
+        }
+    assembler = Assembler(s=memory)
+    if compiled:
+        if _compiled is None:
+            _compiled = CompiledProgram(_instructions, Assembler)
+        result = execute_compiled(
+            assembler,
+            _compiled,
+            max_steps,
+            max_seconds=max_seconds,
+            max_cells=max_cells,
+        )
+    else:
+        result = execute(
+            assembler,
+            _instructions,
+            max_steps,
+            max_seconds=max_seconds,
+            max_cells=max_cells,
+        )
+    return {"memory_file": memory_path, **asdict(result)}
+
+
+def run_batch(
+    program_path: str,
+    memory_paths: list[str],
+    workers: int | None = None,
+    max_steps: int | None = None,
+    compiled: bool = False,
+    expect_semicolon: bool = True,
+    case_sensitive: bool = False,
+    max_seconds: float | None = None,
+    max_cells: int | None = None,
+    cache_directory: str | None = CACHE_DIRECTORY,
+) -> list[dict]:
+    """Runs a program with every memory file, in parallel
+
+    Args:
+        program_path (str): program file
+        memory_paths (list[str]): memory files, one run each
+        workers (int | None): number of worker processes, None for one per core
+        max_steps (int | None): instruction budget of every run, None for no limit
+        compiled (bool): compile the program into basic blocks
+        expect_semicolon (bool): check that every instruction ends with a semicolon
+        case_sensitive (bool): parse commands and registers case sensitive
+        max_seconds (float | None): wall time limit of every run, None for no limit
+        max_cells (int | None): limit of written memory cells of every run, None for no limit
+        cache_directory (str | None): directory of the ParseCache, None to always parse
+
+    Raises:
+        KeyError, ValueError: the program can not be parsed
+
+    Returns:
+        list[dict]: result of every memory file (see run_memory), in the order of memory_paths
+    """
+    global _instructions, _compiled
+    # parse errors are raised here, before any worker is started
+    _instructions = load_program(
+        program_path, expect_semicolon, case_sensitive, _cache(cache_directory)
+    ).instructions
+    _compiled = None
+    run = partial(
+        run_memory,
+        max_steps=max_steps,
+        compiled=compiled,
+        max_seconds=max_seconds,
+        max_cells=max_cells,
+    )
+    workers = min(workers or os.cpu_count() or 1, len(memory_paths))
+    if workers <= 1:
+        return [run(memory_path) for memory_path in memory_paths]
+
+    if sys.platform.startswith("linux"):
+        # forked workers inherit the decoded program
+        pool = ProcessPoolExecutor(workers, multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(
+            workers,
+            initializer=_initialize,
+            initargs=(
+                program_path, expect_semicolon, case_sensitive, cache_directory
+            ),
+        )
+    chunksize = max(1, len(memory_paths) // (workers * CHUNKS_PER_WORKER))
+    with pool:
+        return list(pool.map(run, memory_paths, chunksize=chunksize))
+
+
+if __name__ == "__main__":
+    arguments = ArgumentParser(
+        description="Runs a Reti program with many memory files in parallel"
+    )
+    arguments.add_argument("program", help="program file (.txt)")
+    arguments.add_argument("memory", nargs="+", help="memory files (.json or .mem)")
+    arguments.add_argument(
+        "--workers", type=int, default=None, help="default: one per core"
+    )
+    arguments.add_argument("--max-steps", type=int, default=None)
+    arguments.add_argument(
+        "--max-seconds", type=float, default=None, help="wall time limit of every run"
+    )
+    arguments.add_argument(
+        "--max-cells", type=int, default=None, help="limit of written memory cells"
+    )
+    arguments.add_argument("--no-semicolon", action="store_true")
+    arguments.add_argument("--case-sensitive", action="store_true")
+    arguments.add_argument(
+        "--no-cache", action="store_true", help="always parse, skip the parse cache"
+    )
+    arguments.add_argument(
+        "--compile", action="store_true", help="compile the program into basic blocks"
+    )
+    options = arguments.parse_args()
+
+    results = run_batch(
+        options.program,
+        options.memory,
+        options.workers,
+        options.max_steps,
+        options.compile,
+        not options.no_semicolon,
+        options.case_sensitive,
+        options.max_seconds,
+        options.max_cells,
+        None if options.no_cache else CACHE_DIRECTORY,
+    )
+    print(dumps(results))
@@ -0,0 +1,70 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from Batch import run_batch
+from Engine import load_program, run, ERROR, TERMINATED
+from Parser import create_memory
+
+DIRECTORY = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+PROGRAM = os.path.join(DIRECTORY, "Example.txt")
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_directory = os.path.join(directory.name, "cache")
+        self.memory_paths = []
+        for n in range(6):
+            path = os.path.join(directory.name, f"memory{n}.json")
+            with open(path, "w") as file:
+                json.dump({"10": n}, file)
+            self.memory_paths.append(path)
+        self.broken = os.path.join(directory.name, "broken.json")
+        with open(self.broken, "w") as file:
+            file.write("{")
+
+    def expected(self, memory_path: str) -> dict:
+        instructions = load_program(PROGRAM, False).instructions
+        memory, _ = create_memory(memory_path)
+        return {"memory_file": memory_path, **asdict(run(instructions, memory))}
+
+    def test_batch(self):
+        """Every memory file gets the same result as a single run, in the order of the files"""
+        paths = self.memory_paths + [self.broken]
+        for workers in (1, 3):
+            for compiled in (False, True):
+                results = run_batch(
+                    PROGRAM,
+                    paths,
+                    workers,
+                    compiled=compiled,
+                    expect_semicolon=False,
+                    cache_directory=self.cache_directory,
+                )
+                self.assertEqual(
+                    results[:-1], [self.expected(path) for path in self.memory_paths]
+                )
+                self.assertEqual(results[-1]["memory_file"], self.broken)
+                self.assertEqual(results[-1]["reason"], ERROR)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
+        self.assertEqual(results[5]["reason"], TERMINATED)
+        self.assertEqual(results[5]["memory"][20], 120)
+        json.dumps(results)
+
+    def test_parse_error(self):
+        """A program that can not be parsed fails before any run"""
+        with self.assertRaises(ValueError):
+            # Example.txt misses semicolons
+            run_batch(PROGRAM, self.memory_paths, 2, cache_directory=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,660 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# The Compiler splits a program into basic blocks (at the targets of JUMP instructions) and generates one Python
+# function per block. Within a block the registers are held in local variables, so straight-line code runs as
+# native Python bytecode instead of one handler call per instruction.
+# Just like the Decoder, the Compiler does not know the semantics of any command. It reads the source of the
+# Assembler methods and specializes them for the operands of the instruction (see resolve_operands):
+#   getattr(self, destination)           ->  self.acc
+#   setattr(self, destination, value)    ->  self.acc = value
+#   destination != "pc"                  ->  True
+#   validate_register(i, ..., f"...")    ->  if <check of validate_register>: validate_register(i, ..., f"...")
+#   2 ** (MAX_REGISTER_SIZE - 1)         ->  2147483648
+# Then it inlines the specialized methods of all instructions that are straight-line code:
+#   - a single return at the end, which always increments the Program Counter
+#   - no write to the Program Counter
+#   - no method calls on the Assembler
+# Every other instruction (e.g. all jumps) ends the block and is computed by its decoded handler.
+# That way a compiled program always ends in exactly the same state as the interpreted program.
+
+import ast
+import inspect
+import sys
+from copy import deepcopy
+from dataclasses import dataclass, field
+from textwrap import dedent
+from typing import Callable
+from Assembler import Assembler
+from Instruction import Instruction
+from Decoder import decode
+
+# A block contains at most this many instructions. Keeps the generated functions small.
+MAX_BLOCK_LENGTH = 256
+# Cache of the parsed methods: (assembler class, method name) -> FunctionDef or None
+_method_cache: dict[tuple[type, str], ast.FunctionDef | None] = {}
+# Cache of the guards of validation helpers: helper function -> (parameter names, condition) or None
+_guard_cache: dict[Callable, tuple[list[str], ast.expr] | None] = {}
+
+
+def _is_name(node: ast.AST, name: str) -> bool:
+    return isinstance(node, ast.Name) and node.id == name
+
+
+def _is_string(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+
+def _is_pure(node: ast.AST) -> bool:
+    """True if evaluating the expression twice has no side effects (no calls, no f-strings)"""
+    return all(
+        isinstance(
+            child,
+            (
+                ast.Name,
+                ast.Constant,
+                ast.Attribute,
+                ast.BinOp,
+                ast.UnaryOp,
+                ast.operator,
+                ast.unaryop,
+                ast.expr_context,
+            ),
+        )
+        for child in ast.walk(node)
+    )
+
+
+def _guard(helper: Callable) -> tuple[list[str], ast.expr] | None:
+    """Extracts the condition of a validation helper that consists of a single 'if <condition>: raise ...'
+
+    Args:
+        helper (Callable): function like validate_register()
+
+    Returns:
+        tuple[list[str], ast.expr] | None: parameter names and condition of the helper, None if it has another shape
+    """
+    if helper in _guard_cache:
+        return _guard_cache[helper]
+
+    guard = None
+    try:
+        tree = ast.parse(dedent(inspect.getsource(helper)))
+        definition = tree.body[0]
+        body = definition.body
+        if body and isinstance(body[0], ast.Expr) and _is_string(body[0].value):
+            body = body[1:]  # docstring
+        if (
+            isinstance(definition, ast.FunctionDef)
+            and len(body) == 1
+            and isinstance(body[0], ast.If)
+            and not body[0].orelse
+            and len(body[0].body) == 1
+            and isinstance(body[0].body[0], ast.Raise)
+            and not definition.args.defaults
+            and definition.args.vararg is None
+        ):
+            guard = ([argument.arg for argument in definition.args.args], body[0].test)
+    except (OSError, TypeError, SyntaxError, IndexError):
+        guard = None
+
+    _guard_cache[helper] = guard
+    return guard
+
+
+class _Substitute(ast.NodeTransformer):
+    """Replaces names by expressions"""
+
+    def __init__(self, replacements: dict[str, ast.expr]) -> None:
+        self.replacements = replacements
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.replacements:
+            return deepcopy(self.replacements[node.id])
+        return node
+
+
+class _OperandResolver(ast.NodeTransformer):
+    """Replaces the operands of an Assembler method with constants and resolves getattr/setattr on registers"""
+
+    def __init__(
+        self, self_name: str, constants: dict[str, object], namespace: dict
+    ) -> None:
+        self.self_name = self_name
+        self.constants = constants
+        self.namespace = namespace
+        self.valid = True
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in self.constants:
+            if not isinstance(node.ctx, ast.Load):
+                # The method reassigns one of its operands. I can't substitute a constant here.
+                self.valid = False
+                return node
+            return ast.copy_location(ast.Constant(self.constants[node.id]), node)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        # getattr(self, "acc") -> self.acc
+        if (
+            _is_name(node.func, "getattr")
+            and len(node.args) == 2
+            and not node.keywords
+            and _is_name(node.args[0], self.self_name)
+            and _is_string(node.args[1])
+        ):
+            attribute = ast.Attribute(
+                value=ast.Name(self.self_name, ast.Load()),
+                attr=node.args[1].value,
+                ctx=ast.Load(),
+            )
+            return ast.copy_location(attribute, node)
+        return node
+
+    def visit_Expr(self, node: ast.Expr) -> ast.AST:
+        self.generic_visit(node)
+        call = node.value
+        # setattr(self, "acc", value) -> self.acc = value
+        if (
+            isinstance(call, ast.Call)
+            and _is_name(call.func, "setattr")
+            and len(call.args) == 3
+            and not call.keywords
+            and _is_name(call.args[0], self.self_name)
+            and _is_string(call.args[1])
+        ):
+            target = ast.Attribute(
+                value=ast.Name(self.self_name, ast.Load()),
+                attr=call.args[1].value,
+                ctx=ast.Store(),
+            )
+            assign = ast.Assign(targets=[target], value=call.args[2])
+            return ast.copy_location(assign, node)
+        # validate_register(i, ...) -> if <condition>: validate_register(i, ...)
+        # The (expensive) error message is only formatted if the validation fails
+        if (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Name)
+            and inspect.isfunction(self.namespace.get(call.func.id))
+            and self.namespace[call.func.id].__globals__ is self.namespace
+            and not call.keywords
+        ):
+            guard = _guard(self.namespace[call.func.id])
+            if guard is None:
+                return node
+            parameters, condition = guard
+            if len(parameters) != len(call.args):
+                return node
+            used = {n.id for n in ast.walk(condition) if isinstance(n, ast.Name)}
+            replacements = {
+                parameter: argument
+                for parameter, argument in zip(parameters, call.args)
+                if parameter in used
+            }
+            if not all(_is_pure(argument) for argument in replacements.values()):
+                return node
+            condition = _Substitute(replacements).visit(deepcopy(condition))
+            guarded = ast.If(test=condition, body=[node], orelse=[])
+            return ast.copy_location(guarded, node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        # "acc" != "pc" -> True
+        if (
+            len(node.ops) == 1
+            and isinstance(node.ops[0], (ast.Eq, ast.NotEq))
+            and isinstance(node.left, ast.Constant)
+            and isinstance(node.comparators[0], ast.Constant)
+        ):
+            equal = node.left.value == node.comparators[0].value
+            result = equal if isinstance(node.ops[0], ast.Eq) else not equal
+            return ast.copy_location(ast.Constant(result), node)
+        return node
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Evaluates expressions that only consist of constants and UPPER_CASE constants of the Assembler module
+    (e.g. 2 ** (MAX_REGISTER_SIZE - 1)) and removes branches whose condition is constant
+    """
+
+    def __init__(self, namespace: dict, local_names: set[str]) -> None:
+        self.namespace = namespace
+        self.local_names = local_names
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        value = self.namespace.get(node.id)
+        if (
+            isinstance(node.ctx, ast.Load)
+            and node.id.isupper()
+            and node.id not in self.local_names
+            and isinstance(value, (int, float, str))
+        ):
+            return ast.copy_location(ast.Constant(value), node)
+        return node
+
+    def fold(self, node: ast.expr) -> ast.expr:
+        self.generic_visit(node)
+        if not all(
+            isinstance(child, ast.Constant)
+            for child in ast.iter_child_nodes(node)
+            if isinstance(child, ast.expr)
+        ):
+            return node
+        try:
+            expression = ast.fix_missing_locations(ast.Expression(body=node))
+            value = eval(
+                compile(expression, "<constant>", "eval"), {"__builtins__": {}}
+            )
+        except Exception:
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    visit_BinOp = visit_UnaryOp = visit_Compare = visit_BoolOp = fold
+
+    def visit_If(self, node: ast.If) -> ast.AST | list[ast.stmt]:
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant):
+            statements = node.body if node.test.value else node.orelse
+            return statements or ast.copy_location(ast.Pass(), node)
+        return node
+
+
+def _method_definition(
+    assembler_class: type, method_name: str
+) -> ast.FunctionDef | None:
+    """Parses the source of an Assembler method
+
+    Args:
+        assembler_class (type): class that implements the command
+        method_name (str): name of the method
+
+    Returns:
+        ast.FunctionDef | None: definition of the method, None if it can't be specialized
+    """
+    key = (assembler_class, method_name)
+    if key in _method_cache:
+        return _method_cache[key]
+
+    definition = None
+    try:
+        source_lines, first_line = inspect.getsourcelines(
+            getattr(assembler_class, method_name)
+        )
+        tree = ast.parse(dedent("".join(source_lines)))
+        ast.increment_lineno(tree, first_line - 1)
+        node = tree.body[0]
+        if (
+            isinstance(node, ast.FunctionDef)
+            and not node.decorator_list
+            and node.args.args
+            and not node.args.posonlyargs
+            and not node.args.kwonlyargs
+            and not node.args.defaults
+            and node.args.vararg is None
+            and node.args.kwarg is None
+        ):
+            definition = node
+    except (AttributeError, OSError, TypeError, SyntaxError, IndexError):
+        definition = None
+
+    _method_cache[key] = definition
+    return definition
+
+
+def resolve_operands(
+    assembler_class: type,
+    method_name: str,
+    arguments: tuple,
+) -> ast.FunctionDef | None:
+    """Creates a copy of an Assembler method in which the operands are replaced by the given arguments
+
+    Args:
+        assembler_class (type): class that implements the command
+        method_name (str): name of the method
+        arguments (tuple): arguments of the instruction as produced by the Parser
+
+    Returns:
+        ast.FunctionDef | None: specialized definition that only takes self as parameter.
+        None if the method can't be specialized.
+    """
+    definition = _method_definition(assembler_class, method_name)
+    if definition is None:
+        return None
+
+    self_name, *parameters = [argument.arg for argument in definition.args.args]
+    if len(parameters) != len(arguments):
+        return None
+
+    constants = dict(zip(parameters, arguments))
+    specialized = deepcopy(definition)
+    body = specialized.body
+    if len(body) > 1 and isinstance(body[0], ast.Expr) and _is_string(body[0].value):
+        specialized.body = body[1:]  # docstring
+    specialized.name = f"{method_name}_{'_'.join(map(str, arguments))}".replace(
+        "-", "m"
+    )
+    specialized.args.args = [ast.arg(self_name)]
+    namespace = vars(sys.modules[assembler_class.__module__])
+    resolver = _OperandResolver(self_name, constants, namespace)
+    specialized = resolver.visit(specialized)
+    if not resolver.valid:
+        return None
+    local_names = {
+        node.id
+        for node in ast.walk(specialized)
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load)
+    }
+    specialized = _ConstantFolder(namespace, local_names).visit(specialized)
+    return ast.fix_missing_locations(specialized)
+
+
+class CompiledError(Exception):
+    """Raised by a compiled block if one of its instructions raised an exception"""
+
+    def __init__(self, index: int, error: Exception) -> None:
+        super().__init__(str(error))
+        self.index = index  # index of the instruction that raised
+        self.error = error
+
+
+@dataclass
+class Block:
+    entry: int  # index of the first instruction
+    length: int  # number of instructions, all of them are computed when the block runs
+    terminates: bool  # True if the last instruction is the TERMINATE instruction
+    function: Callable  # function(assembler) computes the block
+    source: str = ""  # generated code
+
+
+class _Inliner(ast.NodeTransformer):
+    """Turns a specialized Assembler method into statements that work on register locals"""
+
+    def __init__(
+        self, self_name: str, registers: set[str], local_names: set[str], prefix: str
+    ) -> None:
+        self.self_name = self_name
+        self.registers = registers
+        self.local_names = local_names
+        self.prefix = prefix
+        self.used_registers: set[str] = set()
+        self.stored_registers: set[str] = set()
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if (
+            isinstance(node.value, ast.Name)
+            and node.value.id == self.self_name
+            and node.attr in self.registers
+        ):
+            self.used_registers.add(node.attr)
+            if not isinstance(node.ctx, ast.Load):
+                self.stored_registers.add(node.attr)
+            return ast.copy_location(ast.Name(node.attr, node.ctx), node)
+        self.generic_visit(node)
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == self.self_name:
+            return ast.copy_location(ast.Name("self", node.ctx), node)
+        if node.id in self.local_names:
+            return ast.copy_location(ast.Name(self.prefix + node.id, node.ctx), node)
+        return node
+
+
+def _is_straight_line(
+    definition: ast.FunctionDef, assembler_class: type, registers: set[str]
+) -> bool:
+    """Checks if a specialized Assembler method can be inlined into a block
+
+    Args:
+        definition (ast.FunctionDef): method specialized by resolve_operands()
+        assembler_class (type): class that implements the command
+        registers (set[str]): names of the register member variables
+
+    Returns:
+        bool: True if the method can be inlined
+    """
+    self_name = definition.args.args[0].arg
+    body = definition.body
+    returns = [node for node in ast.walk(definition) if isinstance(node, ast.Return)]
+    if returns and (len(returns) > 1 or body[-1] is not returns[0]):
+        return False
+
+    parents: dict[ast.AST, ast.AST] = dict()
+    for statement in body:
+        for node in ast.walk(statement):
+            for child in ast.iter_child_nodes(node):
+                parents[child] = node
+            if isinstance(
+                node,
+                (
+                    ast.Yield,
+                    ast.YieldFrom,
+                    ast.Await,
+                    ast.Global,
+                    ast.Nonlocal,
+                    ast.Lambda,
+                    ast.FunctionDef,
+                    ast.AsyncFunctionDef,
+                    ast.ClassDef,
+                    ast.Try,
+                    ast.With,
+                ),
+            ):
+                return False
+            # names of the generated code must not shadow names used by the method
+            if isinstance(node, ast.Name) and (
+                node.id in registers or node.id.startswith("_")
+            ):
+                if node.id != self_name:
+                    return False
+
+    for node, parent in parents.items():
+        if not (isinstance(node, ast.Name) and node.id == self_name):
+            continue
+        # self may only be used to access member variables, never on its own (e.g. helper(self))
+        if not isinstance(parent, ast.Attribute):
+            return False
+        if parent.attr in registers:
+            continue
+        if callable(getattr(assembler_class, parent.attr, None)):
+            return False  # method call, e.g. self.jump(i)
+    return True
+
+
+def _leaders(instructions: list[Instruction]) -> set[int]:
+    """Indices of instructions that start a basic block: the first instruction, jump targets and
+    instructions following a jump"""
+    leaders = {0}
+    for index, instruction in enumerate(instructions):
+        if instruction.command.startswith("jump"):
+            leaders.add(index + 1)
+            offsets = [a for a in instruction.arguments if isinstance(a, int)]
+            if offsets:
+                leaders.add(index + offsets[0])
+    return leaders
+
+
+def _unparse(statements: list[ast.stmt]) -> list[str]:
+    return [
+        line
+        for statement in statements
+        if not isinstance(statement, ast.Pass)
+        for line in ast.unparse(statement).splitlines()
+    ]
+
+
+@dataclass
+class CompiledProgram:
+    instructions: list[Instruction]
+    assembler_class: type = Assembler
+    blocks: dict[int, Block] = field(default_factory=dict)
+
+    def __post_init__(self):
+        decode(self.instructions, self.assembler_class)
+        module = sys.modules[self.assembler_class.__module__]
+        self.namespace = vars(module)
+        self.registers = set(module.REGISTERS.values())
+        self.program_counter = module.PROGRAM_COUNTER[1]
+        self.terminates = [
+            instruction.line_raw in module.TERMINATE
+            for instruction in self.instructions
+        ]
+        self.leaders = _leaders(self.instructions)
+
+    def block(self, entry: int) -> Block:
+        """Returns the block that starts at the instruction with index entry. Compiles it on first use.
+
+        Args:
+            entry (int): index of the first instruction of the block
+
+        Returns:
+            Block: compiled block
+        """
+        block = self.blocks.get(entry)
+        if block is None:
+            block = self.compile_block(entry)
+            self.blocks[entry] = block
+        return block
+
+    def compile_block(self, entry: int) -> Block:
+        """Generates and compiles the function for the block that starts at entry
+
+        Args:
+            entry (int): index of the first instruction of the block
+
+        Returns:
+            Block: compiled block
+        """
+        pc = self.program_counter
+        lines: list[str] = []  # straight-line part
+        used: set[str] = set()
+        stored: set[str] = set()
+        exit_lines: list[str] = []
+        terminator = None  # index of an instruction computed by its handler
+        index = entry
+        length = 0
+
+        while True:
+            if index >= len(self.instructions) or length == MAX_BLOCK_LENGTH:
+                exit_lines = [f"self.{pc} = {index}"]
+                break
+            if index != entry and index in self.leaders:
+                exit_lines = [f"self.{pc} = {index}"]
+                break
+
+            instruction = self.instructions[index]
+            inlined = None
+            if not self.terminates[index]:
+                inlined = self.inline(instruction, index)
+            if inlined is None:
+                terminator = index
+                length += 1
+                break
+
+            statements, result, used_registers, stored_registers = inlined
+            used |= used_registers
+            stored |= stored_registers
+            lines.append(f"_k = {pc} = {index}")
+            lines.extend(_unparse(statements))
+            length += 1
+
+            if pc in stored_registers or not (
+                isinstance(result, ast.Constant) and result.value
+            ):
+                # The instruction writes the Program Counter or doesn't increment it: the block ends here
+                if isinstance(result, ast.Constant):
+                    increment = " + 1" if result.value else ""
+                    exit_lines = [f"self.{pc} = {pc}{increment}"]
+                else:
+                    lines.append(f"_r = {ast.unparse(result)}")
+                    exit_lines = [f"self.{pc} = {pc} + 1 if _r else {pc}"]
+                stored.add(pc)
+                break
+            index += 1
+
+        stored_without_pc = sorted(stored - {pc})
+        write_back = [f"self.{register} = {register}" for register in stored_without_pc]
+        source = [
+            "def _factory(_handler):",
+            f"    def _block_{entry}(self):",
+        ]
+        # the Program Counter is a constant within the block and does not need to be loaded
+        loaded = sorted(used - {pc})
+        source += [f"        {register} = self.{register}" for register in loaded]
+        if lines:
+            source += ["        try:"]
+            source += ["            " + line for line in lines]
+            source += ["        except Exception as _e:"]
+            source += ["            " + line for line in write_back]
+            source += [f"            self.{pc} = {pc}"]
+            source += ["            raise _CompiledError(_k, _e) from _e"]
+        source += ["        " + line for line in write_back]
+        if terminator is not None:
+            source += [
+                f"        self.{pc} = {terminator}",
+                "        try:",
+                "            if _handler(self):",
+                f"                self.{pc} += 1",
+                "        except Exception as _e:",
+                f"            raise _CompiledError({terminator}, _e) from _e",
+            ]
+        else:
+            source += ["        " + line for line in exit_lines]
+        source += [f"    return _block_{entry}"]
+        source = "\n".join(source)
+
+        namespace = dict()
+        code = compile(source, f"<block {entry}>", "exec")
+        exec(code, {**self.namespace, "_CompiledError": CompiledError}, namespace)
+        handler = (
+            self.instructions[terminator].handler if terminator is not None else None
+        )
+        return Block(
+            entry,
+            length,
+            terminator is not None and self.terminates[terminator],
+            namespace["_factory"](handler),
+            source,
+        )
+
+    def inline(
+        self, instruction: Instruction, index: int
+    ) -> tuple[list[ast.stmt], ast.expr, set[str], set[str]] | None:
+        """Creates the statements for a straight-line instruction
+
+        Args:
+            instruction (Instruction): instruction to inline
+            index (int): index of the instruction (used to make local names unique)
+
+        Returns:
+            tuple[list[ast.stmt], ast.expr, set[str], set[str]] | None: statements, return value, used registers
+            and stored registers. None if the instruction can't be inlined.
+        """
+        definition = resolve_operands(
+            self.assembler_class,
+            instruction.command,
+            instruction.arguments,
+        )
+        if definition is None or not _is_straight_line(
+            definition, self.assembler_class, self.registers
+        ):
+            return None
+
+        self_name = definition.args.args[0].arg
+        local_names = {
+            node.id
+            for node in ast.walk(definition)
+            if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load)
+        }
+        inliner = _Inliner(self_name, self.registers, local_names, f"_{index}_")
+        body = [inliner.visit(statement) for statement in definition.body]
+
+        result: ast.expr = ast.Constant(None)
+        if body and isinstance(body[-1], ast.Return):
+            result = body.pop().value or ast.Constant(None)
+        body = [ast.fix_missing_locations(statement) for statement in body]
+        return (body, result, inliner.used_registers, inliner.stored_registers)
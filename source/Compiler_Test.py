@@ -0,0 +1,117 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import random
+from itertools import product
+from Compiler import resolve_operands
+from Decoder_Test import load_assembler
+from Engine import execute, load_program
+from Instruction import Instruction
+from Parser import create_memory
+
+
+def random_program(module, length: int) -> list[Instruction]:
+    """Creates a random program that uses every command of the Assembler module"""
+    registers = list(module.REGISTERS.items())
+    commands = list(module.COMMANDS.items())
+    instructions = list()
+    multiplications = 0
+    for index in range(length):
+        command, (method, argument_types) = random.choice(commands)
+        if command.startswith("MUL"):
+            # Repeated multiplications within loops let the registers grow without bound
+            multiplications += 1
+            if multiplications > 1:
+                command, (method, argument_types) = ("NOP", module.COMMANDS["NOP"])
+        raw = [command]
+        arguments = list()
+        for kind in argument_types:
+            if kind == "register":
+                name, attribute = random.choice(registers)
+                raw.append(name)
+                arguments.append(attribute)
+            elif command.startswith("JUMP"):
+                offset = random.randint(-index, length - index)
+                raw.append(str(offset))
+                arguments.append(offset)
+            else:
+                value = random.randint(-3, 12)
+                raw.append(str(value))
+                arguments.append(value)
+        instructions.append(
+            Instruction(index + 1, " ".join(raw), method, tuple(arguments))
+        )
+    instructions.append(Instruction(length + 1, "JUMP 0", "jump", (0,)))
+    return instructions
+
+
+class TestCompiler(unittest.TestCase):
+    def assert_same_result(self, module, instructions, memory, max_steps):
+        """Compiled and interpreted program must stop for the same reason in the same state"""
+        interpreted = module.Assembler(s=dict(memory))
+        compiled = module.Assembler(s=dict(memory))
+        expected = execute(interpreted, instructions, max_steps)
+        actual = execute(compiled, instructions, max_steps, compiled=True)
+        self.assertEqual(expected, actual)
+        self.assertEqual(interpreted, compiled)
+
+    def assert_random_programs(self, module):
+        random.seed(1)
+        for _ in range(150):
+            instructions = random_program(module, random.randint(1, 25))
+            memory = {k: random.randint(-20, 20) for k in range(0, 16, 2)}
+            self.assert_same_result(module, instructions, memory, 200)
+
+    def test_random_programs_ti(self):
+        """Test random programs with Assembler_TI"""
+        self.assert_random_programs(load_assembler("Assembler_TI"))
+
+    def test_random_programs_bs(self):
+        """Test random programs with Assembler_BS"""
+        self.assert_random_programs(load_assembler("Assembler_BS"))
+
+    def test_every_command_is_specialized(self):
+        """resolve_operands handles every method of both Assemblers. If the source of a method gets a shape it doesn't
+        understand, the Compiler would quietly leave the instruction to its handler, so this test fails instead.
+        """
+        for directory in ("Assembler_TI", "Assembler_BS"):
+            module = load_assembler(directory)
+            for command, (method, argument_types) in module.COMMANDS.items():
+                choices = [
+                    ("acc", "pc") if kind == "register" else (-1, 7)
+                    for kind in argument_types
+                ]
+                for arguments in product(*choices):
+                    self.assertIsNotNone(
+                        resolve_operands(module.Assembler, method, arguments),
+                        f"{directory}: {command} {arguments}",
+                    )
+
+    def test_example(self):
+        """Test the faculty example of Assembler_BS"""
+        directory = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+        parser = load_program(os.path.join(directory, "Example.txt"), False)
+        memory, _ = create_memory(os.path.join(directory, "Example_Storage.json"))
+        for max_steps in (None, 7, 11):
+            interpreted = execute(
+                load_assembler("Assembler_BS").Assembler(s=dict(memory)),
+                parser.instructions,
+                max_steps,
+            )
+            compiled = execute(
+                load_assembler("Assembler_BS").Assembler(s=dict(memory)),
+                parser.instructions,
+                max_steps,
+                compiled=True,
+            )
+            self.assertEqual(interpreted, compiled)
+            if max_steps is None:
+                self.assertEqual(compiled.memory[20], 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,19 +3,55 @@
 # License: MIT (view License.txt)
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from threading import Event
+from time import perf_counter
+from typing import Callable, Iterable
 from Assembler import (
     Assembler,
     REGISTERS,
     TERMINATE,
 )
 from Instruction import Instruction
+from Decoder import decode
+from LoopDetector import LoopDetector, Loop, CHECK_INTERVAL
+from Engine import (
+    Watchdog,
+    TERMINATED,
+    END_OF_FILE,
+    BUDGET_EXHAUSTED,
+    ERROR,
+    LOOP,
+)
+from History import (
+    Journal,
+    Checkpoints,
+    MAX_HISTORY_STEPS,
+    MAX_HISTORY_BYTES,
+    CHECKPOINT_INTERVAL,
+)
+from Memory import PagedMemory
+from Watchpoints import Watchpoints
 import tkinter as tk
 from tkinter.messagebox import showerror
-from copy import deepcopy
 from TkinterHelper import Text
 
 RESET = "\nI will reset this field to a valid value."
+# Default time in milliseconds that auto step turbo computes instructions before the GUI is rendered
+FRAME_BUDGET = 12
+# Instructions resume() computes between two looks at its interrupt, independent of the checkpoint interval
+INTERRUPT_INTERVAL = 1024
+# stop reason of resume(): the Program Counter reached an instruction with a breakpoint
+BREAKPOINT = "breakpoint"
+# stop reason of next() and resume(): the instruction accessed a watched memory cell
+WATCHPOINT = "watchpoint"
+
+
+class MessageBuffer(list):
+    """Collects status messages in place of a text field, so they can be written into it later"""
+
+    def insert(self, index, message: str) -> None:
+        self.append(message)
 
 
 @dataclass
@@ -27,8 +63,73 @@ class Debugger:
     previous_line: int | None = None
     do_auto_step_fast: bool = False
     do_auto_step_slow: bool = False
+    do_auto_step_turbo: bool = False
+    # milliseconds per frame that auto step turbo spends computing instructions
+    frame_budget: float = FRAME_BUDGET
     finished: bool = False
-    assembler_backup_stack = []
+    # limits of the undo history, the oldest steps are forgotten if one of them is exceeded
+    max_history_steps: int = MAX_HISTORY_STEPS
+    max_history_bytes: int = MAX_HISTORY_BYTES
+    # a full snapshot is taken every checkpoint_interval steps, seek() computes at most this many steps to recent
+    # steps and more to old steps of long runs (see History.Checkpoints)
+    checkpoint_interval: int = CHECKPOINT_INTERVAL
+    step: int = 0  # number of computed steps, position on the timeline
+    executed: int = 0  # end of the timeline, the highest step that was reached
+    # the step at the end of the timeline was a TERMINATE instruction
+    terminated: bool = False
+    # print all registers and memory cells after every step instead of only the changed ones
+    full_state: bool = False
+    # stop auto stepping when the machine reaches a state it was in before (see LoopDetector)
+    detect_loops: bool = True
+    # the loop the last step ran into, None if it did not run into one
+    loop: Loop | None = field(default=None, init=False, repr=False)
+    # limits of an auto step session (slow, fast or turbo), None for no limit. An exceeded limit pauses the
+    # session with a status message instead of an error message box.
+    max_steps: int | None = None
+    max_seconds: float | None = None
+    max_cells: int | None = None
+    # why the Debugger stopped computing steps on its own (one of the reasons of Engine, BREAKPOINT or WATCHPOINT),
+    # None if it did not
+    stop_reason: str | None = field(default=None, init=False)
+    # shows error messages (title, message) to the user. Replaced while a worker thread computes the steps (see Executor)
+    show_error: Callable[[str, str], object] = field(default=showerror, repr=False)
+    # registers (member variables) and addresses changed since the last take_changes(). None if anything may have changed
+    changed_registers: set[str] | None = field(default=None, init=False, repr=False)
+    changed_addresses: set[int] | None = field(default=None, init=False, repr=False)
+    history: Journal = field(init=False, repr=False)
+    checkpoints: Checkpoints = field(init=False, repr=False)
+    loops: LoopDetector | None = field(default=None, init=False, repr=False)
+    # time and memory limits of the running auto step session, and the step it started at
+    session: Watchdog | None = field(default=None, init=False, repr=False)
+    session_step: int = field(default=0, init=False, repr=False)
+    # one byte per instruction (indexed like self.instructions), 1 if resume() stops before it
+    breakpoints: bytearray = field(init=False, repr=False)
+    # line number -> index of the instruction on that line
+    line_index: dict[int, int] = field(init=False, repr=False)
+    # watched memory cells, an access pauses auto stepping after the instruction (see Watchpoints.py)
+    watchpoints: Watchpoints = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Instructions that did not pass the decode stage of the Parser are decoded here
+        decode(self.instructions, type(self.assembler))
+        # The undo history records memory writes through the journal of PagedMemory
+        if not isinstance(self.assembler.s, PagedMemory):
+            self.assembler.s = PagedMemory(self.assembler.s)
+        self.history = Journal(
+            list(REGISTERS.values()), self.max_history_steps, self.max_history_bytes
+        )
+        self.checkpoints = Checkpoints(
+            list(REGISTERS.values()), self.checkpoint_interval
+        )
+        self.checkpoints.take(0, self.assembler, pinned=True)
+        if self.detect_loops:
+            self.loops = LoopDetector(self.instructions, type(self.assembler))
+        self.breakpoints = bytearray(len(self.instructions))
+        self.watchpoints = Watchpoints()
+        self.line_index = {
+            instruction.line_number: index
+            for index, instruction in enumerate(self.instructions)
+        }
 
     def compute(self, instruction: Instruction, text: Text) -> Text:
         """applies the given instruction to the Assembler
@@ -40,27 +141,35 @@ class Debugger:
         Returns:
             Text: modified text field
         """
-        command = getattr(self.assembler, instruction.command)
-        increment_pc = command(*instruction.arguments)
+        memory = self.assembler.s
+        if self.watchpoints:
+            # only the accesses of the instruction are watched, not those of the messages and the GUI
+            memory.watch = self.watchpoints
+        try:
+            increment_pc = instruction.handler(self.assembler)
+        finally:
+            memory.watch = None
         if increment_pc:
             self.assembler.pc += 1
         text = self.assembler_message(text)
-        memory = ", ".join(
-            f"{key}: {value}" for key, value in sorted(self.assembler.s.items())
-        )
-        if memory == "":
-            memory = "{}"
-        text.append(
-            f"\nCurrent State of the Machine is:"
-            f"\nregister_states = {', '.join(f"{reg}={getattr(self.assembler, attr)}" for reg, attr in REGISTERS.items())}"
-            f"\nMemory= {memory}\n",
-        )
+        if self.assembler.s.journal is None:
+            self.mark_all_changed()
+            text.append(f"\n{self.state_message()}")
+        else:
+            registers, addresses = self.history.changes(self.assembler)
+            self.mark_changed(registers, addresses)
+            if self.full_state:
+                text.append(f"\n{self.state_message()}")
+            else:
+                text.append(f"\n{self.changes_message(registers, addresses)}")
 
         if instruction.line_raw in TERMINATE:
             text.append(
                 f"\nTerminate Instruction '{instruction.line_raw}' encountered on line {instruction.line_number}. I will now terminate the Script.\n",
             )
             self.finished = True
+            self.terminated = True
+            self.stop_reason = TERMINATED
 
         if self.assembler.pc >= len(self.instructions):
             message = (
@@ -69,11 +178,64 @@ class Debugger:
                 f"To allow me to properly shutdown add '{TERMINATE}' as the last instruction that will be called.\n"
             )
             text.append(message)
-            showerror("Assembler Error", message)
+            self.show_error("Assembler Error", message)
             self.finished = True
+            self.stop_reason = END_OF_FILE
 
         return text
 
+    def state_message(self) -> str:
+        """Message with the values of all registers and all memory cells"""
+        memory = ", ".join(
+            f"{key}: {value}" for key, value in sorted(self.assembler.s.items())
+        )
+        if memory == "":
+            memory = "{}"
+        return (
+            f"Current State of the Machine is:"
+            f"\nregister_states = {', '.join(f"{reg}={getattr(self.assembler, attr)}" for reg, attr in REGISTERS.items())}"
+            f"\nMemory= {memory}\n"
+        )
+
+    def changes_message(
+        self, registers: Iterable[str], addresses: Iterable[int]
+    ) -> str:
+        """Message with the current values of the given registers and memory cells only.
+        Its length does not depend on the size of the memory.
+
+        Args:
+            registers (Iterable[str]): member variables of the changed registers
+            addresses (Iterable[int]): addresses of the changed memory cells
+
+        Returns:
+            str: message
+        """
+        registers = set(registers)
+        changed_registers = ", ".join(
+            f"{reg}={getattr(self.assembler, attr)}"
+            for reg, attr in REGISTERS.items()
+            if attr in registers
+        )
+        message = f"Changed State of the Machine:\nregister_states = {changed_registers or '-'}\n"
+        if addresses:
+            memory = ", ".join(
+                f"{key}: {self.assembler.s.get(key, 0)}" for key in sorted(addresses)
+            )
+            message += f"Memory= {memory}\n"
+        return message
+
+    def print_state(self, text: Text) -> Text:
+        """Appends the values of all registers and all memory cells to the text field
+
+        Args:
+            text (Text): text field to enter status messages
+
+        Returns:
+            Text: modified text field
+        """
+        text.append(f"\nStep {self.step}. {self.state_message()}\n")
+        return text
+
     def assembler_message(self, text: Text) -> Text:
         """Appends messages from the Assembler in the text field
 
@@ -100,20 +262,38 @@ class Debugger:
         Returns:
             tuple[int, Text]: wait time for the next instruction, modified text field
         """
+        self.loop = None
         if not self.finished:
-            self.assembler_backup_stack.append(deepcopy(self.assembler))
+            self.stop_reason = None
+            before = self.history.begin(self.assembler)
+            pc = self.assembler.pc
             try:
-                text = self.compute(self.instructions[self.assembler.pc], text)
+                text = self.compute(self.instructions[pc], text)
+                self.history.commit(self.assembler, before)
+                self.advance()
             except Exception as e:
-                self.assembler = self.assembler_backup_stack.pop()
+                self.history.rollback(self.assembler, before)
                 instruction = self.instructions[self.assembler.pc]
                 message = (
                     f"\nEncountered the following error:\n{str(e)}\n"
                     f"This was caught at the following instruction: '{instruction.line_raw}' at line {instruction.line_number}\n"
                     f"I will revert the assembler to the last stable state.\n"
                 )
-                showerror("Assembler Error", message)
+                self.show_error("Assembler Error", message)
                 text.append(message)
+                self.stop_reason = ERROR
+                self.watchpoints.hits.clear()
+            else:
+                if (
+                    self.loops is not None
+                    and not self.finished
+                    and self.assembler.pc <= pc
+                ):
+                    text = self.check_loop(text)
+                if self.session is not None and not self.finished:
+                    text = self.check_limits(text)
+                if self.watchpoints.hits:
+                    text = self.check_watchpoints(self.instructions[pc], text)
 
         if self.do_auto_step_fast:
             return (50, text)
@@ -122,6 +302,255 @@ class Debugger:
         else:
             return (-1, text)
 
+    def check_loop(self, text: Text) -> Text:
+        """Looks for an infinite loop after a step that did not move the Program Counter forward.
+        Stops auto stepping if the machine is in one.
+
+        Args:
+            text (Text): text field to enter status messages
+
+        Returns:
+            Text: modified text field
+        """
+        self.loop = self.loops.check(self.assembler, self.step)
+        if self.loop is not None:
+            text.append(f"\n{self.loop}I paused the automatic stepping.\n")
+            self.stop_reason = LOOP
+            self.stop_auto_step()
+            # further steps look for the loop again, instead of stopping on every step
+            self.loops.reset()
+        return text
+
+    def check_watchpoints(self, instruction: Instruction, text: Text) -> Text:
+        """Reports the accesses of watched memory cells by the last instruction and stops auto stepping
+
+        Args:
+            instruction (Instruction): instruction that accessed the cells
+            text (Text): text field to enter status messages
+
+        Returns:
+            Text: modified text field
+        """
+        text.append("\n")
+        for hit in self.watchpoints.hits.values():
+            watchpoints = ", ".join(map(str, self.watchpoints.watching(hit)))
+            text.append(
+                f"Watchpoint {watchpoints}: the instruction '{instruction.line_raw}' on line {instruction.line_number} {hit}.\n"
+            )
+        text.append("I paused the automatic stepping.\n")
+        self.watchpoints.hits.clear()
+        self.stop_reason = WATCHPOINT
+        self.stop_auto_step()
+        return text
+
+    def check_limits(self, text: Text) -> Text:
+        """Pauses the auto step session if it exceeded one of its limits
+
+        Args:
+            text (Text): text field to enter status messages
+
+        Returns:
+            Text: modified text field
+        """
+        steps = self.step - self.session_step
+        if self.max_steps is not None and steps >= self.max_steps:
+            exceeded = (
+                BUDGET_EXHAUSTED,
+                f"Instruction Limit: I computed {steps} instructions, the limit is {self.max_steps} instructions.\n",
+            )
+        else:
+            exceeded = self.session.exceeded(self.assembler.s)
+        if exceeded is not None:
+            self.stop_reason, message = exceeded
+            text.append(f"\n{message}I paused the automatic stepping.\n")
+            self.stop_auto_step()
+        return text
+
+    def start_auto_step(self) -> None:
+        """Starts an auto step session, its limits count from now on. Set one of the do_auto_step flags as well."""
+        self.session = Watchdog(
+            self.max_seconds, self.max_cells, len(self.assembler.s)
+        )
+        self.session_step = self.step
+        if self.max_steps is None and not self.session.active:
+            self.session = None  # nothing to check
+
+    def stop_auto_step(self) -> None:
+        """Ends the auto step session"""
+        self.do_auto_step_fast = False
+        self.do_auto_step_slow = False
+        self.do_auto_step_turbo = False
+        self.session = None
+
+    def run_frame(
+        self, text: Text, interrupt: Event | None = None
+    ) -> tuple[int, Text]:
+        """Computes as many instructions as fit into self.frame_budget milliseconds.
+        The status messages of all these steps are appended to the text field after the frame.
+
+        Args:
+            text (Text): text field to enter status messages
+            interrupt (Event | None): stops the frame after the current instruction once it is set
+
+        Returns:
+            tuple[int, Text]: wait time for the next frame (-1 to stop), modified text field
+        """
+        messages = MessageBuffer()
+        deadline = perf_counter() + self.frame_budget / 1000
+        while not self.finished:
+            step = self.step
+            self.next(messages)
+            if self.step == step:
+                # the step raised an error, don't repeat it until the user acts
+                self.stop_auto_step()
+                break
+            if self.stop_reason is not None:
+                # a loop or an exceeded limit paused the session
+                break
+            if perf_counter() >= deadline:
+                break
+            if interrupt is not None and interrupt.is_set():
+                break
+        for message in messages:
+            text.append(message)
+
+        if self.do_auto_step_turbo and not self.finished:
+            # give Tk the chance to handle events (e.g. the Pause button) before the next frame
+            return (1, text)
+        self.stop_auto_step()
+        return (-1, text)
+
+    def toggle_breakpoint(self, line: int) -> bool | None:
+        """Sets or removes the breakpoint on the instruction on the given line
+
+        Args:
+            line (int): line number of the raw program
+
+        Returns:
+            bool | None: True if the line has a breakpoint now, False if it was removed, None if there is no
+                instruction on the line
+        """
+        index = self.line_index.get(line)
+        if index is None:
+            return None
+        self.breakpoints[index] ^= 1
+        return bool(self.breakpoints[index])
+
+    def resume(self, text: Text, interrupt: Event | None = None) -> Text:
+        """Continue: computes instructions at full speed until the Program Counter reaches an instruction with a
+        breakpoint. The steps are not recorded in the undo history and print no status messages, only the
+        checkpoints are taken, so the timeline still reaches them. The terminate instruction, an error or the
+        end of the file are computed by next() as usual, a watchpoint, a loop or an exceeded limit of the auto
+        step session (see start_auto_step) stop as during auto stepping.
+
+        Args:
+            text (Text): text field to enter status messages
+            interrupt (Event | None): stops within INTERRUPT_INTERVAL instructions once it is set
+
+        Returns:
+            Text: modified text field
+        """
+        if self.finished:
+            return text
+        self.loop = None
+        self.stop_reason = None
+        assembler = self.assembler
+        handlers = [instruction.handler for instruction in self.instructions]
+        terminates = [
+            instruction.line_raw in TERMINATE for instruction in self.instructions
+        ]
+        breakpoints = self.breakpoints
+        length = len(self.instructions)
+        loops = self.loops
+        memory = assembler.s
+        watch = self.watchpoints or None
+        hits = self.watchpoints.hits
+        countdown = CHECK_INTERVAL
+        first = step = self.step
+        reason = None
+        self.mark_all_changed()
+        self.history.rewind(step)  # the journal does not record the following steps
+        while reason is None:
+            # stop at every checkpoint, so it is taken, and every INTERRUPT_INTERVAL steps, so the interrupt
+            # and the limits are checked
+            interval = self.checkpoints.interval
+            stop = min(step + interval - step % interval, step + INTERRUPT_INTERVAL)
+            if self.session is not None and self.max_steps is not None:
+                stop = min(stop, self.session_step + self.max_steps)
+            memory.watch = watch
+            try:
+                while step < stop:
+                    pc = assembler.pc
+                    if not 0 <= pc < length:
+                        reason = END_OF_FILE
+                        break
+                    if breakpoints[pc] and step != first:
+                        reason = BREAKPOINT
+                        break
+                    if terminates[pc]:
+                        reason = TERMINATED
+                        break
+                    if handlers[pc](assembler):
+                        assembler.pc += 1
+                    step += 1
+                    if hits:
+                        reason = WATCHPOINT
+                        break
+                    if loops is not None and assembler.pc <= pc:
+                        countdown -= 1
+                        if countdown == 0:
+                            countdown = CHECK_INTERVAL
+                            memory.watch = None  # the loop detection reads the memory
+                            self.loop = loops.check(assembler, step)
+                            memory.watch = watch
+                            if self.loop is not None:
+                                reason = LOOP
+                                break
+            except Exception:
+                reason = ERROR
+                hits.clear()
+            memory.watch = None
+            assembler.message = ""
+            assembler.debug_message = ""
+            self.step = step
+            if step > self.executed:
+                self.executed = step
+            self.history.rewind(step)
+            if reason is not None:
+                break
+            if self.checkpoints.due(step):
+                self.checkpoints.take(step, assembler)
+            if interrupt is not None and interrupt.is_set():
+                text.append(f"\nContinued for {step - first} steps, then paused.\n")
+                return text
+            if self.session is not None:
+                text = self.check_limits(text)
+                if self.stop_reason is not None:
+                    return text
+
+        text.append(f"\nContinued for {step - first} steps.\n")
+        if reason == BREAKPOINT:
+            line = self.instructions[assembler.pc].line_number
+            text.append(f"\nStopped at the breakpoint on line {line}.\n")
+            if self.full_state:
+                text.append(f"\n{self.state_message()}")
+            self.stop_reason = BREAKPOINT
+        elif reason == WATCHPOINT:
+            text = self.check_watchpoints(self.instructions[pc], text)
+        elif reason == LOOP:
+            text.append(f"\n{self.loop}I stopped continuing.\n")
+            self.stop_reason = LOOP
+            loops.reset()
+        else:
+            if reason == ERROR:
+                # the failed step may have changed the state, compute it again with its error message
+                self.reload(step)
+            elif reason == END_OF_FILE and step > first:
+                # next() reports the end of the file for the step that jumped past it
+                self.reload(step - 1)
+            _, text = self.next(text)
+        return text
+
     def previous(self, text: Text) -> Text:
         """Reverts the Assembler to a previous state
 
@@ -131,27 +560,147 @@ class Debugger:
         Returns:
             Text: modified text field
         """
-        if not self.assembler_backup_stack:
+        if self.step == 0:
             text.append("\nNo steps to revert.\n")
             return text
+        if not self.history:
+            # The step was evicted from the undo history, get it from the checkpoints instead
+            return self.seek(self.step - 1, text)
 
-        self.assembler = self.assembler_backup_stack.pop()
+        registers, addresses = self.history.undo(self.assembler)
+        self.mark_changed(registers, addresses)
+        self.forget_states()
+        self.step -= 1
         self.finished = (
             False  # At least one instruction remains (the one that was reverted)
         )
-        memory = ", ".join(
-            f"{key}: {value}" for key, value in sorted(self.assembler.s.items())
-        )
-        if memory == "":
-            memory = "{}"
-        text.append(
-            f"\nReverted to the previous step.\n"
-            f"Current State of the Machine is:"
-            f"\nregister_states = {', '.join(f"{reg}={getattr(self.assembler, attr)}" for reg, attr in REGISTERS.items())}"
-            f"\nMemory= {memory}\n\n",
-        )
+        if self.full_state:
+            text.append(f"\nReverted to the previous step.\n{self.state_message()}\n")
+        else:
+            text.append(
+                f"\nReverted to the previous step.\n{self.changes_message(registers, addresses)}\n"
+            )
         return text
 
+    def mark_changed(self, registers: Iterable[str], addresses: Iterable[int]) -> None:
+        """Remembers registers and memory cells that changed, until the GUI takes them with take_changes()
+
+        Args:
+            registers (Iterable[str]): member variables of the changed registers
+            addresses (Iterable[int]): addresses of the changed memory cells
+        """
+        if self.changed_registers is not None:
+            self.changed_registers.update(registers)
+        if self.changed_addresses is not None:
+            self.changed_addresses.update(addresses)
+
+    def mark_all_changed(self) -> None:
+        """Remembers that any register or memory cell may have changed"""
+        self.changed_registers = None
+        self.changed_addresses = None
+
+    def take_changes(self) -> tuple[set[str] | None, set[int] | None]:
+        """Registers and memory cells that changed since the last call
+
+        Returns:
+            tuple[set[str] | None, set[int] | None]: member variables of the changed registers, addresses of the
+                changed memory cells. None if anything may have changed.
+        """
+        changes = (self.changed_registers, self.changed_addresses)
+        self.changed_registers = set()
+        self.changed_addresses = set()
+        return changes
+
+    def forget_states(self) -> None:
+        """Call when the machine moved back on the timeline or was changed, so the states recorded for the loop
+        detection don't belong to the steps before the current one anymore
+        """
+        if self.loops is not None:
+            self.loops.reset()
+
+    def advance(self) -> None:
+        """Moves one step forward on the timeline after a step was computed"""
+        self.step += 1
+        if self.step > self.executed:
+            self.executed = self.step
+        if self.checkpoints.due(self.step):
+            self.checkpoints.take(self.step, self.assembler)
+
+    def seek(self, step: int, text: Text) -> Text:
+        """Moves the Assembler to the state after the given number of steps. Only steps that were already
+        computed (up to self.executed) can be reached. Restores the closest checkpoint and computes the
+        remaining steps again.
+
+        Args:
+            step (int): step of the timeline
+            text (Text): text field to enter status messages
+
+        Returns:
+            Text: modified text field
+        """
+        step = max(0, min(step, self.executed))
+        self.mark_all_changed()
+        self.forget_states()
+        start = self.checkpoints.closest(step)
+        if not (step >= self.step and self.step >= start):
+            # computing from the current state would take longer than from the checkpoint
+            self.reload(step)
+        else:
+            self.replay(step - self.step)
+        self.finished = (
+            self.step == self.executed and self.terminated
+        ) or not 0 <= self.assembler.pc < len(self.instructions)
+
+        if self.full_state:
+            text.append(f"\nJumped to step {self.step}.\n{self.state_message()}\n")
+        else:
+            text.append(f"\nJumped to step {self.step}.\n")
+        return text
+
+    def reload(self, step: int) -> None:
+        """Restores the closest checkpoint before the given step and computes the remaining steps again
+
+        Args:
+            step (int): step of the timeline, at most self.executed
+        """
+        start = self.checkpoints.closest(step)
+        self.checkpoints.restore(start, self.assembler)
+        self.history.rewind(start)
+        self.step = start
+        self.replay(step - start)
+
+    def replay(self, steps: int) -> None:
+        """Computes steps that were already computed before again, without any status messages
+
+        Args:
+            steps (int): number of steps to compute
+        """
+        for _ in range(steps):
+            before = self.history.begin(self.assembler)
+            try:
+                if self.instructions[self.assembler.pc].handler(self.assembler):
+                    self.assembler.pc += 1
+            except Exception:
+                # The state was changed since the step was computed, the rest of the timeline is gone
+                self.history.rollback(self.assembler, before)
+                self.state_changed()
+                break
+            self.history.commit(self.assembler, before)
+            self.assembler.message = ""
+            self.assembler.debug_message = ""
+            self.advance()
+
+    def state_changed(self) -> None:
+        """Call after the user changed registers or memory cells. The steps after the current step are
+        removed from the timeline, since computing them again would lead to a different state.
+        """
+        self.executed = self.step
+        self.terminated = False
+        self.mark_all_changed()
+        self.forget_states()
+        self.checkpoints.discard_after(self.step)
+        self.checkpoints.take(self.step, self.assembler, pinned=True)
+
     def start(self, status_text: Text, raw_text: Text) -> tuple[Text, Text]:
         """Fills the text fields with the first status message / the raw program text
 
@@ -4,24 +4,37 @@
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
 import tkinter as tk
+from tkinter.messagebox import showerror
+from types import SimpleNamespace
+from typing import Callable
 from Debugger import Debugger
+from Executor import Executor, Snapshot, merge_changes
+from MemoryBrowser import MemoryBrowser
+from StatusLog import StatusLog
 from TkinterHelper import Entry, Text, txt_event, FONT, ToolTip
-from Assembler import REGISTERS, MAX_REGISTER_SIZE, MAX_MEMORY_CELL_SIZE, ASSEMBLER_NAME
+from Watchpoints import parse_watchpoint
+from Assembler import REGISTERS, MAX_REGISTER_SIZE, ASSEMBLER_NAME
 from ValidateAndUpdate import *
 
+# milliseconds between two looks into the queue of the worker thread
+DRAIN_INTERVAL = 20
+
 
 class DebuggerGUI:
     """Responsible for the Graphical User Interface after startup (see StartGUI) is completed.
     Backend Functionalities are in Debugger.py
     """
 
-    def __init__(self, controller, debugger: Debugger) -> None:
+    def __init__(
+        self, controller, debugger: Debugger, log_path: str | None = None
+    ) -> None:
         """Init for GUI class.
 
         Args:
             controller (GUIController): Provides the root window and manages the transition from DebuggerGUI to StartGUI
             register_list: list[str]
             debugger: Debugger
+            log_path (str | None): file to save all status messages to, None to keep only the newest ones
         """
         self.controller = controller
         self.root: tk.Tk = controller.root
@@ -30,13 +43,18 @@ class DebuggerGUI:
         self.register_entries: dict[str, tuple[Entry, Entry]] = dict()
         self.memory_cell_entries: dict[Entry, tuple[Entry, Entry]] = dict()
         self.debugger = debugger
+        self.executor = Executor(debugger)
+        # action that waits for the worker thread to stop (see call_pause)
+        self.after_worker: Callable | None = None
+        self.log_path = log_path
 
         self.root.title(ASSEMBLER_NAME)
         self.root.geometry("1600x800")
         self.setup()
-        self.status_text, self.raw_text = self.debugger.start(
-            self.status_text, self.raw_text
+        self.status_log, self.raw_text = self.debugger.start(
+            self.status_log, self.raw_text
         )
+        self.update_entries()
 
     def setup(self):
         """Setup All GUI Widgets"""
@@ -51,6 +69,7 @@ class DebuggerGUI:
         self.setup_memory()
         self.setup_debug_control()
         self.setup_assembler_control()
+        self.setup_timeline()
         self.setup_output()
 
     def setup_register(self):
@@ -103,52 +122,12 @@ class DebuggerGUI:
             )
 
     def setup_memory(self):
-        """Setup all Widgets of the memory frame"""
-        self.memory_control = tk.Frame(master=self.input_window)
-        self.memory_control.pack(side=tk.TOP, fill=tk.X, expand=True, pady=5, padx=5)
-
-        memory_legend = tk.Label(
-            master=self.memory_control,
-            text="Trace  |  Memory Cell  |  Value (decimal)  |  Value (binary)",
-            font=FONT,
-            anchor="w",
+        """Setup the memory browser"""
+        self.memory_browser = MemoryBrowser(
+            master=self.input_window, on_move=lambda: self.move_memory_window()
         )
-        memory_legend.pack(side=tk.TOP)
-
-        for i in range(0, 7):
-            self.memory_cell = tk.Frame(master=self.memory_control)
-            self.memory_cell.pack(side=tk.TOP, fill=tk.X, expand=True, padx=2, pady=2)
-
-            self.memory_cell_label = tk.Label(
-                master=self.memory_cell, text=f"Trace {i + 1}:", font=FONT
-            )
-            self.memory_cell_label.pack(side=tk.LEFT, expand=False)
-
-            self.memory_cell_select = Entry(
-                master=self.memory_cell, width=12, font=FONT, justify="right"
-            )
-            self.memory_cell_select.pack(side=tk.LEFT, expand=True)
-            self.memory_cell_select.set(i)
-
-            self.memory_cell_value = Entry(
-                master=self.memory_cell, width=12, font=FONT, justify="right"
-            )
-            self.memory_cell_value.pack(side=tk.LEFT, expand=True)
-            self.memory_cell_value.set("0")
-
-            self.memory_cell_value_binary = Entry(
-                master=self.memory_cell,
-                width=MAX_MEMORY_CELL_SIZE,
-                font=FONT,
-                justify="right",
-            )
-            self.memory_cell_value_binary.pack(side=tk.LEFT, expand=True)
-            self.memory_cell_value_binary.set("0" * MAX_MEMORY_CELL_SIZE)
-
-            self.memory_cell_entries[self.memory_cell_select] = (
-                self.memory_cell_value,
-                self.memory_cell_value_binary,
-            )
+        self.memory_browser.pack(side=tk.TOP, fill=tk.X, expand=True, pady=5, padx=5)
+        self.memory_cell_entries = self.memory_browser.entries
 
     def setup_debug_control(self):
         """Setup a Frame to hold all buttons needed to control the debug functionalities"""
@@ -181,23 +160,23 @@ class DebuggerGUI:
         )
         self.overwrite_with_binary.pack(side=tk.LEFT, expand=True, pady=5)
 
-        self.change_traces = tk.Button(
+        self.print_state_button = tk.Button(
             master=self.overwrite_control,
-            text="Change Traces\n",
+            text="Print full\nstate",
             font=FONT,
-            command=lambda: self.validate_select_entries(),
+            command=lambda: self.print_state(),
         )
-        self.change_traces_tooltip = ToolTip(
-            widget=self.change_traces,
-            text="After editing the Traces, click me to view the content of the newly selected memory cells",
+        self.print_state_button_tooltip = ToolTip(
+            widget=self.print_state_button,
+            text="Print the values of all registers and memory cells into the status window",
         )
-        self.change_traces.pack(side=tk.LEFT, expand=True, pady=5)
+        self.print_state_button.pack(side=tk.LEFT, expand=True, pady=5)
 
         self.return_button = tk.Button(
             master=self.overwrite_control,
             font=FONT,
             text="Return to\nprogram/memory selection",
-            command=lambda: self.controller.open_start_gui(),
+            command=lambda: self.return_to_start(),
         )
         self.return_button_tooltip = ToolTip(
             widget=self.return_button,
@@ -205,6 +184,37 @@ class DebuggerGUI:
         )
         self.return_button.pack(side=tk.LEFT, expand=True, pady=5)
 
+        self.watch_control = tk.Frame(master=self.control_debug)
+        self.watch_control.pack(side=tk.TOP, fill=tk.X)
+        self.watch_label = tk.Label(
+            master=self.watch_control, text="Watch memory:", font=FONT
+        )
+        self.watch_label.pack(side=tk.LEFT)
+        self.watch_entry = Entry(master=self.watch_control, width=16, font=FONT)
+        self.watch_entry.pack(side=tk.LEFT)
+        self.watch_entry.bind("<Return>", lambda e: self.add_watchpoint())
+        self.watch_button = tk.Button(
+            master=self.watch_control,
+            text="Watch",
+            font=FONT,
+            command=lambda: self.add_watchpoint(),
+        )
+        self.watch_button_tooltip = ToolTip(
+            widget=self.watch_button,
+            text="Pause after every instruction that changes a watched memory cell. Enter an address or an interval like 1000-1999, precede it with 'r' to watch reads or 'rw' to watch both",
+        )
+        self.watch_button.pack(side=tk.LEFT, padx=5)
+        self.clear_watch_button = tk.Button(
+            master=self.watch_control,
+            text="Clear",
+            font=FONT,
+            command=lambda: self.clear_watchpoints(),
+        )
+        self.clear_watch_button_tooltip = ToolTip(
+            widget=self.clear_watch_button, text="Remove all watchpoints"
+        )
+        self.clear_watch_button.pack(side=tk.LEFT)
+
     def setup_assembler_control(self):
         """Setup a Frame to hold all buttons needed for stepping through the assembler instructions"""
         self.control_assembler = tk.Frame(master=self.input_window)
@@ -255,6 +265,18 @@ class DebuggerGUI:
         )
         self.auto_step_fast.pack(side=tk.LEFT, expand=True)
 
+        self.auto_step_turbo = tk.Button(
+            master=self.control_assembler,
+            text="  Auto Step  \nturbo",
+            font=FONT,
+            command=lambda: self.call_auto_step_turbo(),
+        )
+        self.auto_step_turbo_tooltip = ToolTip(
+            widget=self.auto_step_turbo,
+            text="Execute as many Instructions as possible in the background, the window is updated once per frame. Stop by pressing 'Pause'",
+        )
+        self.auto_step_turbo.pack(side=tk.LEFT, expand=True)
+
         self.pause = tk.Button(
             master=self.control_assembler,
             text="    Pause    \n",
@@ -264,6 +286,44 @@ class DebuggerGUI:
         self.pause_tooltip = ToolTip(widget=self.pause, text="Stop Auto Stepping")
         self.pause.pack(side=tk.LEFT, expand=True)
 
+        self.continue_button = tk.Button(
+            master=self.control_assembler,
+            text="  Continue  \nto breakpoint",
+            font=FONT,
+            command=lambda: self.call_continue(),
+        )
+        self.continue_button_tooltip = ToolTip(
+            widget=self.continue_button,
+            text="Execute Instructions as fast as possible until the next breakpoint, only the final state is shown. Ctrl+click on a line of the program to set or remove a breakpoint. Stop by pressing 'Pause'",
+        )
+        self.continue_button.pack(side=tk.LEFT, expand=True)
+
+    def setup_timeline(self):
+        """Setup a slider to jump to any step that was already computed"""
+        self.timeline_control = tk.Frame(master=self.input_window)
+        self.timeline_control.pack(side=tk.BOTTOM, fill=tk.X, pady=5, padx=5)
+
+        self.timeline_label = tk.Label(
+            master=self.timeline_control, text="Step", font=FONT
+        )
+        self.timeline_label.pack(side=tk.LEFT)
+
+        self.timeline = tk.Scale(
+            master=self.timeline_control,
+            from_=0,
+            to=0,
+            orient=tk.HORIZONTAL,
+            showvalue=True,
+            font=FONT,
+        )
+        self.timeline.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        # jump only when the slider is released, not for every value it passes
+        self.timeline.bind("<ButtonRelease-1>", lambda e: self.seek())
+        self.timeline_tooltip = ToolTip(
+            widget=self.timeline,
+            text="Drag to jump to any step that was already executed",
+        )
+
     def setup_output(self):
         """Setups the output window"""
         # Configure raw_text_frame
@@ -295,6 +355,8 @@ class DebuggerGUI:
         self.raw_text_scrollbar.config(command=self.raw_text.yview)
         self.raw_text_hscrollbar.config(command=self.raw_text.xview)
         self.raw_text.bind("<Key>", lambda e: txt_event(e))
+        # plain clicks place the cursor and select text, Ctrl+click toggles a breakpoint
+        self.raw_text.bind("<Control-Button-1>", self.toggle_breakpoint)
 
         # Configure status_frame
         self.status_frame = tk.Frame(master=self.output_window)
@@ -307,7 +369,6 @@ class DebuggerGUI:
         )
         self.status_text = Text(
             master=self.status_frame,
-            yscrollcommand=self.status_text_scrollbar.set,
             font=FONT,
         )
         self.status_text_scrollbar.grid(row=0, column=1, sticky="ns")
@@ -315,6 +376,10 @@ class DebuggerGUI:
 
         self.status_text.bind("<Key>", lambda e: txt_event(e))
         self.status_text_scrollbar.config(command=self.status_text.yview)
+        # holds all status messages, the text field only shows a part of them
+        self.status_log = StatusLog(
+            self.status_text, self.status_text_scrollbar, spill_path=self.log_path
+        )
 
         # Configure grid layout for the output_window
         self.output_window.grid_rowconfigure(0, weight=1)
@@ -323,69 +388,211 @@ class DebuggerGUI:
 
     def next(self):
         """Triggers the next step of the assembler execution"""
-        wait, self.status_text = self.debugger.next(self.status_text)
+        if self.executor.running:
+            self.call_pause(self.next)
+            return  # called again once the worker thread stopped
+        wait, self.status_log = self.debugger.next(self.status_log)
         self.raw_text = self.debugger.show_line(self.raw_text)
         self.update_entries()
+        self.update_timeline()
         if wait < 0:
             pass
         else:
             self.schedule_id = self.root.after(wait, self.next)
 
+    def drain(self):
+        """Shows the snapshots the worker thread posted since the last call"""
+        snapshots = self.executor.drain()
+        if snapshots:
+            for snapshot in snapshots:
+                for message in snapshot.messages:
+                    self.status_log.append(message)
+                for title, message in snapshot.errors:
+                    showerror(title, message)
+            registers, _ = merge_changes(snapshots)
+            self.show_snapshot(snapshots[-1], registers)
+            if snapshots[-1].done:
+                # the worker is finished, the Debugger can be used directly again
+                self.raw_text = self.debugger.show_line(self.raw_text)
+                self.update_timeline()
+                then, self.after_worker = self.after_worker, None
+                if then is not None:
+                    then()
+                return
+        self.schedule_id = self.root.after(DRAIN_INTERVAL, self.drain)
+
+    def show_snapshot(self, snapshot: Snapshot, registers: set[str] | None):
+        """Updates the entries, the highlighted line and the timeline while the worker thread runs"""
+        self.register_entries = update_register_entries(
+            self.register_entries, SimpleNamespace(**snapshot.registers), registers
+        )
+        self.memory_browser.show(*snapshot.window)
+        if snapshot.line is not None:
+            self.raw_text.highlight_line(snapshot.line, self.debugger.previous_line)
+            self.debugger.previous_line = snapshot.line
+        self.timeline.configure(to=snapshot.executed)
+        self.timeline.set(snapshot.step)
+
     def previous(self):
         """Undo for the last step of the assembler execution"""
-        self.status_text = self.debugger.previous(self.status_text)
+        if self.call_pause(self.previous):
+            return  # called again once the worker thread stopped
+        self.status_log = self.debugger.previous(self.status_log)
+        self.raw_text = self.debugger.show_line(self.raw_text)
+        self.update_entries()
+        self.update_timeline()
+
+    def seek(self):
+        """Jumps to the step selected on the timeline"""
+        if self.call_pause(self.seek):
+            return  # called again once the worker thread stopped
+        self.status_log = self.debugger.seek(
+            int(self.timeline.get()), self.status_log
+        )
         self.raw_text = self.debugger.show_line(self.raw_text)
         self.update_entries()
+        self.update_timeline()
+
+    def print_state(self):
+        """Prints all registers and memory cells into the status window"""
+        if self.call_pause(self.print_state):
+            return  # called again once the worker thread stopped
+        self.status_log = self.debugger.print_state(self.status_log)
 
     def call_auto_step_slow(self):
         """Steps automatically through all Assembler instructions"""
-        self.debugger.do_auto_step_fast = False
+        if self.call_pause(self.call_auto_step_slow):
+            return  # called again once the worker thread stopped
         self.debugger.do_auto_step_slow = True
-        self.root.after_cancel(self.schedule_id)
+        self.debugger.start_auto_step()
         self.next()
 
     def call_auto_step_fast(self):
         """Steps automatically through all Assembler instructions"""
+        if self.call_pause(self.call_auto_step_fast):
+            return  # called again once the worker thread stopped
         self.debugger.do_auto_step_fast = True
-        self.debugger.do_auto_step_slow = False
-        self.root.after_cancel(self.schedule_id)
+        self.debugger.start_auto_step()
         self.next()
 
-    def call_pause(self):
-        """Disables the automatic stepping of auto_step_slow and auto_step_fast"""
-        self.debugger.do_auto_step_fast = False
-        self.debugger.do_auto_step_slow = False
+    def call_auto_step_turbo(self):
+        """Steps through all Assembler instructions as fast as possible on a worker thread"""
+        if self.call_pause(self.call_auto_step_turbo):
+            return  # called again once the worker thread stopped
+        self.executor.start(self.memory_browser.window)
+        self.drain()
+
+    def call_continue(self):
+        """Computes Assembler instructions on a worker thread until the next breakpoint"""
+        if self.call_pause(self.call_continue):
+            return  # called again once the worker thread stopped
+        self.executor.start(self.memory_browser.window, resume=True)
+        self.drain()
+
+    def toggle_breakpoint(self, event: tk.Event) -> str:
+        """Sets or removes the breakpoint on the line of the program that was clicked with Ctrl"""
+        line = int(self.raw_text.index(f"@{event.x},{event.y}").split(".")[0])
+        marked = self.debugger.toggle_breakpoint(line)
+        if marked is not None:
+            self.raw_text.mark_breakpoint(line, marked)
+        return "break"  # no further handling of the Ctrl+click
+
+    def add_watchpoint(self):
+        """Adds the watchpoint typed into the watch entry"""
+        if self.call_pause(self.add_watchpoint):
+            return  # called again once the worker thread stopped
+        try:
+            watchpoint = self.debugger.watchpoints.add(
+                *parse_watchpoint(self.watch_entry.get())
+            )
+        except ValueError as error:
+            showerror("Watchpoint Error", str(error))
+            return
+        self.watch_entry.set("")
+        self.status_log.append(f"\nWatching {watchpoint}.\n")
+
+    def clear_watchpoints(self):
+        """Removes all watchpoints"""
+        if self.call_pause(self.clear_watchpoints):
+            return  # called again once the worker thread stopped
+        self.debugger.watchpoints.clear()
+        self.status_log.append("\nRemoved all watchpoints.\n")
+
+    def call_pause(self, then: Callable | None = None) -> bool:
+        """Disables the automatic stepping of auto_step_slow, auto_step_fast, auto_step_turbo and Continue.
+        The GUI never waits for the worker thread: it is interrupted, drain() shows what it computed until then
+        and calls then once it stopped.
+
+        Args:
+            then (Callable | None): action that uses the Debugger, called once the worker thread stopped
+
+        Returns:
+            bool: True if the worker thread is still running, the caller must not use the Debugger yet
+        """
+        if self.executor.running:
+            self.executor.stop()
+            self.after_worker = then
+            return True
         self.root.after_cancel(self.schedule_id)
+        self.debugger.stop_auto_step()
+        return False
+
+    def return_to_start(self):
+        """Stops all stepping and opens the StartGUI"""
+        if self.call_pause(self.return_to_start):
+            return  # called again once the worker thread stopped
+        self.status_log.close()
+        self.controller.open_start_gui()
 
     def update_entries(self):
-        """Updates all entry fields"""
+        """Updates the entry fields of the registers and memory cells that changed since the last update"""
+        self.show_changes(*self.debugger.take_changes())
+
+    def show_changes(self, registers: set[str] | None, addresses: set[int] | None):
+        """Updates the entry fields of the given registers and memory cells
+
+        Args:
+            registers (set[str] | None): member variables of the changed registers, None for all
+            addresses (set[int] | None): addresses of the changed memory cells, None for all
+        """
         self.register_entries = update_register_entries(
-            self.register_entries, self.debugger.assembler
-        )
-        self.memory_cell_entries = update_memory_entries(
-            self.memory_cell_entries, self.debugger.assembler
+            self.register_entries, self.debugger.assembler, registers
         )
+        self.memory_browser.refresh(self.debugger.assembler.s, addresses)
 
-    def validate_select_entries(self):
-        """Validates UserInput in the select entries and updates entry fields accordingly"""
-        self.memory_cell_entries = validate_select_entries(self.memory_cell_entries)
-        # Update memoryentries to allow user Input to take effect
-        self.memory_cell_entries = update_memory_entries(
-            self.memory_cell_entries, self.debugger.assembler
-        )
+    def move_memory_window(self):
+        """Shows the cells of the memory browser after it was scrolled"""
+        if self.executor.running:
+            return  # the worker reads the moved window for its next snapshot
+        self.memory_browser.refresh(self.debugger.assembler.s)
+
+    def update_timeline(self):
+        """Updates the range and the position of the timeline slider"""
+        self.timeline.configure(to=self.debugger.executed)
+        self.timeline.set(self.debugger.step)
 
     def validate_value_entries(self):
         """Validate UserInput in the decimal value entries and updates entry fields accordingly"""
+        if self.call_pause(self.validate_value_entries):
+            return  # called again once the worker thread stopped
+        self.memory_cell_entries = validate_select_entries(self.memory_cell_entries)
         self.debugger.assembler = validate_value_entries(
             self.register_entries, self.memory_cell_entries, self.debugger.assembler
         )
+        self.debugger.state_changed()
         # Get rid of invalid values and synchronize Binary entry fields with the new decimal entry field values
         self.update_entries()
+        self.update_timeline()
 
     def validate_binary_value_entries(self):
         """Validate UserInput in the binary value entries and updates entry fields accordingly"""
+        if self.call_pause(self.validate_binary_value_entries):
+            return  # called again once the worker thread stopped
+        self.memory_cell_entries = validate_select_entries(self.memory_cell_entries)
         self.debugger.assembler = validate_binary_value_entries(
             self.register_entries, self.memory_cell_entries, self.debugger.assembler
         )
+        self.debugger.state_changed()
         # Get rid of invalid values and synchronize decimals entry fields with the new binary entry field values
         self.update_entries()
+        self.update_timeline()
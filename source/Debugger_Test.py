@@ -0,0 +1,314 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import random
+from threading import Event
+from Assembler import Assembler, REGISTERS
+from Debugger import Debugger, BREAKPOINT, WATCHPOINT
+from Engine import (
+    load_program,
+    BUDGET_EXHAUSTED,
+    MEMORY_EXHAUSTED,
+    ERROR,
+    END_OF_FILE,
+)
+from Instruction import Instruction
+from Parser import create_memory
+
+# Writes the cells 0, 1, 2, ... forever
+FILL = [
+    Instruction(1, "STOREIN1 ACC 0", "storein1", ("acc", 0)),
+    Instruction(2, "ADDI IN1 1", "addi", ("in1", 1)),
+    Instruction(3, "JUMP -2", "jump", (-2,)),
+]
+
+
+class Output(list):
+    """Collects the messages the Debugger writes into its status text field"""
+
+    def insert(self, index, text: str) -> None:
+        self.append(text)
+
+
+def state(assembler: Assembler) -> tuple[dict, dict]:
+    """Registers and memory of the assembler"""
+    registers = {name: getattr(assembler, attr) for name, attr in REGISTERS.items()}
+    return (registers, dict(assembler.s.items()))
+
+
+def example_debugger(**options) -> Debugger:
+    """Debugger for the faculty example of Assembler_BS"""
+    directory = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+    parser = load_program(os.path.join(directory, "Example.txt"), False)
+    memory, _ = create_memory(os.path.join(directory, "Example_Storage.json"))
+    assembler = Assembler(s=memory)
+    assembler.max_pc = len(parser.instructions)
+    return Debugger(assembler, False, parser.instructions, parser.raw_text, **options)
+
+
+class TestDebugger(unittest.TestCase):
+    def run_to_end(self, debugger: Debugger) -> list[tuple[dict, dict]]:
+        """Computes all steps and returns the state after every step"""
+        states = [state(debugger.assembler)]
+        while not debugger.finished:
+            debugger.next(Output())
+            states.append(state(debugger.assembler))
+        return states
+
+    def test_previous(self):
+        """Previous reverts every step, also steps that were evicted from the undo history"""
+        debugger = example_debugger(max_history_steps=4, checkpoint_interval=3)
+        states = self.run_to_end(debugger)
+        self.assertEqual(debugger.step, len(states) - 1)
+        while len(states) > 1:
+            states.pop()
+            debugger.previous(Output())
+            self.assertEqual(state(debugger.assembler), states[-1])
+        self.assertIn("\nNo steps to revert.\n", debugger.previous(Output()))
+
+    def test_seek(self):
+        """Seek reaches every computed step in any order"""
+        debugger = example_debugger(checkpoint_interval=4)
+        states = self.run_to_end(debugger)
+        random.seed(3)
+        for step in random.choices(range(len(states)), k=100):
+            debugger.seek(step, Output())
+            self.assertEqual(debugger.step, step)
+            self.assertEqual(state(debugger.assembler), states[step])
+            self.assertEqual(debugger.finished, step == len(states) - 1)
+        # the undo history still works after seeking
+        debugger.seek(10, Output())
+        debugger.previous(Output())
+        self.assertEqual(state(debugger.assembler), states[9])
+
+    def test_state_changed(self):
+        """Changing the state removes the rest of the timeline"""
+        debugger = example_debugger(checkpoint_interval=4)
+        states = self.run_to_end(debugger)
+        debugger.seek(6, Output())
+        debugger.assembler.s[100] = 7
+        debugger.state_changed()
+        self.assertEqual(debugger.executed, 6)
+        debugger.seek(2, Output())
+        self.assertEqual(state(debugger.assembler), states[2])
+        debugger.seek(len(states), Output())
+        self.assertEqual(debugger.step, 6)
+        self.assertEqual(debugger.assembler.s[100], 7)
+
+    def test_run_frame(self):
+        """Auto step turbo reaches the same state as single steps, frame by frame"""
+        states = self.run_to_end(example_debugger())
+        for frame_budget in (0, 1000):
+            debugger = example_debugger(frame_budget=frame_budget)
+            debugger.do_auto_step_turbo = True
+            frames = 0
+            wait = 0
+            while wait >= 0:
+                output = Output()
+                wait, _ = debugger.run_frame(output)
+                self.assertTrue(output)
+                frames += 1
+            self.assertTrue(debugger.finished)
+            self.assertFalse(debugger.do_auto_step_turbo)
+            self.assertEqual(debugger.step, len(states) - 1)
+            self.assertEqual(state(debugger.assembler), states[-1])
+            if frame_budget == 0:
+                self.assertEqual(frames, len(states) - 1)
+            else:
+                self.assertEqual(frames, 1)
+
+    def test_limits(self):
+        """An auto step session pauses at its limits with a status message, manual steps go on"""
+        debugger = Debugger(Assembler(max_pc=3), False, FILL, [], max_steps=100)
+        debugger.do_auto_step_turbo = True
+        debugger.start_auto_step()
+        output = Output()
+        wait = 0
+        while wait >= 0:
+            wait, _ = debugger.run_frame(output)
+        self.assertEqual(debugger.stop_reason, BUDGET_EXHAUSTED)
+        self.assertEqual(debugger.step, 100)
+        self.assertIn("Instruction Limit", "".join(output))
+        self.assertFalse(debugger.do_auto_step_turbo)
+        debugger.next(Output())
+        self.assertEqual((debugger.step, debugger.stop_reason), (101, None))
+
+        debugger = Debugger(Assembler(max_pc=3), False, FILL, [], max_cells=20)
+        debugger.do_auto_step_fast = True
+        debugger.start_auto_step()
+        wait = 0
+        while wait >= 0:
+            wait, _ = debugger.next(Output())
+        self.assertEqual(debugger.stop_reason, MEMORY_EXHAUSTED)
+        self.assertEqual(len(debugger.assembler.s), 21)
+        self.assertFalse(debugger.do_auto_step_fast)
+
+    def test_resume(self):
+        """Continue stops before every instruction with a breakpoint, in the same state as single steps"""
+        states = self.run_to_end(example_debugger())
+        debugger = example_debugger(checkpoint_interval=4)
+        self.assertIsNone(debugger.toggle_breakpoint(1))  # a comment
+        line = debugger.instructions[4].line_number  # SUBI ACC 1
+        self.assertTrue(debugger.toggle_breakpoint(line))
+        hits = []
+        while not debugger.finished:
+            output = Output()
+            debugger.resume(output)
+            self.assertEqual(state(debugger.assembler), states[debugger.step])
+            if debugger.stop_reason == BREAKPOINT:
+                self.assertEqual(debugger.assembler.pc, 4)
+                self.assertIn(f"breakpoint on line {line}", "".join(output))
+                hits.append(debugger.step)
+        self.assertEqual(hits, [4, 7, 10, 13, 16])
+        self.assertTrue(debugger.terminated)
+        self.assertEqual(debugger.step, len(states) - 1)
+        self.assertFalse(debugger.toggle_breakpoint(line))
+
+        # the timeline reaches the steps that were not recorded
+        debugger.previous(Output())
+        self.assertEqual(state(debugger.assembler), states[-2])
+        debugger.seek(5, Output())
+        self.assertEqual(state(debugger.assembler), states[5])
+
+    def test_resume_errors(self):
+        """Continue reports errors, the end of the file and exceeded limits like single steps"""
+        errors = []
+        instructions = [
+            Instruction(1, "ADDI ACC 1", "addi", ("acc", 1)),
+            Instruction(2, "DIVI ACC 0", "divi", ("acc", 0)),
+        ]
+        debugger = Debugger(
+            Assembler(max_pc=2),
+            False,
+            instructions,
+            [],
+            show_error=lambda title, message: errors.append(message),
+        )
+        debugger.resume(Output())
+        self.assertEqual((debugger.step, debugger.stop_reason), (1, ERROR))
+        self.assertEqual(debugger.assembler.acc, 1)
+        self.assertEqual(len(errors), 1)
+
+        debugger = Debugger(
+            Assembler(max_pc=2),
+            False,
+            instructions[:1],
+            [],
+            show_error=lambda title, message: errors.append(message),
+        )
+        debugger.resume(Output())
+        self.assertEqual((debugger.step, debugger.stop_reason), (1, END_OF_FILE))
+        self.assertTrue(debugger.finished)
+
+        debugger = Debugger(Assembler(max_pc=3), False, FILL, [], max_steps=1000)
+        debugger.start_auto_step()
+        debugger.resume(Output())
+        self.assertEqual(
+            (debugger.step, debugger.stop_reason), (1000, BUDGET_EXHAUSTED)
+        )
+        self.assertEqual(len(debugger.assembler.s), 334)
+
+        interrupt = Event()
+        interrupt.set()
+        debugger.resume(Output(), interrupt)
+        self.assertEqual(debugger.step, 2000)
+        self.assertIsNone(debugger.stop_reason)
+
+    def test_watchpoints(self):
+        """Auto stepping and Continue pause after the instruction that changed a watched cell"""
+        for resume in (False, True):
+            debugger = Debugger(Assembler(max_pc=3, acc=7), False, FILL, [])
+            debugger.watchpoints.add(1000, 1002)
+            output = Output()
+            if resume:
+                debugger.resume(output)
+            else:
+                debugger.do_auto_step_turbo = True
+                wait = 0
+                while wait >= 0:
+                    wait, _ = debugger.run_frame(output)
+            self.assertEqual(debugger.stop_reason, WATCHPOINT)
+            self.assertEqual(debugger.step, 3 * 1000 + 1)
+            self.assertIn(
+                "Watchpoint M[1000] to M[1001] (changes): the instruction 'STOREIN1 ACC 0' on line 1 "
+                "changed M[1000] from 0 to 7",
+                "".join(output),
+            )
+            # the messages and the GUI read the memory without hits
+            self.assertEqual(debugger.watchpoints.hits, dict())
+            self.assertIsNone(debugger.assembler.s.watch)
+
+        # writing 0 into the empty cell M[1001] does not change it
+        debugger.assembler.acc = 0
+        for _ in range(3):
+            debugger.next(Output())
+        self.assertEqual((debugger.step, debugger.stop_reason), (3004, None))
+
+        debugger = example_debugger()
+        debugger.watchpoints.add(10, read=True, write=False)
+        output = debugger.next(Output())[1]
+        self.assertEqual((debugger.step, debugger.stop_reason), (1, WATCHPOINT))
+        self.assertIn("'LOAD ACC 10' on line 11 read M[10] = 5", "".join(output))
+        debugger.watchpoints.clear()
+        debugger.resume(Output())
+        self.assertTrue(debugger.terminated)
+
+    def test_take_changes(self):
+        """take_changes reports every register and memory cell that changed since the last call"""
+        debugger = example_debugger(checkpoint_interval=4)
+        self.assertEqual(debugger.take_changes(), (None, None))
+        states = [state(debugger.assembler)]
+
+        def assert_changes(before: tuple[dict, dict], after: tuple[dict, dict]):
+            registers, addresses = debugger.take_changes()
+            for name, value in after[0].items():
+                if before[0][name] != value:
+                    self.assertIn(REGISTERS[name], registers)
+            for address in before[1].keys() | after[1].keys():
+                if before[1].get(address) != after[1].get(address):
+                    self.assertIn(address, addresses)
+
+        while not debugger.finished:
+            debugger.next(Output())
+            states.append(state(debugger.assembler))
+            assert_changes(states[-2], states[-1])
+        debugger.next(Output())
+        self.assertEqual(debugger.take_changes(), (set(), set()))
+        for _ in range(3):
+            debugger.previous(Output())
+            assert_changes(states.pop(), states[-1])
+        debugger.seek(2, Output())
+        self.assertEqual(debugger.take_changes(), (None, None))
+
+    def test_changes_only(self):
+        """Only changed registers and memory cells are printed, unless the full state is requested"""
+        debugger = example_debugger()
+        debugger.assembler.s[1000] = 5
+        while not debugger.finished:
+            before = state(debugger.assembler)
+            output = "".join(debugger.next(Output())[1])
+            after = state(debugger.assembler)
+            self.assertNotIn("1000: 5", output)
+            for address, value in after[1].items():
+                if before[1].get(address) != value:
+                    self.assertIn(f"{address}: {value}", output)
+            for name, value in after[0].items():
+                if before[0][name] != value:
+                    self.assertIn(f"{name}={value}", output)
+        self.assertIn("1000: 5", "".join(debugger.print_state(Output())))
+
+        output = "".join(debugger.previous(Output()))
+        self.assertIn("Reverted to the previous step.", output)
+        self.assertNotIn("1000: 5", output)
+
+        debugger = example_debugger(full_state=True)
+        debugger.assembler.s[1000] = 5
+        self.assertIn("1000: 5", "".join(debugger.next(Output())[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
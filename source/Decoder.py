@@ -0,0 +1,149 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# The Decoder runs once after the Parser and turns every Instruction into a ready-to-call handler.
+# The handler is a plain closure over the Assembler method of the command, looked up once per command, and the
+# register operands of the instruction:
+#   ADDI ACC 5  ->  function(i, assembler): return addi(assembler, "acc", i)  with i bound to 5
+# So running an instruction needs neither getattr(assembler, command) nor unpacking its arguments. All
+# instructions with the same command and registers share one function, only their integers are bound to it.
+# The semantics of a command stay in Assembler.py and the handler calls its method unchanged, so any Assembler
+# can be decoded without relying on the shape of its source. Specializing the methods themselves is left to the
+# Compiler.
+
+from functools import partial
+from types import MethodType
+from typing import Callable
+from Assembler import Assembler
+from Instruction import Instruction
+
+# Cache of the functions: (assembler class, method name, register operands) -> function
+_function_cache: dict[tuple[type, str, tuple], Callable] = {}
+
+
+def _bind(method: Callable, registers: tuple) -> Callable:
+    """Creates a closure that calls the method with the given register operands
+
+    Args:
+        method (Callable): unbound Assembler method
+        registers (tuple): register of every register operand, None for every integer operand
+
+    Returns:
+        Callable: function(*integer operands, assembler)
+    """
+    integers = registers.count(None)
+    bound = registers[: len(registers) - integers]
+    if None in bound or integers > 1 or len(bound) > 2:
+        # operands in another order, not used by the Assemblers of this project
+
+        def function(*operands):
+            remaining = iter(operands[:-1])
+            return method(
+                operands[-1],
+                *(
+                    register if register is not None else next(remaining)
+                    for register in registers
+                ),
+            )
+
+    elif integers:
+        if len(bound) == 0:
+
+            def function(i, assembler):
+                return method(assembler, i)
+
+        elif len(bound) == 1:
+            (register,) = bound
+
+            def function(i, assembler):
+                return method(assembler, register, i)
+
+        else:
+            first, second = bound
+
+            def function(i, assembler):
+                return method(assembler, first, second, i)
+
+    elif len(bound) == 0:
+        function = method
+    elif len(bound) == 1:
+        (register,) = bound
+
+        def function(assembler):
+            return method(assembler, register)
+
+    else:
+        first, second = bound
+
+        def function(assembler):
+            return method(assembler, first, second)
+
+    return function
+
+
+def decode_command(
+    command: str, registers: tuple, assembler_class: type = Assembler
+) -> Callable:
+    """Creates the function of a command with fixed register operands
+
+    Args:
+        command (str): name of the Assembler method
+        registers (tuple): register of every register operand, None for every integer operand
+        assembler_class (type): class that implements the command
+
+    Returns:
+        Callable: function(*integer operands, assembler) -> bool, shared by all instructions with these registers
+    """
+    key = (assembler_class, command, registers)
+    function = _function_cache.get(key)
+    if function is None:
+        function = _bind(getattr(assembler_class, command), registers)
+        _function_cache[key] = function
+    return function
+
+
+def decode_instruction(
+    instruction: Instruction, assembler_class: type = Assembler
+) -> Callable:
+    """Creates the handler for a single instruction
+
+    Args:
+        instruction (Instruction): instruction with parsed command and arguments
+        assembler_class (type): class that implements the command
+
+    Returns:
+        Callable: handler(assembler) -> bool. Return value is True if the Program Counter needs to be incremented
+    """
+    registers = tuple(
+        argument if isinstance(argument, str) else None
+        for argument in instruction.arguments
+    )
+    integers = tuple(
+        argument for argument in instruction.arguments if not isinstance(argument, str)
+    )
+    function = decode_command(instruction.command, registers, assembler_class)
+    if len(integers) == 1:
+        return MethodType(function, integers[0])
+    if integers:
+        return partial(function, *integers)
+    return function
+
+
+def decode(
+    instructions: list[Instruction], assembler_class: type = Assembler
+) -> list[Instruction]:
+    """Fills instruction.handler of every instruction that has not been decoded yet
+
+    Args:
+        instructions (list[Instruction]): instructions with parsed command and arguments
+        assembler_class (type): class that implements the commands
+
+    Returns:
+        list[Instruction]: decoded instructions
+    """
+    for instruction in instructions:
+        if instruction.handler is None:
+            instruction.handler = decode_instruction(instruction, assembler_class)
+    return instructions
@@ -0,0 +1,91 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import importlib.util
+import os
+import random
+import sys
+from copy import deepcopy
+from Decoder import decode_instruction
+from Instruction import Instruction
+
+
+def load_assembler(directory: str):
+    """Loads Assembler.py of Assembler_TI / Assembler_BS as its own module"""
+    path = os.path.join(os.path.dirname(__file__), directory, "Assembler.py")
+    spec = importlib.util.spec_from_file_location(f"{directory}_Assembler", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(function, *arguments):
+    """Returns (result, error message) of the function call"""
+    try:
+        return (function(*arguments), None)
+    except Exception as e:
+        return (None, str(e))
+
+
+class TestDecoder(unittest.TestCase):
+    def assert_equivalent(self, module):
+        """Decoded handlers must behave exactly like the methods of the Assembler"""
+        random.seed(0)
+        registers = list(module.REGISTERS.values())
+        for command, (method, argument_types) in module.COMMANDS.items():
+            for _ in range(50):
+                arguments = tuple(
+                    (
+                        random.choice(registers)
+                        if kind == "register"
+                        else random.randint(-5, 5)
+                    )
+                    for kind in argument_types
+                )
+                expected = module.Assembler(
+                    s={k: random.randint(-9, 9) for k in range(12)}, max_pc=20
+                )
+                for register in registers:
+                    setattr(expected, register, random.randint(0, 10))
+                actual = deepcopy(expected)
+
+                instruction = Instruction(1, command, method, arguments)
+                handler = decode_instruction(instruction, module.Assembler)
+
+                self.assertEqual(
+                    run(getattr(expected, method), *arguments),
+                    run(handler, actual),
+                    f"{command} {arguments}",
+                )
+                self.assertEqual(expected, actual, f"{command} {arguments}")
+
+    def test_assembler_ti(self):
+        """Test all commands of Assembler_TI"""
+        self.assert_equivalent(load_assembler("Assembler_TI"))
+
+    def test_assembler_bs(self):
+        """Test all commands of Assembler_BS"""
+        self.assert_equivalent(load_assembler("Assembler_BS"))
+
+    def test_register_operands_are_resolved(self):
+        """Two instructions with the same registers share one function"""
+        module = load_assembler("Assembler_BS")
+        first = decode_instruction(
+            Instruction(1, "ADDI ACC 1", "addi", ("acc", 1)), module.Assembler
+        )
+        second = decode_instruction(
+            Instruction(2, "ADDI ACC 7", "addi", ("acc", 7)), module.Assembler
+        )
+        self.assertIs(first.__func__, second.__func__)
+        assembler = module.Assembler()
+        self.assertTrue(first(assembler))
+        self.assertTrue(second(assembler))
+        self.assertEqual(assembler.acc, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,532 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Headless execution of Reti programs. Nothing in here needs a Tk root, so it can be used in CI and grading jobs:
+#   python Engine.py program.txt [memory.json] [--max-steps N] [--max-seconds S] [--max-cells N] [--compile]
+#                    [--no-cache] [--no-loop-detection]
+# prints the final state of the machine as JSON.
+# Runs stop as soon as the machine reaches a state it was in before (see LoopDetector.py), so programs that never
+# terminate don't hang a batch job. Programs of students can be run with limits on the number of instructions,
+# the wall time and the number of written memory cells. The instruction budget is exact, the other limits are
+# checked by the Watchdog every WATCHDOG_INTERVAL instructions: the interpreter computes the instructions in
+# chunks of that size, so the limits cost nothing per instruction.
+# An instruction that raises an error may already have changed a register or a memory cell. Like the Debugger,
+# a run reverts it: it keeps the state it started with and computes the steps before the error again (see
+# rollback()). That costs a copy of the initial memory per run, nothing per instruction and, only for runs that
+# end with an error, computing the run a second time.
+
+from argparse import ArgumentParser
+from collections.abc import Mapping
+from dataclasses import dataclass, field, asdict
+from json import dumps
+import sys
+from time import perf_counter
+from Assembler import Assembler
+from Instruction import Instruction
+from Decoder import decode
+from Compiler import CompiledProgram, CompiledError
+from LoopDetector import LoopDetector, CHECK_INTERVAL
+from Memory import PagedMemory
+from Parser import InstructionParser, create_memory
+from ParseCache import ParseCache
+
+# Reasons why a run stopped
+TERMINATED = "terminated"  # TERMINATE instruction was computed
+# Program Counter left the program without reaching TERMINATE
+END_OF_FILE = "end_of_file"
+BUDGET_EXHAUSTED = "budget_exhausted"  # max_steps instructions were computed
+ERROR = "error"  # the Assembler raised an exception
+LOOP = "loop"  # the machine reached the same state again, it would never terminate
+TIME_EXHAUSTED = "time_exhausted"  # the run took longer than max_seconds
+MEMORY_EXHAUSTED = "memory_exhausted"  # more than max_cells memory cells were written
+
+# Number of instructions between two checks of the Watchdog
+WATCHDOG_INTERVAL = 1024
+
+
+@dataclass
+class RunResult:
+    # one of TERMINATED, END_OF_FILE, BUDGET_EXHAUSTED, ERROR, LOOP, TIME_EXHAUSTED, MEMORY_EXHAUSTED
+    reason: str
+    steps: int  # number of computed instructions
+    # Register Name -> value and final memory. For ERROR the state before the instruction that raised the error.
+    registers: dict[str, int] = field(default_factory=dict)
+    memory: dict[int, int] = field(default_factory=dict)
+    # error message if reason is ERROR, the loop if reason is LOOP, the exceeded limit for TIME/MEMORY_EXHAUSTED
+    message: str = ""
+    line_number: int | None = None  # line of the last computed instruction
+
+
+@dataclass
+class Watchdog:
+    """Limits on the wall time and on the number of written memory cells of a run, None for no limit"""
+
+    max_seconds: float | None = None
+    max_cells: int | None = None
+    # populated memory cells when the run started. Only cells beyond them count against max_cells, so the
+    # initial memory (and the cells of its regions) does not use up the limit.
+    cells: int = 0
+    started: float = field(default_factory=perf_counter)
+
+    @property
+    def active(self) -> bool:
+        return self.max_seconds is not None or self.max_cells is not None
+
+    def stop(self, steps: int, budget: int) -> int:
+        """Number of steps at which the interpreter has to stop for the next check
+
+        Args:
+            steps (int): number of steps computed so far
+            budget (int): instruction budget, -1 for no limit
+
+        Returns:
+            int: steps of the next check, the budget if it comes first or nothing has to be checked
+        """
+        if not self.active:
+            return budget
+        if budget < 0:
+            return steps + WATCHDOG_INTERVAL
+        return min(budget, steps + WATCHDOG_INTERVAL)
+
+    def exceeded(self, memory: Mapping) -> tuple[str, str] | None:
+        """Checks the limits
+
+        Args:
+            memory (Mapping): memory of the run
+
+        Returns:
+            tuple[str, str] | None: reason and message of the exceeded limit, None if no limit is exceeded
+        """
+        if self.max_seconds is not None:
+            seconds = perf_counter() - self.started
+            if seconds > self.max_seconds:
+                return (
+                    TIME_EXHAUSTED,
+                    f"Time Limit: the program ran for {seconds:.2f} seconds, the limit is {self.max_seconds} seconds.\n",
+                )
+        if self.max_cells is not None:
+            written = len(memory) - self.cells
+            if written > self.max_cells:
+                return (
+                    MEMORY_EXHAUSTED,
+                    f"Memory Limit: the program wrote {written} new memory cells, the limit is {self.max_cells} cells.\n",
+                )
+        return None
+
+    def remaining_cells(self, memory: Mapping) -> int | None:
+        """New memory cells left until the memory limit, None for no limit"""
+        if self.max_cells is None:
+            return None
+        return max(0, self.max_cells - (len(memory) - self.cells))
+
+    def remaining(self) -> float | None:
+        """Seconds left until the time limit, None for no limit"""
+        if self.max_seconds is None:
+            return None
+        return self.max_seconds - (perf_counter() - self.started)
+
+
+def load_program(
+    path: str,
+    expect_semicolon: bool = True,
+    case_sensitive: bool = False,
+    cache: ParseCache | None = None,
+) -> InstructionParser:
+    """Parses and decodes the program at path, just like StartGUI does
+
+    Args:
+        path (str): filepath of the program
+        expect_semicolon (bool): check that every instruction ends with a semicolon
+        case_sensitive (bool): parse commands and registers case sensitive
+        cache (ParseCache | None): cache of parsed programs, None to always parse
+
+    Returns:
+        InstructionParser: parser that holds the decoded instructions and the raw text
+    """
+    parser = InstructionParser(expect_semicolon, case_sensitive)
+    parser.parse(path, cache)
+    return parser
+
+
+def execute(
+    assembler: Assembler,
+    instructions: list[Instruction],
+    max_steps: int | None = None,
+    compiled: bool = False,
+    detect_loops: bool = True,
+    max_seconds: float | None = None,
+    max_cells: int | None = None,
+) -> RunResult:
+    """Computes instructions on the assembler until TERMINATE, End-Of-File, an error, an infinite loop or a
+    limit is reached
+
+    Args:
+        assembler (Assembler): assembler to run on. Will be modified.
+        instructions (list[Instruction]): parsed program
+        max_steps (int | None): instruction budget, None for no limit
+        compiled (bool): compile the program into basic blocks instead of interpreting every instruction
+        detect_loops (bool): stop when the machine reaches a state it was in before. Needs a PagedMemory.
+        max_seconds (float | None): wall time limit, None for no limit
+        max_cells (int | None): limit of written memory cells, None for no limit
+
+    Returns:
+        RunResult: reason for stopping and final state of the machine
+    """
+    if compiled:
+        program = CompiledProgram(instructions, type(assembler))
+        return execute_compiled(
+            assembler, program, max_steps, detect_loops, max_seconds, max_cells
+        )
+
+    decode(instructions, type(assembler))
+    terminate = sys.modules[type(assembler).__module__].TERMINATE
+    handlers = [instruction.handler for instruction in instructions]
+    terminates = [instruction.line_raw in terminate for instruction in instructions]
+    length = len(instructions)
+    assembler.max_pc = length
+    budget = -1 if max_steps is None else max_steps
+    loops = loop_detector(assembler, instructions, detect_loops)
+    countdown = CHECK_INTERVAL  # backward jumps until the next loop check
+    watchdog = Watchdog(max_seconds, max_cells, len(assembler.s))
+    start = snapshot(assembler)
+
+    steps = 0
+    last = None  # index of the last computed instruction
+    reason = None
+    message = ""
+    while reason is None:
+        stop = watchdog.stop(steps, budget)
+        while steps != stop:
+            pc = assembler.pc
+            try:
+                if not 0 <= pc < length:
+                    reason = END_OF_FILE
+                    break
+                handler = handlers[pc]
+            except TypeError:
+                reason = ERROR
+                message = invalid_program_counter(assembler)
+                break
+            last = pc
+            try:
+                if handler(assembler):
+                    assembler.pc += 1
+            except Exception as e:
+                reason = ERROR
+                message = str(e)
+                rollback(assembler, instructions, start, steps)
+                break
+            steps += 1
+            if terminates[pc]:
+                reason = TERMINATED
+                break
+            if loops is not None:
+                try:
+                    jumped_back = assembler.pc <= pc
+                except TypeError:
+                    jumped_back = False  # the next fetch reports the invalid Program Counter
+                if jumped_back:
+                    countdown -= 1
+                    if countdown == 0:
+                        countdown = CHECK_INTERVAL
+                        loop = loops.check(assembler, steps)
+                        if loop is not None:
+                            reason = LOOP
+                            message = str(loop)
+                            break
+        else:
+            if steps == budget:
+                reason = BUDGET_EXHAUSTED
+            else:
+                exceeded = watchdog.exceeded(assembler.s)
+                if exceeded is not None:
+                    reason, message = exceeded
+
+    if reason == BUDGET_EXHAUSTED:
+        reason, message = outside_program(assembler, length) or (reason, message)
+
+    if loops is not None:
+        loops.reset()
+    return result(assembler, instructions, reason, steps, last, message)
+
+
+def execute_compiled(
+    assembler: Assembler,
+    program: CompiledProgram,
+    max_steps: int | None = None,
+    detect_loops: bool = True,
+    max_seconds: float | None = None,
+    max_cells: int | None = None,
+) -> RunResult:
+    """Same as execute(), but computes whole basic blocks of the compiled program at once
+
+    Args:
+        assembler (Assembler): assembler to run on. Will be modified.
+        program (CompiledProgram): compiled program. Can be reused for several runs.
+        max_steps (int | None): instruction budget, None for no limit
+        detect_loops (bool): stop when the machine reaches a state it was in before. Needs a PagedMemory.
+        max_seconds (float | None): wall time limit, None for no limit
+        max_cells (int | None): limit of written memory cells, None for no limit
+
+    Returns:
+        RunResult: reason for stopping and final state of the machine
+    """
+    instructions = program.instructions
+    blocks = program.blocks
+    length = len(instructions)
+    assembler.max_pc = length
+    remaining = -1 if max_steps is None else max_steps
+    loops = loop_detector(assembler, instructions, detect_loops)
+    countdown = CHECK_INTERVAL
+    watchdog = Watchdog(max_seconds, max_cells, len(assembler.s))
+    check = WATCHDOG_INTERVAL if watchdog.active else -1  # steps of the next check
+    start = snapshot(assembler)
+
+    steps = 0
+    last = None
+    reason = BUDGET_EXHAUSTED
+    message = ""
+    while remaining != 0:
+        pc = assembler.pc
+        try:
+            if not 0 <= pc < length:
+                reason = END_OF_FILE
+                break
+            block = blocks.get(pc) or program.block(pc)
+        except TypeError:
+            reason = ERROR
+            message = invalid_program_counter(assembler)
+            break
+        if 0 <= remaining < block.length:
+            # Not enough budget left for the whole block: compute the rest one instruction at a time
+            if loops is not None:
+                loops.reset()
+            rest = execute(
+                assembler,
+                instructions,
+                remaining,
+                False,
+                detect_loops,
+                watchdog.remaining(),
+                watchdog.remaining_cells(assembler.s),
+            )
+            rest.steps += steps
+            return rest
+        try:
+            block.function(assembler)
+        except CompiledError as e:
+            steps += e.index - block.entry
+            last = e.index
+            reason = ERROR
+            message = str(e.error)
+            rollback(assembler, instructions, start, steps)
+            break
+        steps += block.length
+        remaining -= block.length if remaining > 0 else 0
+        last = block.entry + block.length - 1
+        if block.terminates:
+            reason = TERMINATED
+            break
+        if loops is not None:
+            try:
+                jumped_back = assembler.pc <= last
+            except TypeError:
+                jumped_back = False  # the next fetch reports the invalid Program Counter
+            if jumped_back:
+                countdown -= 1
+                if countdown == 0:
+                    countdown = CHECK_INTERVAL
+                    loop = loops.check(assembler, steps)
+                    if loop is not None:
+                        reason = LOOP
+                        message = str(loop)
+                        break
+        if 0 <= check <= steps:
+            check = steps + WATCHDOG_INTERVAL
+            exceeded = watchdog.exceeded(assembler.s)
+            if exceeded is not None:
+                reason, message = exceeded
+                break
+
+    if reason == BUDGET_EXHAUSTED:
+        reason, message = outside_program(assembler, length) or (reason, message)
+
+    if loops is not None:
+        loops.reset()
+    return result(assembler, instructions, reason, steps, last, message)
+
+
+def loop_detector(
+    assembler: Assembler, instructions: list[Instruction], detect_loops: bool
+) -> LoopDetector | None:
+    """Loop detector for a run on the assembler, None if loops are not detected"""
+    if detect_loops and isinstance(assembler.s, PagedMemory):
+        return LoopDetector(instructions, type(assembler))
+    return None
+
+
+def snapshot(assembler: Assembler) -> tuple[dict[str, int], Mapping]:
+    """Copy of the registers (member variable -> value) and the memory of the assembler"""
+    registers = sys.modules[type(assembler).__module__].REGISTERS
+    return (
+        {attribute: getattr(assembler, attribute) for attribute in registers.values()},
+        assembler.s.copy(),
+    )
+
+
+def rollback(
+    assembler: Assembler,
+    instructions: list[Instruction],
+    start: tuple[dict[str, int], Mapping],
+    steps: int,
+) -> None:
+    """Reverts the instruction that raised an error: restores the state the run started with and computes the
+    steps before the error again. The steps computed the same before, so they raise no error.
+
+    Args:
+        assembler (Assembler): assembler of the run
+        instructions (list[Instruction]): program that was run
+        start (tuple[dict[str, int], Mapping]): snapshot() at the start of the run
+        steps (int): number of steps computed before the error
+    """
+    registers, memory = start
+    for attribute, value in registers.items():
+        setattr(assembler, attribute, value)
+    assembler.s = memory
+    for _ in range(steps):
+        if instructions[assembler.pc].handler(assembler):
+            assembler.pc += 1
+    assembler.message = ""
+    assembler.debug_message = ""
+
+
+def outside_program(assembler: Assembler, length: int) -> tuple[str, str] | None:
+    """Reason and message if the Program Counter is no index of an instruction: END_OF_FILE after the end of the
+    program, ERROR if it is no integer. None if the run can go on.
+    """
+    try:
+        if not 0 <= assembler.pc < length:
+            return (END_OF_FILE, "")
+        range(length)[assembler.pc]  # only integers are indices
+    except TypeError:
+        return (ERROR, invalid_program_counter(assembler))
+    return None
+
+
+def invalid_program_counter(assembler: Assembler) -> str:
+    """Error message for a Program Counter that is not an integer"""
+    return f"Runtime Error: Program Counter {assembler.pc!r} is not a valid instruction index."
+
+
+def result(
+    assembler: Assembler,
+    instructions: list[Instruction],
+    reason: str,
+    steps: int,
+    last: int | None,
+    message: str,
+) -> RunResult:
+    """Collects the final state of the machine into a RunResult
+
+    Args:
+        assembler (Assembler): assembler after the run
+        instructions (list[Instruction]): program that was run
+        reason (str): reason for stopping
+        steps (int): number of computed instructions
+        last (int | None): index of the last computed instruction
+        message (str): error message
+
+    Returns:
+        RunResult: result of the run
+    """
+    registers = sys.modules[type(assembler).__module__].REGISTERS
+    return RunResult(
+        reason,
+        steps,
+        {name: getattr(assembler, attribute) for name, attribute in registers.items()},
+        dict(sorted(assembler.s.items())),
+        message,
+        instructions[last].line_number if last is not None else None,
+    )
+
+
+def run(
+    instructions: list[Instruction],
+    memory: dict[int, int] | None = None,
+    max_steps: int | None = None,
+    compiled: bool = False,
+    detect_loops: bool = True,
+    max_seconds: float | None = None,
+    max_cells: int | None = None,
+) -> RunResult:
+    """Runs a parsed program on a fresh Assembler
+
+    Args:
+        instructions (list[Instruction]): parsed program
+        memory (dict[int, int] | None): initial memory, None for an empty memory
+        max_steps (int | None): instruction budget, None for no limit
+        compiled (bool): compile the program into basic blocks instead of interpreting every instruction
+        detect_loops (bool): stop when the machine reaches a state it was in before
+        max_seconds (float | None): wall time limit, None for no limit
+        max_cells (int | None): limit of written memory cells, None for no limit
+
+    Returns:
+        RunResult: reason for stopping and final state of the machine
+    """
+    assembler = Assembler(s=PagedMemory(memory or ()))
+    return execute(
+        assembler,
+        instructions,
+        max_steps,
+        compiled,
+        detect_loops,
+        max_seconds,
+        max_cells,
+    )
+
+
+if __name__ == "__main__":
+    arguments = ArgumentParser(description="Runs a Reti program without GUI")
+    arguments.add_argument("program", help="program file (.txt)")
+    arguments.add_argument("memory", nargs="?", default="", help="memory file (.json)")
+    arguments.add_argument("--max-steps", type=int, default=None)
+    arguments.add_argument(
+        "--max-seconds", type=float, default=None, help="wall time limit of the run"
+    )
+    arguments.add_argument(
+        "--max-cells", type=int, default=None, help="limit of written memory cells"
+    )
+    arguments.add_argument("--no-semicolon", action="store_true")
+    arguments.add_argument("--case-sensitive", action="store_true")
+    arguments.add_argument(
+        "--compile", action="store_true", help="compile the program into basic blocks"
+    )
+    arguments.add_argument(
+        "--no-cache", action="store_true", help="always parse, skip the parse cache"
+    )
+    arguments.add_argument(
+        "--no-loop-detection",
+        action="store_true",
+        help="don't stop when the machine reaches a state it was in before",
+    )
+    options = arguments.parse_args()
+
+    parser = load_program(
+        options.program,
+        not options.no_semicolon,
+        options.case_sensitive,
+        None if options.no_cache else ParseCache(),
+    )
+    memory, _ = create_memory(options.memory)
+    result = run(
+        parser.instructions,
+        memory,
+        options.max_steps,
+        options.compile,
+        not options.no_loop_detection,
+        options.max_seconds,
+        options.max_cells,
+    )
+    print(dumps(asdict(result)))
@@ -0,0 +1,172 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import os
+import unittest
+from Assembler import Assembler
+from Debugger import Debugger
+from Engine import (
+    execute,
+    load_program,
+    run,
+    TERMINATED,
+    END_OF_FILE,
+    ERROR,
+    BUDGET_EXHAUSTED,
+    TIME_EXHAUSTED,
+    MEMORY_EXHAUSTED,
+    WATCHDOG_INTERVAL,
+)
+from Debugger_Test import Output, example_debugger, state
+from Instruction import Instruction
+from Parser import create_memory
+
+# Writes the cells 0, 1, 2, ... forever
+FILL = [
+    Instruction(1, "STOREIN1 ACC 0", "storein1", ("acc", 0)),
+    Instruction(2, "ADDI IN1 1", "addi", ("in1", 1)),
+    Instruction(3, "JUMP -2", "jump", (-2,)),
+]
+# Counts up in M[5]
+COUNTER = [
+    Instruction(1, "LOAD ACC 5", "load", ("acc", 5)),
+    Instruction(2, "ADDI ACC 1", "addi", ("acc", 1)),
+    Instruction(3, "STORE ACC 5", "store", ("acc", 5)),
+    Instruction(4, "LOADI ACC 0", "loadi", ("acc", 0)),
+    Instruction(5, "JUMP -4", "jump", (-4,)),
+]
+
+# Writes 7 into M[IN1] with IN1 = -1, which is out of range
+OUT_OF_RANGE = [
+    Instruction(1, "LOADI ACC 7", "loadi", ("acc", 7)),
+    Instruction(2, "LOADI IN1 -1", "loadi", ("in1", -1)),
+    Instruction(3, "STOREIN1 ACC 0", "storein1", ("acc", 0)),
+]
+
+
+class TestEngine(unittest.TestCase):
+    def test_terminate(self):
+        """The faculty example of Assembler_BS ends in the same state as the Debugger"""
+        debugger = example_debugger()
+        while not debugger.finished:
+            debugger.next(Output())
+        registers, memory = state(debugger.assembler)
+
+        directory = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+        parser = load_program(os.path.join(directory, "Example.txt"), False)
+        for compiled in (False, True):
+            storage, _ = create_memory(
+                os.path.join(directory, "Example_Storage.json")
+            )
+            result = execute(Assembler(s=storage), parser.instructions, None, compiled)
+            self.assertEqual(result.reason, TERMINATED)
+            self.assertEqual(result.steps, debugger.step)
+            self.assertEqual(result.registers, registers)
+            self.assertEqual(result.memory, memory)
+            self.assertEqual(result.line_number, parser.instructions[-1].line_number)
+
+    def test_end_of_file(self):
+        for compiled in (False, True):
+            result = run(OUT_OF_RANGE[:2], None, None, compiled)
+            self.assertEqual(result.reason, END_OF_FILE)
+            self.assertEqual((result.steps, result.line_number), (2, 2))
+            self.assertEqual(result.registers["PC"], 2)
+
+    def test_error(self):
+        """The instruction that raised the error is reverted, like in the Debugger"""
+        debugger = Debugger(
+            Assembler(max_pc=3), False, OUT_OF_RANGE, [], show_error=lambda *_: None
+        )
+        for _ in range(3):
+            debugger.next(Output())
+        self.assertEqual(debugger.stop_reason, ERROR)
+        registers, memory = state(debugger.assembler)
+        for compiled in (False, True):
+            result = run(OUT_OF_RANGE, None, None, compiled)
+            self.assertEqual(result.reason, ERROR)
+            self.assertIn("Memory Address -1 out of range", result.message)
+            self.assertEqual((result.steps, result.line_number), (2, 3))
+            self.assertEqual(result.registers, registers)
+            self.assertEqual(result.memory, memory)
+            self.assertEqual(result.memory, dict())
+
+    def test_type_errors(self):
+        """A TypeError of an instruction keeps its message, only an invalid Program Counter is reported as such"""
+
+        def broken(assembler: Assembler) -> bool:
+            raise TypeError("broken handler")
+
+        def jump_away(assembler: Assembler) -> bool:
+            assembler.pc = "away"
+            return False
+
+        increment = Instruction(1, "ADDI ACC 1", "addi", ("acc", 1))
+        for handler, text in ((broken, "broken handler"), (jump_away, "'away'")):
+            instruction = Instruction(2, "NOP", "nop", (), handler)
+            result = run([increment, instruction], None, None)
+            steps = 2 if handler is jump_away else 1
+            self.assertEqual((result.reason, result.steps), (ERROR, steps))
+            self.assertIn(text, result.message)
+            self.assertEqual("Program Counter" in result.message, handler is jump_away)
+
+    def test_max_steps(self):
+        """A run stops after max_steps instructions with the state of that step"""
+        for compiled in (False, True):
+            for max_steps in (0, 1, 2, 7):
+                result = run(COUNTER, None, max_steps, compiled, detect_loops=False)
+                self.assertEqual(result.reason, BUDGET_EXHAUSTED)
+                self.assertEqual(result.steps, max_steps)
+                self.assertEqual(result.registers["PC"], max_steps % 5)
+
+
+class TestLimits(unittest.TestCase):
+    def test_time_limit(self):
+        """A run that takes too long stops with TIME_EXHAUSTED, interpreted and compiled alike"""
+        for compiled in (False, True):
+            result = run(COUNTER, None, None, compiled, max_seconds=0.05)
+            self.assertEqual(result.reason, TIME_EXHAUSTED)
+            self.assertIn("Time Limit", result.message)
+            self.assertGreater(result.memory[5], 0)
+
+    def test_memory_limit(self):
+        """A run that writes too many cells stops with MEMORY_EXHAUSTED soon after the limit"""
+        for compiled in (False, True):
+            result = run(FILL, None, None, compiled, max_cells=3000)
+            self.assertEqual(result.reason, MEMORY_EXHAUSTED)
+            self.assertIn("3000 cells", result.message)
+            self.assertGreater(len(result.memory), 3000)
+            self.assertLess(len(result.memory), 3000 + WATCHDOG_INTERVAL)
+
+    def test_initial_memory(self):
+        """Only cells the program writes count against the memory limit, not the initial memory"""
+        initial = {10**6 + address: 1 for address in range(5000)}
+        count = [
+            Instruction(1, "ADDI ACC 1", "addi", ("acc", 1)),
+            Instruction(2, "JUMP -1", "jump", (-1,)),
+        ]
+        for compiled in (False, True):
+            result = run(count, dict(initial), 30000, compiled, max_cells=1000)
+            self.assertEqual((result.reason, result.steps), (BUDGET_EXHAUSTED, 30000))
+
+            result = run(FILL, dict(initial), None, compiled, max_cells=3000)
+            self.assertEqual(result.reason, MEMORY_EXHAUSTED)
+            written = len(result.memory) - len(initial)
+            self.assertGreater(written, 3000)
+            self.assertLess(written, 3000 + WATCHDOG_INTERVAL)
+            self.assertIn(f"wrote {written} new memory cells", result.message)
+
+    def test_budget_first(self):
+        """The instruction budget is exact, also with the other limits"""
+        for compiled in (False, True):
+            for max_steps in (0, 1, WATCHDOG_INTERVAL, 5000):
+                result = run(
+                    FILL, None, max_steps, compiled, max_seconds=60, max_cells=10**6
+                )
+                self.assertEqual(result.reason, BUDGET_EXHAUSTED)
+                self.assertEqual(result.steps, max_steps)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Runs the auto step of the Debugger on a worker thread, so computing instructions never blocks the Tk main loop.
+# After every frame (see Debugger.run_frame) the worker puts a small Snapshot of the machine into a SimpleQueue.
+# The GUI drains the queue with root.after and only shows the latest snapshot. Tk may only be used from the main
+# thread, so the worker never touches a widget: status messages and errors are passed along in the snapshots.
+# While the worker runs, it owns the Debugger. stop() only sets the interrupt and never waits for the worker: it
+# stops after the instruction it is computing (Continue within Debugger.INTERRUPT_INTERVAL instructions) and
+# posts a last snapshot. The Debugger belongs to the GUI again once drain() returned that snapshot.
+# Continue (see Debugger.resume) runs on the worker as well, but posts a single snapshot of the final state.
+
+from dataclasses import dataclass, field
+from queue import SimpleQueue, Empty
+from threading import Thread, Event
+from Assembler import REGISTERS
+from Debugger import Debugger, MessageBuffer
+from Memory import MemoryWindow
+
+
+@dataclass
+class Snapshot:
+    step: int  # position on the timeline
+    executed: int  # end of the timeline
+    line: int | None  # line number of the next instruction, None if the program is finished
+    registers: dict[str, int]  # member variable of the register -> value
+    # rank of the first cell, number of written cells, (address, value) of the cells in the memory window
+    window: tuple[int, int, list[tuple[int, int]]]
+    # registers (member variables) and addresses changed since the last snapshot, None if anything may have changed
+    changed_registers: set[str] | None
+    changed_addresses: set[int] | None
+    messages: list[str] = field(default_factory=list)  # status messages of the frame
+    errors: list[tuple[str, str]] = field(default_factory=list)  # (title, message)
+    done: bool = False  # the worker stopped, the GUI may use the Debugger again
+    # why the Debugger stopped on its own (see Debugger.stop_reason), None if it did not
+    stop_reason: str | None = None
+
+
+class Executor:
+    """Computes the steps of a Debugger on a worker thread and posts snapshots to the GUI"""
+
+    def __init__(self, debugger: Debugger) -> None:
+        """
+        Args:
+            debugger (Debugger): debugger to compute the steps of
+        """
+        self.debugger = debugger
+        self.queue: SimpleQueue[Snapshot] = SimpleQueue()
+        self.interrupt = Event()
+        self.thread: Thread | None = None
+        # the worker continues to the next breakpoint instead of computing frames
+        self.resume = False
+        # cells of the memory browser, copied into the snapshots. The GUI may move it while the worker runs.
+        self.window = MemoryWindow(0)
+
+    @property
+    def running(self) -> bool:
+        """True from start() until drain() returned the last snapshot of the worker, the GUI must not use the
+        Debugger in between
+        """
+        return self.thread is not None
+
+    def start(
+        self, window: MemoryWindow | None = None, resume: bool = False
+    ) -> None:
+        """Starts computing steps on the worker thread until the program finishes, an error occurs or stop() is called
+
+        Args:
+            window (MemoryWindow | None): window of the memory browser, None for no memory cells in the snapshots
+            resume (bool): continue to the next breakpoint instead of auto step turbo
+        """
+        if self.running:
+            return
+        self.window = window or MemoryWindow(0)
+        self.interrupt.clear()
+        self.resume = resume
+        self.debugger.do_auto_step_turbo = not resume
+        self.debugger.start_auto_step()
+        self.thread = Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Interrupts the worker without waiting for it. It is still running until drain() returns its last
+        snapshot.
+        """
+        if self.running:
+            self.interrupt.set()
+        else:
+            self.debugger.stop_auto_step()
+
+    def work(self) -> None:
+        """Body of the worker thread"""
+        errors: list[tuple[str, str]] = []
+        show_error = self.debugger.show_error
+        self.debugger.show_error = lambda title, message: errors.append(
+            (title, message)
+        )
+        try:
+            if self.resume:
+                messages = MessageBuffer()
+                self.debugger.resume(messages, self.interrupt)
+                self.queue.put(self.snapshot(messages, errors))
+                errors.clear()
+                return
+            wait = 0
+            while wait >= 0 and not self.interrupt.is_set():
+                messages = MessageBuffer()
+                wait, _ = self.debugger.run_frame(messages, self.interrupt)
+                self.queue.put(self.snapshot(messages, errors))
+                errors.clear()
+        finally:
+            self.debugger.show_error = show_error
+            self.queue.put(self.snapshot([], errors, done=True))
+
+    def snapshot(
+        self, messages: list[str], errors: list[tuple[str, str]], done: bool = False
+    ) -> Snapshot:
+        """Copies the values the GUI shows
+
+        Args:
+            messages (list[str]): status messages since the last snapshot
+            errors (list[tuple[str, str]]): errors since the last snapshot
+            done (bool): this is the last snapshot of the worker
+
+        Returns:
+            Snapshot: snapshot of the Debugger
+        """
+        debugger = self.debugger
+        assembler = debugger.assembler
+        return Snapshot(
+            debugger.step,
+            debugger.executed,
+            (
+                None
+                if debugger.finished
+                else debugger.instructions[assembler.pc].line_number
+            ),
+            {attr: getattr(assembler, attr) for attr in REGISTERS.values()},
+            self.window.read(assembler.s),
+            *debugger.take_changes(),
+            messages,
+            list(errors),
+            done,
+            debugger.stop_reason,
+        )
+
+    def drain(self) -> list[Snapshot]:
+        """Takes all snapshots the worker posted so far out of the queue, never blocks.
+        After the last snapshot of the worker, the Debugger can be used again.
+
+        Returns:
+            list[Snapshot]: snapshots, oldest first
+        """
+        snapshots = []
+        while True:
+            try:
+                snapshot = self.queue.get_nowait()
+            except Empty:
+                return snapshots
+            snapshots.append(snapshot)
+            if snapshot.done:
+                # the worker put its last snapshot, it does not touch the Debugger anymore
+                self.thread = None
+                self.debugger.stop_auto_step()
+
+
+def merge_changes(
+    snapshots: list[Snapshot],
+) -> tuple[set[str] | None, set[int] | None]:
+    """Registers and memory cells that changed in any of the snapshots
+
+    Args:
+        snapshots (list[Snapshot]): consecutive snapshots
+
+    Returns:
+        tuple[set[str] | None, set[int] | None]: member variables of the changed registers, addresses of the changed
+            memory cells. None if anything may have changed.
+    """
+    registers: set[str] | None = set()
+    addresses: set[int] | None = set()
+    for snapshot in snapshots:
+        if registers is not None and snapshot.changed_registers is not None:
+            registers |= snapshot.changed_registers
+        else:
+            registers = None
+        if addresses is not None and snapshot.changed_addresses is not None:
+            addresses |= snapshot.changed_addresses
+        else:
+            addresses = None
+    return (registers, addresses)
@@ -0,0 +1,113 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+from time import perf_counter, sleep
+from Assembler import Assembler, COMMANDS
+from Debugger import Debugger, BREAKPOINT, INTERRUPT_INTERVAL
+from Debugger_Test import example_debugger, state, Output
+from Executor import Executor, Snapshot
+from Instruction import Instruction
+from Memory import PagedMemory, MemoryWindow
+
+
+def endless_debugger(**options) -> Debugger:
+    """Debugger for a program that counts up ACC forever"""
+    instructions = [
+        Instruction(1, "ADDI ACC 1", COMMANDS["ADDI"][0], ("acc", 1)),
+        Instruction(2, "JUMP -1", COMMANDS["JUMP"][0], (-1,)),
+    ]
+    assembler = Assembler(s=PagedMemory())
+    assembler.max_pc = len(instructions)
+    return Debugger(assembler, False, instructions, [], frame_budget=1, **options)
+
+
+def wait_until_stopped(executor: Executor) -> list[Snapshot]:
+    """Drains the snapshots like the GUI does until the worker stopped"""
+    snapshots = []
+    while executor.running:
+        snapshots += executor.drain()
+        sleep(0.001)
+    return snapshots
+
+
+class TestExecutor(unittest.TestCase):
+    def test_run_to_end(self):
+        """The worker reaches the same state as single steps and posts a last snapshot"""
+        debugger = example_debugger()
+        while not debugger.finished:
+            debugger.next(Output())
+        expected = state(debugger.assembler)
+
+        debugger = example_debugger()
+        executor = Executor(debugger)
+        executor.start(MemoryWindow(3))
+        executor.thread.join()
+        snapshots = executor.drain()
+        executor.stop()
+        self.assertTrue(snapshots[-1].done)
+        self.assertIsNone(snapshots[-1].line)
+        first, total, cells = snapshots[-1].window
+        self.assertEqual(total, len(expected[1]))
+        self.assertEqual(first, 0)
+        self.assertEqual(cells, [(10, 5), (20, 120), (21, 0)])
+        self.assertEqual(state(debugger.assembler), expected)
+        self.assertIn("Terminate Instruction", "".join(m for s in snapshots for m in s.messages))
+
+    def test_stop(self):
+        """stop() interrupts an endless program, afterwards the Debugger can be used again"""
+        debugger = endless_debugger()
+        executor = Executor(debugger)
+        executor.start()
+        while executor.queue.empty():
+            pass  # wait for the first frame
+        executor.stop()  # does not wait for the worker
+        snapshots = wait_until_stopped(executor)
+        self.assertFalse(debugger.do_auto_step_turbo)
+        self.assertTrue(snapshots[-1].done)
+        step = debugger.step
+        self.assertGreater(step, 0)
+        self.assertEqual(snapshots[-1].step, step)
+        self.assertEqual(debugger.assembler.acc, (step + 1) // 2)
+
+        debugger.previous(Output())
+        self.assertEqual(debugger.step, step - 1)
+        debugger.next(Output())
+        self.assertEqual(debugger.step, step)
+
+    def test_interrupt_resume(self):
+        """Continue stops soon after stop(), also if the checkpoints are far apart"""
+        debugger = endless_debugger(checkpoint_interval=10**9)
+        executor = Executor(debugger)
+        executor.start(resume=True)
+        sleep(0.05)
+        stopped = perf_counter()
+        executor.stop()
+        snapshots = wait_until_stopped(executor)
+        self.assertLess(perf_counter() - stopped, 1)
+        self.assertEqual(len(snapshots), 2)
+        self.assertGreater(debugger.step, 0)
+        self.assertEqual(debugger.step % INTERRUPT_INTERVAL, 0)
+        self.assertIn("then paused", "".join(snapshots[0].messages))
+
+    def test_resume(self):
+        """Continue posts the final state only, at the breakpoint"""
+        debugger = endless_debugger()
+        debugger.toggle_breakpoint(2)
+        executor = Executor(debugger)
+        for step in (1, 3):
+            executor.start(resume=True)
+            executor.thread.join()
+            snapshots = executor.drain()
+            executor.stop()
+            self.assertEqual(len(snapshots), 2)
+            self.assertEqual((snapshots[0].step, snapshots[0].line), (step, 2))
+            self.assertEqual(snapshots[0].stop_reason, BREAKPOINT)
+            self.assertTrue(snapshots[1].done)
+        self.assertFalse(debugger.do_auto_step_turbo)
+
+
+if __name__ == "__main__":
+    unittest.main()
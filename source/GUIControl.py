@@ -8,6 +8,7 @@ from Assembler import Assembler
 from Debugger import Debugger
 from DebuggerGUI import DebuggerGUI
 from Instruction import Instruction
+from Memory import PagedMemory
 import tkinter as tk
 
 
@@ -28,18 +29,22 @@ class GUIController:
 
     def open_debugger_gui(
         self,
-        memory: dict[int, int],
+        memory: PagedMemory,
         instructions: list[Instruction],
         debug: bool,
         raw_text: list[str],
+        full_state: bool = False,
+        log_path: str | None = None,
     ) -> None:
         """Opens the DebuggerGUI
 
         Args:
-            memory (dict[int, int]): Represents the memory of the Assembler
+            memory (PagedMemory): Represents the memory of the Assembler
             instructions (list[instruction]): parsed program file
             debug (bool): User Option to show more/less debug messages
             raw_text (list[str]): Content of the program file. Every string in the list stores one line of text.
+            full_state (bool): User Option to print all registers and memory cells after every step
+            log_path (str | None): file to save all status messages to, None to keep only the newest ones
         """
         # remove everything that StartGUI placed inside the Root Window
         for widget in self.root.winfo_children():
@@ -48,7 +53,9 @@ class GUIController:
         # prepare the backend
         assembler = Assembler(s=memory)
         assembler.max_pc = len(instructions)
-        debugger = Debugger(assembler, debug, instructions, raw_text)
+        debugger = Debugger(
+            assembler, debug, instructions, raw_text, full_state=full_state
+        )
 
         # prepare the frontend
-        self.debugger_gui = DebuggerGUI(self, debugger)
+        self.debugger_gui = DebuggerGUI(self, debugger, log_path)
@@ -0,0 +1,397 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Undo history of the Debugger. Instead of a copy of the whole Assembler per step, the Journal records only the
+# registers and memory cells a step changed, together with their old values. Undoing a step writes the old values
+# back in reverse order.
+# The changes of all steps are packed into flat arrays (~50 bytes for a step that changes two registers and a
+# cell). Values that don't fit into a signed 64 bit integer (or are no int at all) are kept in a side dict.
+# The Journal is bounded by a number of steps and a number of bytes. If one of them is exceeded, the oldest steps
+# are evicted, so long auto step sessions can't grow until the process is killed.
+# To jump to any step of the timeline, Checkpoints holds full snapshots of the Assembler every interval steps.
+# A seek restores the closest snapshot and computes the remaining steps again instead of all steps before it.
+# The number and the size of the snapshots are bounded, so on long runs not every snapshot can be kept. The
+# latest snapshots (the recent window, half of max_checkpoints) always keep the fixed interval, so seeking to a
+# recent step computes at most interval steps. Older snapshots are thinned to multiples of spacing, which doubles
+# whenever they exceed the limits: seeking to an older step computes at most spacing steps, at most
+# 2 * steps / (max_checkpoints - recent - pinned snapshots) on a timeline of that many steps. If even the recent
+# window exceeds max_bytes (large memories), the window is halved.
+
+from array import array
+from Assembler import Assembler
+from Memory import PagedMemory
+
+# Default limits of the undo history
+MAX_HISTORY_STEPS = 1_000_000
+MAX_HISTORY_BYTES = 64 * 1024 * 1024
+# Default settings of the checkpoints
+CHECKPOINT_INTERVAL = 1000
+MAX_CHECKPOINTS = 256
+MAX_CHECKPOINT_BYTES = 64 * 1024 * 1024
+# Bytes of one recorded register change / memory change / step (see the arrays of Journal)
+_REGISTER_BYTES = 1 + 8
+_CELL_BYTES = 8 + 1 + 8
+_STEP_BYTES = 8 + 8
+
+# Kinds of stored values, used as keys for values that don't fit into the arrays
+_REGISTER = 0
+_ADDRESS = 1
+_CELL = 2
+
+
+class Journal:
+    """Records the changes of every computed step, so the steps can be undone one after another"""
+
+    def __init__(
+        self,
+        registers: list[str],
+        max_steps: int = MAX_HISTORY_STEPS,
+        max_bytes: int = MAX_HISTORY_BYTES,
+    ) -> None:
+        """
+        Args:
+            registers (list[str]): names of the register member variables of the Assembler
+            max_steps (int): maximum number of steps that can be undone
+            max_bytes (int): maximum size of the recorded changes
+        """
+        self.registers = registers
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        # step of the timeline the journal starts at. Steps before it were evicted and can't be undone anymore.
+        self.start = 0
+        # register changes: index into self.registers, old value
+        self.register_index = array("B")
+        self.register_old = array("q")
+        # memory changes: address, flag of the cell (see Memory.EMPTY/STORED/LARGE), old value
+        self.cell_address = array("q")
+        self.cell_flag = array("B")
+        self.cell_old = array("q")
+        # per step: number of recorded register / memory changes up to and including the step
+        self.register_end = array("Q")
+        self.cell_end = array("Q")
+        # (kind, position) -> value that does not fit into the array of the kind
+        self.objects: dict[tuple[int, int], object] = dict()
+        # register values before the step that is currently recorded
+        self.pending: tuple = ()
+
+    def __len__(self) -> int:
+        return len(self.register_end)
+
+    def begin(self, assembler: Assembler) -> tuple:
+        """Starts recording a step. Call before the step is computed.
+
+        Args:
+            assembler (Assembler): assembler that will compute the step. Its memory has to be a PagedMemory.
+
+        Returns:
+            tuple: values of the registers before the step, needed by commit() / rollback()
+        """
+        assembler.s.journal = []
+        self.pending = tuple(
+            getattr(assembler, register) for register in self.registers
+        )
+        return self.pending
+
+    def changes(self, assembler: Assembler) -> tuple[list[str], list[int]]:
+        """Registers and memory cells that the step started with begin() changed so far
+
+        Args:
+            assembler (Assembler): assembler that computes the step
+
+        Returns:
+            tuple[list[str], list[int]]: names of the changed registers, sorted addresses of the written cells
+        """
+        registers = [
+            register
+            for register, old in zip(self.registers, self.pending)
+            if getattr(assembler, register) != old
+        ]
+        addresses = sorted({address for address, _, _ in assembler.s.journal or ()})
+        return (registers, addresses)
+
+    def commit(self, assembler: Assembler, before: tuple) -> None:
+        """Stores the changes of the step that was computed since begin()
+
+        Args:
+            assembler (Assembler): assembler that computed the step
+            before (tuple): register values returned by begin()
+        """
+        memory: PagedMemory = assembler.s
+        for index, old in enumerate(before):
+            new = getattr(assembler, self.registers[index])
+            if new is not old and new != old:
+                self.register_index.append(index)
+                self._append(self.register_old, _REGISTER, old)
+        for address, flag, old in memory.journal:
+            self._append(self.cell_address, _ADDRESS, address)
+            self.cell_flag.append(flag)
+            self._append(self.cell_old, _CELL, old)
+        memory.journal = None
+        self.register_end.append(len(self.register_index))
+        self.cell_end.append(len(self.cell_address))
+        if len(self.register_end) > self.max_steps or self.size() > self.max_bytes:
+            self.shrink()
+
+    def size(self) -> int:
+        """Number of bytes used by the recorded changes (without values that don't fit into the arrays)"""
+        return (
+            len(self.register_index) * _REGISTER_BYTES
+            + len(self.cell_address) * _CELL_BYTES
+            + len(self.register_end) * _STEP_BYTES
+        )
+
+    def shrink(self) -> None:
+        """Evicts the oldest steps until the journal is within its limits again.
+        Evicts at least an eighth of the steps at once, so the arrays are not moved on every step.
+        """
+        while len(self) and (
+            len(self) > self.max_steps or self.size() > self.max_bytes
+        ):
+            self.evict(max(1, len(self) // 8, len(self) - self.max_steps))
+
+    def evict(self, steps: int) -> None:
+        """Removes the oldest steps. They can't be undone anymore.
+
+        Args:
+            steps (int): number of steps to remove
+        """
+        steps = min(steps, len(self))
+        if steps <= 0:
+            return
+        registers = self.register_end[steps - 1]
+        cells = self.cell_end[steps - 1]
+        self.register_end = array(
+            "Q", (end - registers for end in self.register_end[steps:])
+        )
+        self.cell_end = array("Q", (end - cells for end in self.cell_end[steps:]))
+        for values in (self.register_index, self.register_old):
+            del values[:registers]
+        for values in (self.cell_address, self.cell_flag, self.cell_old):
+            del values[:cells]
+        shift = {_REGISTER: registers, _ADDRESS: cells, _CELL: cells}
+        self.objects = {
+            (kind, position - shift[kind]): value
+            for (kind, position), value in self.objects.items()
+            if position >= shift[kind]
+        }
+        self.start += steps
+
+    def rollback(self, assembler: Assembler, before: tuple) -> None:
+        """Reverts a step that was started with begin() but not committed (e.g. because it raised)
+
+        Args:
+            assembler (Assembler): assembler that computed the step
+            before (tuple): register values returned by begin()
+        """
+        memory: PagedMemory = assembler.s
+        journal, memory.journal = memory.journal or [], None
+        for address, flag, old in reversed(journal):
+            memory.restore(address, flag, old)
+        for register, old in zip(self.registers, before):
+            setattr(assembler, register, old)
+
+    def undo(self, assembler: Assembler) -> tuple[set[str], set[int]]:
+        """Reverts the last recorded step and removes it from the journal
+
+        Args:
+            assembler (Assembler): assembler to revert
+
+        Returns:
+            tuple[set[str], set[int]]: names of the reverted registers, addresses of the reverted memory cells
+        """
+        self.register_end.pop()
+        self.cell_end.pop()
+        register_start = self.register_end[-1] if self.register_end else 0
+        cell_start = self.cell_end[-1] if self.cell_end else 0
+
+        memory: PagedMemory = assembler.s
+        addresses = set()
+        while len(self.cell_address) > cell_start:
+            address = self._pop(self.cell_address, _ADDRESS)
+            old = self._pop(self.cell_old, _CELL)
+            memory.restore(address, self.cell_flag.pop(), old)
+            addresses.add(address)
+
+        registers = set()
+        while len(self.register_index) > register_start:
+            register = self.registers[self.register_index.pop()]
+            setattr(assembler, register, self._pop(self.register_old, _REGISTER))
+            registers.add(register)
+        return (registers, addresses)
+
+    def truncate(self, steps: int) -> None:
+        """Removes all steps after the first steps recorded steps
+
+        Args:
+            steps (int): number of steps to keep
+        """
+        registers = self.register_end[steps - 1] if steps else 0
+        cells = self.cell_end[steps - 1] if steps else 0
+        del self.register_end[steps:]
+        del self.cell_end[steps:]
+        for values in (self.register_index, self.register_old):
+            del values[registers:]
+        for values in (self.cell_address, self.cell_flag, self.cell_old):
+            del values[cells:]
+        limit = {_REGISTER: registers, _ADDRESS: cells, _CELL: cells}
+        self.objects = {
+            (kind, position): value
+            for (kind, position), value in self.objects.items()
+            if position < limit[kind]
+        }
+
+    def rewind(self, step: int) -> None:
+        """Lets the journal end at the given step of the timeline. Recorded steps after it are removed.
+        If the step is not within the journal, the journal is cleared and starts at the step.
+
+        Args:
+            step (int): step of the timeline
+        """
+        if self.start <= step <= self.start + len(self):
+            self.truncate(step - self.start)
+        else:
+            self.clear()
+            self.start = step
+
+    def clear(self) -> None:
+        for values in (
+            self.register_index,
+            self.register_old,
+            self.cell_address,
+            self.cell_flag,
+            self.cell_old,
+            self.register_end,
+            self.cell_end,
+        ):
+            del values[:]
+        self.objects.clear()
+
+    def _append(self, values: array, kind: int, value) -> None:
+        if type(value) is int:
+            try:
+                values.append(value)
+                return
+            except OverflowError:
+                pass
+        values.append(0)
+        self.objects[(kind, len(values) - 1)] = value
+
+    def _pop(self, values: array, kind: int):
+        value = values.pop()
+        if self.objects:
+            return self.objects.pop((kind, len(values)), value)
+        return value
+
+
+class Checkpoints:
+    """Full snapshots (registers and memory) of the Assembler at some steps of the timeline"""
+
+    def __init__(
+        self,
+        registers: list[str],
+        interval: int = CHECKPOINT_INTERVAL,
+        max_checkpoints: int = MAX_CHECKPOINTS,
+        max_bytes: int = MAX_CHECKPOINT_BYTES,
+    ) -> None:
+        """
+        Args:
+            registers (list[str]): names of the register member variables of the Assembler
+            interval (int): a snapshot is taken every interval steps
+            max_checkpoints (int): maximum number of snapshots before old snapshots are dropped
+            max_bytes (int): maximum size of all snapshots before old snapshots are dropped
+        """
+        self.registers = registers
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+        self.max_bytes = max_bytes
+        # number of latest snapshots that keep the interval, and the distance of the snapshots before them
+        self.recent = max(1, max_checkpoints // 2)
+        self.spacing = interval
+        # step -> (register values, memory)
+        self.snapshots: dict[int, tuple[tuple, PagedMemory]] = dict()
+        # steps of snapshots that are never dropped, e.g. because the user changed the state at this step
+        self.pinned: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def due(self, step: int) -> bool:
+        """True if a snapshot should be taken at the step"""
+        return step % self.interval == 0 and step not in self.snapshots
+
+    def take(self, step: int, assembler: Assembler, pinned: bool = False) -> None:
+        """Stores a snapshot of the assembler
+
+        Args:
+            step (int): step of the timeline the assembler is at
+            assembler (Assembler): assembler to take the snapshot of
+            pinned (bool): never drop this snapshot
+        """
+        registers = tuple(getattr(assembler, register) for register in self.registers)
+        self.snapshots[step] = (registers, PagedMemory(assembler.s))
+        if pinned:
+            self.pinned.add(step)
+        self.thin()
+
+    def size(self) -> int:
+        return sum(memory.size() for _, memory in self.snapshots.values())
+
+    def thin(self) -> None:
+        """Drops old snapshots until the limits are met: the snapshots before the recent window that are not on
+        the spacing, else doubles the spacing. If there are no old snapshots left, halves the recent window.
+        Step 0, pinned snapshots and the latest snapshot are always kept."""
+        while len(self.snapshots) > self.max_checkpoints or (
+            len(self.snapshots) > 1 and self.size() > self.max_bytes
+        ):
+            window = self.window()
+            old = [
+                step
+                for step in self.snapshots
+                if 0 < step < window and step not in self.pinned
+            ]
+            dropped = [step for step in old if step % self.spacing != 0]
+            for step in dropped:
+                del self.snapshots[step]
+            if dropped:
+                continue
+            if old:
+                self.spacing *= 2
+            elif self.recent > 1:
+                self.recent //= 2
+            else:
+                break
+
+    def window(self) -> int:
+        """First step of the recent window, seeking to it or a later step computes at most interval steps"""
+        steps = sorted(self.snapshots)
+        return steps[-self.recent] if len(steps) >= self.recent else 0
+
+    def closest(self, step: int) -> int | None:
+        """Step of the latest snapshot at or before the step, None if there is none"""
+        steps = [taken for taken in self.snapshots if taken <= step]
+        return max(steps) if steps else None
+
+    def restore(self, step: int, assembler: Assembler) -> None:
+        """Sets the assembler to the snapshot taken at the step
+
+        Args:
+            step (int): step of an existing snapshot
+            assembler (Assembler): assembler to modify
+        """
+        registers, memory = self.snapshots[step]
+        for register, value in zip(self.registers, registers):
+            setattr(assembler, register, value)
+        journal = assembler.s.journal
+        assembler.s = PagedMemory(memory)
+        assembler.s.journal = journal
+
+    def discard_after(self, step: int) -> None:
+        """Drops all snapshots taken after the step"""
+        self.snapshots = {
+            taken: snapshot
+            for taken, snapshot in self.snapshots.items()
+            if taken <= step
+        }
+        self.pinned = {taken for taken in self.pinned if taken <= step}
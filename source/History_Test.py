@@ -0,0 +1,148 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import random
+from copy import deepcopy
+from Assembler import Assembler
+from Compiler_Test import random_program
+from Debugger import Debugger
+from Decoder import decode
+from Decoder_Test import load_assembler
+from History import Journal, Checkpoints
+from Memory import PagedMemory
+
+
+class TestHistory(unittest.TestCase):
+    def assert_undo(self, module):
+        """Undoing every step restores every previous state of the assembler"""
+        random.seed(2)
+        registers = list(module.REGISTERS.values())
+        for _ in range(40):
+            instructions = random_program(module, random.randint(1, 20))
+            decode(instructions, module.Assembler)
+            memory = {k: random.randint(-20, 20) for k in range(0, 16, 2)}
+            memory[3] = 2**70  # does not fit into the arrays
+            assembler = module.Assembler(s=PagedMemory(memory))
+            assembler.max_pc = len(instructions)
+            journal = Journal(registers)
+
+            states = []
+            for _ in range(60):
+                if not 0 <= assembler.pc < len(instructions):
+                    break
+                state = deepcopy(assembler)
+                before = journal.begin(assembler)
+                try:
+                    if instructions[assembler.pc].handler(assembler):
+                        assembler.pc += 1
+                except Exception:
+                    journal.rollback(assembler, before)
+                    self.assertEqual(assembler, state)
+                    break
+                journal.commit(assembler, before)
+                # the Debugger shows and clears the messages after every step
+                assembler.message = assembler.debug_message = ""
+                states.append(state)
+
+            self.assertEqual(len(journal), len(states))
+            while states:
+                journal.undo(assembler)
+                self.assertEqual(assembler, states.pop())
+            self.assertEqual(len(journal), 0)
+            self.assertFalse(journal.objects)
+
+    def test_assembler_ti(self):
+        """Test undo with Assembler_TI"""
+        self.assert_undo(load_assembler("Assembler_TI"))
+
+    def test_assembler_bs(self):
+        """Test undo with Assembler_BS"""
+        self.assert_undo(load_assembler("Assembler_BS"))
+
+    def test_new_cells_are_removed(self):
+        """Undo removes cells that did not exist before the step"""
+        module = load_assembler("Assembler_BS")
+        assembler = module.Assembler(s=PagedMemory())
+        journal = Journal(list(module.REGISTERS.values()))
+        before = journal.begin(assembler)
+        assembler.s[5] = 1
+        assembler.acc = 2**80
+        journal.commit(assembler, before)
+        self.assertEqual(journal.undo(assembler), ({"acc"}, {5}))
+        self.assertNotIn(5, assembler.s)
+        self.assertEqual(assembler.acc, 0)
+
+    def test_limits(self):
+        """The oldest steps are evicted if the journal exceeds its limits, the others can still be undone"""
+        module = load_assembler("Assembler_BS")
+        for max_steps, max_bytes in ((100, 10**9), (10**9, 2000)):
+            assembler = module.Assembler(s=PagedMemory())
+            journal = Journal(list(module.REGISTERS.values()), max_steps, max_bytes)
+            states = []
+            for step in range(1000):
+                states.append(deepcopy(assembler))
+                before = journal.begin(assembler)
+                assembler.acc = step if step % 3 else 2**70 + step
+                assembler.s[step % 7] = step
+                journal.commit(assembler, before)
+                self.assertLessEqual(len(journal), max_steps)
+                self.assertLessEqual(journal.size(), max_bytes)
+            self.assertEqual(journal.start + len(journal), 1000)
+            while journal:
+                journal.undo(assembler)
+                self.assertEqual(assembler, states.pop())
+            self.assertFalse(journal.objects)
+
+    def test_checkpoints_are_thinned(self):
+        """Too many checkpoints thin out the old ones, the recent ones keep the interval. Pinned and latest
+        checkpoints are kept."""
+        assembler = Assembler(s=PagedMemory({1: 1}))
+        checkpoints = Checkpoints(["acc"], interval=2, max_checkpoints=8)
+        checkpoints.take(0, assembler, pinned=True)
+        checkpoints.take(7, assembler, pinned=True)
+        for step in range(1, 2000):
+            assembler.acc = step
+            if checkpoints.due(step):
+                checkpoints.take(step, assembler)
+            self.assertLessEqual(len(checkpoints), 8)
+        self.assertIn(0, checkpoints.snapshots)
+        self.assertIn(7, checkpoints.snapshots)
+        self.assertEqual(checkpoints.interval, 2)
+        window = checkpoints.window()
+        self.assertEqual(window, 1998 - 2 * (checkpoints.recent - 1))
+        for step in range(2000):
+            replay = step - checkpoints.closest(step)
+            if step >= window:
+                self.assertLess(replay, checkpoints.interval)
+            else:
+                self.assertLess(replay, checkpoints.spacing)
+        # the old checkpoints have the places that are not taken by the recent window or pinned
+        places = 8 - checkpoints.recent - len(checkpoints.pinned)
+        self.assertLessEqual(checkpoints.spacing, 2 * 2000 // places)
+        latest = checkpoints.closest(1999)
+        checkpoints.restore(latest, assembler)
+        self.assertEqual(assembler.acc, latest)
+
+    def test_checkpoints_bytes(self):
+        """If the recent checkpoints are too large, the recent window shrinks"""
+        assembler = Assembler(s=PagedMemory({address: 1 for address in range(10_000)}))
+        size = PagedMemory(assembler.s).size()
+        checkpoints = Checkpoints(["acc"], 1, max_checkpoints=64, max_bytes=5 * size)
+        for step in range(100):
+            checkpoints.take(step, assembler)
+            self.assertLessEqual(checkpoints.size(), 5 * size)
+        self.assertLess(checkpoints.recent, 5)
+        self.assertIn(99, checkpoints.snapshots)
+
+    def test_sessions_have_own_history(self):
+        """Every Debugger has its own undo history"""
+        first = Debugger(Assembler(), False, [], [])
+        second = Debugger(Assembler(), False, [], [])
+        self.assertIsNot(first.history, second.history)
+
+
+if __name__ == "__main__":
+    unittest.main()
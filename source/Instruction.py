@@ -3,12 +3,15 @@
 # License: MIT (view License.txt)
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable
 
 
-@dataclass
+@dataclass(slots=True)
 class Instruction:
     line_number: int  # Number of the line
     line_raw: str  # Unprocessed line
     command: str  # Name of the Method
     arguments: tuple  # Values of the Arguments to be given to the method
+    # Set by the Decoder: handler(assembler) computes the instruction and returns True if the PC needs to be incremented
+    handler: Callable | None = field(default=None, repr=False, compare=False)
@@ -0,0 +1,671 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Lockstep execution of one program with many initial memories, e.g. to grade or fuzz a program with thousands of
+# inputs. Needs NumPy (pip install numpy), which is optional for the rest of the debugger:
+#   python Lockstep.py program.txt memory1.json memory2.json ... [--max-steps N]
+# prints a JSON list with the result of every memory file (see Engine.RunResult), just like Batch.py.
+# Every run is a lane. Each register is a NumPy array over all lanes. The initial memories are not copied: lanes
+# that run with the same memory object share it, and the memory matrix of lanes x addresses only has a column for
+# every address that the program has used and any lane holds. A lane's memory is its initial memory with the
+# cells of these columns. If the matrix grows above MAX_LANE_CELLS, all lanes continue on their own Assemblers.
+# In every step the lanes with the smallest Program Counter compute their instruction together, all other lanes
+# wait. Lanes that took another branch therefore catch up and join again at the next common instruction. While all lanes are at the same instruction, the kernels work
+# on whole arrays instead of selected lanes. Lanes that stop are removed from the arrays.
+# The kernels in KERNELS compute the commands of the Assembler of "Betriebssysteme" on many lanes at once.
+# A lane that a kernel can not compute exactly like the Assembler (errors, values that do not fit into 64 bits,
+# reads of missing cells with LOADIN) leaves the lockstep: it continues on its own Assembler with Engine.execute,
+# starting with the instruction it could not compute. So every lane ends in exactly the state of a single run.
+# Infinite loops are not detected (see LoopDetector.py), every lane ends like Engine.run without loop detection.
+# Pass max_steps for programs that may never terminate.
+# The lockstep only pays off while the lanes stay together: a loop that all lanes run the same number of times
+# computes about 45x faster than separate runs, but on inputs that take different branches and loop counts
+# (e.g. Collatz with random inputs) the lanes mostly wait for each other and the speedup drops to about 5-10x.
+
+from argparse import ArgumentParser
+from collections.abc import Mapping
+from dataclasses import asdict
+from json import dumps
+from typing import Callable
+import Assembler as assembler_module
+from Assembler import Assembler, MAX_MEMORY_ADDRESS
+from Engine import (
+    execute,
+    load_program,
+    run,
+    RunResult,
+    TERMINATED,
+    END_OF_FILE,
+    BUDGET_EXHAUSTED,
+    ERROR,
+)
+from Instruction import Instruction
+from Memory import PagedMemory
+from ParseCache import ParseCache
+from Parser import create_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The kernels follow the semantics of this Assembler
+LOCKSTEP_ASSEMBLER = "Reti Assembler (Instruction Set 2)"
+# Factors whose product may exceed this bound leave the lockstep, their product might not fit into an int64
+_PRODUCT_LIMIT = 2.0**62
+# Float division is exact for integers below this bound, just like int(a / b) in Python
+_DIVISION_LIMIT = 2**53
+_SUM_LIMIT = 2**62  # summands below this bound can not overflow an int64
+_MAX_ADDRESS = 2**MAX_MEMORY_ADDRESS
+_INT64 = (-(2**63), 2**63 - 1)
+# Largest number of cells (lanes x used addresses) of the memory matrix, about 300 MB
+MAX_LANE_CELLS = 2**25
+
+# Selects all lanes
+ALL = slice(None)
+
+
+def _subset(lanes, mask) -> "np.ndarray":
+    """The lanes (ALL or indices) where mask is set"""
+    return np.flatnonzero(mask) if isinstance(lanes, slice) else lanes[mask]
+
+
+def _assign(target, lanes, values, leave) -> None:
+    """target[lanes] = values, except for the lanes that leave the lockstep"""
+    if leave is None or not leave.any():
+        target[lanes] = values
+    else:
+        target[_subset(lanes, ~leave)] = values[~leave]
+
+
+class LaneMemory:
+    """Memory of all lanes: the initial memories, shared by the lanes that run with the same memory object, and a
+    column of cells for every address that the program has used and any lane holds"""
+
+    def __init__(self, memories: list[Mapping[int, int]], capacity: int = 16) -> None:
+        self.bases: list[Mapping[int, int]] = []  # distinct initial memories
+        indices: dict[int, int] = dict()  # id of an initial memory -> index in bases
+        for memory in memories:
+            if id(memory) not in indices:
+                indices[id(memory)] = len(self.bases)
+                self.bases.append(memory)
+        # initial memory of every lane
+        self.base_of = np.array(
+            [indices[id(memory)] for memory in memories], dtype=np.intp
+        )
+        self.columns: dict[int, int] = dict()  # address -> column
+        self.absent: set[int] = set()  # addresses without a column that no initial memory holds
+        self.cells = np.zeros((len(memories), capacity), dtype=np.int64)
+        self.present = np.zeros((len(memories), capacity), dtype=bool)  # the cell exists
+
+    def column(self, address: int) -> int:
+        """Column of an address, a new one with the cells of the initial memories if the address has none yet"""
+        column = self.columns.get(address)
+        if column is None:
+            column = len(self.columns)
+            if column == self.cells.shape[1]:
+                self.cells = np.concatenate([self.cells, np.zeros_like(self.cells)], 1)
+                self.present = np.concatenate(
+                    [self.present, np.zeros_like(self.present)], 1
+                )
+            self.columns[address] = column
+            if address in self.absent:
+                self.absent.discard(address)
+            else:
+                initial = [base.get(address) for base in self.bases]
+                present = np.array([value is not None for value in initial])
+                values = np.array([value or 0 for value in initial], dtype=np.int64)
+                self.cells[:, column] = values[self.base_of]
+                self.present[:, column] = present[self.base_of]
+        return column
+
+    def lookup(self, address: int) -> int:
+        """Column of an address, -1 if no lane holds its cell"""
+        column = self.columns.get(address, -1)
+        if column < 0 and address not in self.absent:
+            if any(base.get(address) is not None for base in self.bases):
+                return self.column(address)
+            self.absent.add(address)
+        return column
+
+    def read(self, lanes, addresses) -> tuple["np.ndarray", "np.ndarray"]:
+        """Values of the cells (0 if the cell does not exist) and whether they exist
+
+        Args:
+            lanes (ALL | np.ndarray): lanes to read
+            addresses (int | np.ndarray): the same address for all lanes or one address per lane
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: values and existence of the cells
+        """
+        if not isinstance(addresses, int) and len(addresses):
+            first = int(addresses[0])
+            if (addresses == first).all():
+                addresses = first
+        if isinstance(addresses, int):
+            column = self.lookup(addresses)
+            if column >= 0:
+                return self.cells[lanes, column], self.present[lanes, column]
+            size = len(self.cells) if isinstance(lanes, slice) else len(lanes)
+            return np.zeros(size, dtype=np.int64), np.zeros(size, dtype=bool)
+
+        lanes = np.arange(len(self.cells))[lanes]
+        unique, inverse = np.unique(addresses, return_inverse=True)
+        columns = np.array(
+            [self.lookup(int(address)) for address in unique], dtype=np.intp
+        )[inverse]
+        used = columns >= 0
+        values = np.zeros(len(lanes), dtype=np.int64)
+        present = np.zeros(len(lanes), dtype=bool)
+        values[used] = self.cells[lanes[used], columns[used]]
+        present[used] = self.present[lanes[used], columns[used]]
+        return values, present
+
+    def write(self, lanes, addresses, values) -> None:
+        """Writes the values into the cells, lanes and addresses like read()"""
+        if isinstance(addresses, int):
+            column = self.column(addresses)
+            self.cells[lanes, column] = values
+            self.present[lanes, column] = True
+            return
+        lanes = np.arange(len(self.cells))[lanes]
+        if len(lanes) == 0:
+            return
+        unique, inverse = np.unique(addresses, return_inverse=True)
+        columns = np.array(
+            [self.column(int(address)) for address in unique], dtype=np.intp
+        )[inverse]
+        self.cells[lanes, columns] = values
+        self.present[lanes, columns] = True
+
+    def lane(self, lane: int) -> PagedMemory:
+        """Memory of one lane: its initial memory with the cells of the columns"""
+        memory = PagedMemory(self.bases[self.base_of[lane]])
+        for address, column in self.columns.items():
+            if self.present[lane, column]:
+                memory[address] = int(self.cells[lane, column])
+        return memory
+
+    def lane_cells(self, lane: int) -> dict[int, int]:
+        """Cells of one lane, sorted by address"""
+        base = self.bases[self.base_of[lane]]
+        if isinstance(base, PagedMemory):
+            return dict(self.lane(lane).items())
+        cells = dict(base)
+        present = self.present[lane]
+        values = self.cells[lane]
+        for address, column in self.columns.items():
+            if present[column]:
+                cells[address] = int(values[column])
+        return dict(sorted(cells.items()))
+
+    def compact(self, keep) -> None:
+        self.base_of = self.base_of[keep]
+        self.cells = self.cells[keep]
+        self.present = self.present[keep]
+
+
+class Lanes:
+    """Registers, memory and progress of the lanes in the lockstep"""
+
+    def __init__(
+        self,
+        runs: list[int],
+        attributes: list[str],
+        max_pc: int,
+        memories: list[Mapping[int, int]],
+    ) -> None:
+        count = len(runs)
+        self.max_pc = max_pc  # number of instructions, see Assembler.max_pc
+        self.runs = np.array(runs, dtype=np.intp)  # run of every lane
+        self.registers = {
+            attribute: np.zeros(count, dtype=np.int64) for attribute in attributes
+        }
+        self.memory = LaneMemory(memories)  # initial memory of every lane
+        self.steps = np.zeros(count, dtype=np.int64)  # computed instructions
+        self.last = np.full(count, -1, dtype=np.int64)  # last computed instruction
+
+    def __len__(self) -> int:
+        return len(self.runs)
+
+    def compact(self, keep) -> None:
+        """Removes all lanes that are not in keep"""
+        self.runs = self.runs[keep]
+        for attribute, values in self.registers.items():
+            self.registers[attribute] = values[keep]
+        self.memory.compact(keep)
+        self.steps = self.steps[keep]
+        self.last = self.last[keep]
+
+
+def _in_range(values, limit: int) -> "np.ndarray":
+    """-limit <= values < limit, with a single comparison"""
+    return (values + limit).view(np.uint64) < 2 * limit
+
+
+def _valid_address(addresses) -> "np.ndarray":
+    return addresses.view(np.uint64) <= _MAX_ADDRESS
+
+
+# A kernel computes one instruction on a group of lanes (ALL or indices) with the same Program Counter:
+#   kernel(state, lanes, *arguments) -> (lanes that leave the lockstep or None, increment the Program Counter)
+# It must not change the lanes that leave the lockstep.
+Kernel = Callable[..., tuple["np.ndarray | None", bool]]
+
+
+def _load(state: Lanes, lanes, destination: str, i: int):
+    values, _ = state.memory.read(lanes, i)
+    state.registers[destination][lanes] = values
+    return None, destination != "pc"
+
+
+def _load_indirect(index_register: str) -> Kernel:
+    """LOADIN1 and LOADIN2: register = memory[index register + i]"""
+
+    def kernel(state: Lanes, lanes, destination: str, i: int):
+        addresses = state.registers[index_register][lanes] + i
+        values, _ = state.memory.read(lanes, addresses)
+        # the Assembler checks the address after the load, with the loaded value if it loaded the index register
+        if destination == index_register:
+            leave = ~_in_range(values, _SUM_LIMIT) | ~_valid_address(values + i)
+        else:
+            leave = ~_valid_address(addresses)
+        _assign(state.registers[destination], lanes, values, leave)
+        return leave, destination != "pc"
+
+    return kernel
+
+
+def _loadin(state: Lanes, lanes, source: str, destination: str, i: int):
+    addresses = state.registers[source][lanes] + i
+    values, present = state.memory.read(lanes, addresses)
+    # the Assembler reads missing cells as None and checks the address after the load
+    if source == destination:
+        leave = ~_in_range(values, _SUM_LIMIT) | ~_valid_address(values + i)
+    else:
+        leave = ~_valid_address(addresses)
+    leave |= ~present
+    _assign(state.registers[destination], lanes, values, leave)
+    return leave, destination != "pc"
+
+
+def _loadi(state: Lanes, lanes, destination: str, i: int):
+    state.registers[destination][lanes] = i
+    return None, destination != "pc"
+
+
+def _store(state: Lanes, lanes, source: str, i: int):
+    state.memory.write(lanes, i, state.registers[source][lanes])
+    return None, True
+
+
+def _store_indirect(index_register: str) -> Kernel:
+    """STOREIN1 and STOREIN2: memory[index register + i] = register"""
+
+    def kernel(state: Lanes, lanes, source: str, i: int):
+        addresses = state.registers[index_register][lanes] + i
+        leave = ~_valid_address(addresses)
+        if leave.any():
+            lanes = _subset(lanes, ~leave)
+            addresses = addresses[~leave]
+        state.memory.write(lanes, addresses, state.registers[source][lanes])
+        return leave, True
+
+    return kernel
+
+
+def _storein(state: Lanes, lanes, destination: str, source: str, i: int):
+    # Just like the Assembler: writes to memory[destination], checks IN2 + i and keeps the Program Counter
+    addresses = state.registers[destination][lanes]
+    leave = ~_valid_address(state.registers["in2"][lanes] + i) | (addresses < 0)
+    if leave.any():
+        lanes = _subset(lanes, ~leave)
+        addresses = addresses[~leave]
+    state.memory.write(lanes, addresses, state.registers[source][lanes])
+    return leave, False
+
+
+def _move(state: Lanes, lanes, source: str, destination: str):
+    state.registers[destination][lanes] = state.registers[source][lanes]
+    return None, destination != "pc"
+
+
+# Operations on an int64 array and an int64 array or scalar: operation(a, b) -> (result, lanes that leave the
+# lockstep or None). The result of leaving lanes is not used, so it may overflow.
+def _add(a, b):
+    return a + b, ~_in_range(a, _SUM_LIMIT) | ~_in_range(b, _SUM_LIMIT)
+
+
+def _sub(a, b):
+    return a - b, ~_in_range(a, _SUM_LIMIT) | ~_in_range(b, _SUM_LIMIT)
+
+
+def _mul(a, b):
+    product = np.abs(a.astype(np.float64)) * np.abs(np.float64(b))
+    return a * b, product >= _PRODUCT_LIMIT
+
+
+def _div(a, b):
+    leave = (
+        (b == 0) | ~_in_range(a, _DIVISION_LIMIT) | ~_in_range(b, _DIVISION_LIMIT)
+    )
+    quotient = np.trunc(a / np.where(leave, 1, b))
+    return quotient.astype(np.int64), leave
+
+
+def _mod(a, b):
+    leave = b == 0
+    return np.remainder(a, np.where(leave, 1, b)), leave
+
+
+def _xor(a, b):
+    return a ^ b, None
+
+
+def _and(a, b):
+    return a & b, None
+
+
+def _or(a, b):
+    return a | b, None
+
+
+def _arithmetic(operation: Callable, operand: str) -> Kernel:
+    """register = operation(register, operand). The operand is "i" (intermediate value),
+    "memory" (memory[i]) or "register" (second register)"""
+
+    def kernel(state: Lanes, lanes, destination: str, argument):
+        a = state.registers[destination][lanes]
+        if operand == "i":
+            b = np.int64(argument)
+        elif operand == "memory":
+            b, _ = state.memory.read(lanes, argument)
+        else:
+            b = state.registers[argument][lanes]
+        values, leave = operation(a, b)
+        if leave is not None:
+            leave = np.broadcast_to(leave, a.shape)
+        _assign(state.registers[destination], lanes, values, leave)
+        return leave, destination != "pc"
+
+    return kernel
+
+
+def _nop(state: Lanes, lanes):
+    return None, True
+
+
+def _jump(condition: Callable | None) -> Kernel:
+    """Jump by i if condition(acc) holds. All lanes share the Program Counter, so the target is the same for all."""
+
+    def kernel(state: Lanes, lanes, i: int):
+        pc = state.registers["pc"]
+        acc = state.registers["acc"][lanes]
+        jumps = np.ones(len(acc), dtype=bool) if condition is None else condition(acc)
+        target = int(pc[lanes][0]) + i
+        if not 0 <= target <= state.max_pc:
+            # the Assembler raises, the lanes leave to get its error message
+            return jumps, True
+        # jumping lanes keep their new Program Counter, all others are incremented
+        pc[lanes if jumps.all() else _subset(lanes, jumps)] = target - 1
+        return None, True
+
+    return kernel
+
+
+KERNELS: dict[str, Kernel] = {
+    "load": _load,
+    "loadin1": _load_indirect("in1"),
+    "loadin2": _load_indirect("in2"),
+    "loadin": _loadin,
+    "loadi": _loadi,
+    "store": _store,
+    "storein1": _store_indirect("in1"),
+    "storein2": _store_indirect("in2"),
+    "storein": _storein,
+    "move": _move,
+    "nop": _nop,
+    "jump": _jump(None),
+    "jump_eq": _jump(lambda acc: acc == 0),
+    "jump_ne": _jump(lambda acc: acc != 0),
+    "jump_le": _jump(lambda acc: acc <= 0),
+    "jump_ge": _jump(lambda acc: acc >= 0),
+    "jump_lt": _jump(lambda acc: acc < 0),
+    "jump_gt": _jump(lambda acc: acc > 0),
+}
+for _name, _operation in (
+    ("add", _add),
+    ("sub", _sub),
+    ("mul", _mul),
+    ("div", _div),
+    ("mod", _mod),
+    ("oplus", _xor),
+    ("and", _and),
+    ("or", _or),
+):
+    # the memory variants of AND and OR are called and_ and or_
+    KERNELS[_name + "_" if _name in ("and", "or") else _name] = _arithmetic(
+        _operation, "memory"
+    )
+    KERNELS[_name + "i"] = _arithmetic(_operation, "i")
+    KERNELS[_name + "r"] = _arithmetic(_operation, "register")
+
+
+def _fits(memory: Mapping[int, int]) -> bool:
+    """True if all cells of the memory can be held in int64 lanes"""
+    if isinstance(memory, PagedMemory):
+        return not memory.large
+    return all(
+        type(address) is int
+        and type(value) is int
+        and _INT64[0] <= address <= _INT64[1]
+        and _INT64[0] <= value <= _INT64[1]
+        for address, value in memory.items()
+    )
+
+
+def run_lockstep(
+    instructions: list[Instruction],
+    memories: list[Mapping[int, int] | None],
+    max_steps: int | None = None,
+) -> list[RunResult]:
+    """Runs a parsed program with every memory, all runs in lockstep
+
+    Args:
+        instructions (list[Instruction]): parsed program
+        memories (list[Mapping[int, int] | None]): initial memory of every run, None for an empty memory
+        max_steps (int | None): instruction budget of every run, None for no limit
+
+    Raises:
+        ImportError: NumPy is not installed
+        ValueError: the program uses the Assembler of another instruction set
+
+    Returns:
+        list[RunResult]: result of every run, the same as Engine.run with the memory and without loop detection,
+            in the order of memories
+    """
+    if np is None:
+        raise ImportError(
+            "Lockstep execution needs NumPy. Please install it with 'pip install numpy'.\n"
+        )
+    if assembler_module.ASSEMBLER_NAME != LOCKSTEP_ASSEMBLER:
+        raise ValueError(
+            f"Lockstep execution is only available for the {LOCKSTEP_ASSEMBLER}, "
+            f"not for the {assembler_module.ASSEMBLER_NAME}.\n"
+        )
+    for instruction in instructions:
+        if instruction.command not in KERNELS:
+            raise ValueError(
+                f"Lockstep execution does not know the command of line {instruction.line_number}: "
+                f"'{instruction.line_raw}'.\n"
+            )
+
+    results: list[RunResult | None] = [None] * len(memories)
+    runs = []  # runs in the lockstep
+    for index, memory in enumerate(memories):
+        if memory and not _fits(memory):
+            results[index] = run(instructions, memory, max_steps, detect_loops=False)
+        else:
+            runs.append(index)
+    length = len(instructions)
+    empty: dict[int, int] = dict()  # shared by all runs without memory
+    state = Lanes(
+        runs,
+        list(assembler_module.REGISTERS.values()),
+        length,
+        [memories[index] or empty for index in runs],
+    )
+
+    budget = -1 if max_steps is None else max_steps
+    terminate = assembler_module.TERMINATE
+    kernels = [KERNELS[instruction.command] for instruction in instructions]
+    arguments = [instruction.arguments for instruction in instructions]
+    terminates = [instruction.line_raw in terminate for instruction in instructions]
+    branches = [instruction.command.startswith("jump") for instruction in instructions]
+
+    def stop(lanes, reason: str) -> None:
+        for lane in np.arange(len(state))[lanes].tolist():
+            results[state.runs[lane]] = _result(state, lane, instructions, reason)
+
+    if budget == 0:
+        stop(ALL, BUDGET_EXHAUSTED)
+        return results
+
+    converged = False  # all lanes have the same Program Counter
+    while len(state):
+        pc = state.registers["pc"]
+        if converged:
+            lanes = ALL
+            position = int(pc[0])
+        else:
+            position = int(pc.min())
+            group = pc == position
+            converged = bool(group.all())
+            lanes = ALL if converged else np.flatnonzero(group)
+        leave, increment = kernels[position](state, lanes, *arguments[position])
+
+        keep = None  # lanes that are still in the lockstep after this step, None for all
+        if leave is not None and leave.any():
+            leaving = _subset(lanes, leave)
+            for lane in leaving.tolist():
+                results[state.runs[lane]] = _continue(
+                    state, lane, instructions, max_steps
+                )
+            keep = np.ones(len(state), dtype=bool)
+            keep[leaving] = False
+            lanes = _subset(lanes, ~leave)
+        if increment:
+            pc[lanes] += 1
+        state.steps[lanes] += 1
+        state.last[lanes] = position
+
+        finished = None
+        if terminates[position]:
+            finished, reason = lanes, TERMINATED
+        elif increment and not branches[position]:
+            # all lanes continue with the next instruction
+            if position + 1 == length:
+                finished, reason = lanes, END_OF_FILE
+        else:
+            converged = False
+            outside = (pc[lanes] < 0) | (pc[lanes] >= length)
+            if outside.any():
+                finished, reason = _subset(lanes, outside), END_OF_FILE
+        if finished is not None:
+            stop(finished, reason)
+            if keep is None:
+                keep = np.ones(len(state), dtype=bool)
+            keep[finished] = False
+        if budget > 0:
+            exhausted = state.steps == budget
+            if keep is not None:
+                exhausted &= keep
+            if exhausted.any():
+                stop(exhausted, BUDGET_EXHAUSTED)
+                keep = ~exhausted if keep is None else keep & ~exhausted
+
+        if keep is not None:
+            state.compact(keep)
+            converged = False
+        if state.memory.cells.size > MAX_LANE_CELLS:
+            # the program uses too many addresses, every lane continues on its own Assembler
+            for lane in range(len(state)):
+                results[state.runs[lane]] = _continue(
+                    state, lane, instructions, max_steps
+                )
+            break
+    return results
+
+
+def _result(
+    state: Lanes, lane: int, instructions: list[Instruction], reason: str
+) -> RunResult:
+    """RunResult of a lane that stopped in the lockstep"""
+    last = int(state.last[lane])
+    return RunResult(
+        reason,
+        int(state.steps[lane]),
+        {
+            name: int(state.registers[attribute][lane])
+            for name, attribute in assembler_module.REGISTERS.items()
+        },
+        state.memory.lane_cells(lane),
+        "",
+        instructions[last].line_number if last >= 0 else None,
+    )
+
+
+def _continue(
+    state: Lanes, lane: int, instructions: list[Instruction], max_steps: int | None
+) -> RunResult:
+    """Continues a lane that left the lockstep on its own Assembler"""
+    steps = int(state.steps[lane])
+    last = int(state.last[lane])
+    assembler = Assembler(s=state.memory.lane(lane))
+    for attribute, values in state.registers.items():
+        setattr(assembler, attribute, int(values[lane]))
+    result = execute(
+        assembler,
+        instructions,
+        None if max_steps is None else max_steps - steps,
+        detect_loops=False,
+    )
+    result.steps += steps
+    if result.line_number is None and last >= 0:
+        result.line_number = instructions[last].line_number
+    return result
+
+
+if __name__ == "__main__":
+    arguments = ArgumentParser(
+        description="Runs a Reti program with many memory files in lockstep (needs NumPy)"
+    )
+    arguments.add_argument("program", help="program file (.txt)")
+    arguments.add_argument("memory", nargs="+", help="memory files (.json or .mem)")
+    arguments.add_argument("--max-steps", type=int, default=None)
+    arguments.add_argument("--no-semicolon", action="store_true")
+    arguments.add_argument("--case-sensitive", action="store_true")
+    options = arguments.parse_args()
+
+    instructions = load_program(
+        options.program, not options.no_semicolon, options.case_sensitive, ParseCache()
+    ).instructions
+    memories = []
+    errors = dict()
+    for path in options.memory:
+        try:
+            memories.append(create_memory(path)[0])
+        except (SyntaxError, FileNotFoundError, ValueError) as error:
+            memories.append(None)
+            errors[path] = RunResult(ERROR, 0, message=str(error))
+    results = run_lockstep(instructions, memories, options.max_steps)
+    print(
+        dumps(
+            [
+                {"memory_file": path, **asdict(errors.get(path, result))}
+                for path, result in zip(options.memory, results)
+            ]
+        )
+    )
@@ -0,0 +1,114 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import random
+from unittest import mock
+import Assembler
+import Lockstep
+from Compiler_Test import random_program
+from Engine import load_program, run, TERMINATED
+from Instruction import Instruction
+from Lockstep import LaneMemory, run_lockstep, np
+from Memory import PagedMemory
+from MemorySpec import Sequence
+from Parser import create_memory
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestLockstep(unittest.TestCase):
+    def assert_same_results(self, instructions, memories, max_steps):
+        """Every lane ends exactly like a single run with its memory"""
+        expected = [
+            run(instructions, memory, max_steps, detect_loops=False)
+            for memory in memories
+        ]
+        self.assertEqual(run_lockstep(instructions, memories, max_steps), expected)
+
+    def test_random_programs(self):
+        """Random programs diverge, raise errors and leave the lockstep, but end like single runs"""
+        random.seed(2)
+        for _ in range(150):
+            instructions = random_program(Assembler, random.randint(1, 25))
+            memories = [
+                {k: random.randint(-20, 20) for k in range(0, 16, 2)}
+                for _ in range(random.randint(1, 12))
+            ]
+            self.assert_same_results(instructions, memories, 200)
+
+    def test_example(self):
+        """The faculty example with many inputs, with and without budget"""
+        directory = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+        instructions = load_program(os.path.join(directory, "Example.txt"), False)
+        memory, _ = create_memory(os.path.join(directory, "Example_Storage.json"))
+        memories = [{**memory, 10: n} for n in range(-3, 40)] + [None, dict()]
+        for max_steps in (None, 0, 7, 50):
+            self.assert_same_results(instructions.instructions, memories, max_steps)
+        results = run_lockstep(instructions.instructions, memories)
+        self.assertEqual(results[8].reason, TERMINATED)
+
+    def test_large_values(self):
+        """Values that do not fit into 64 bits are computed by the Assembler"""
+        instructions = [
+            Instruction(1, "LOAD ACC 0", "load", ("acc", 0)),
+            Instruction(2, "MULR ACC ACC", "mulr", ("acc", "acc")),
+            Instruction(3, "STORE ACC 1", "store", ("acc", 1)),
+            Instruction(4, "LOADI IN1 2", "loadi", ("in1", 2)),
+            Instruction(5, "LOADIN IN1 ACC 0", "loadin", ("in1", "acc", 0)),
+            Instruction(6, "JUMP 0", "jump", (0,)),
+        ]
+        memories = [{0: 3}, {0: 2**40}, {0: 2**70}, {0: 5, 2: 9}]
+        self.assert_same_results(instructions, memories, None)
+
+    def test_shared_memory(self):
+        """Lanes share their initial memories, only used addresses get a column"""
+        shared = PagedMemory({0: 3})
+        shared.add_region(Sequence(100, 100 + 10**4, 0, 1))
+        other = PagedMemory(shared)
+        other[0] = 7
+        instructions = [
+            Instruction(1, "LOAD ACC 0", "load", ("acc", 0)),
+            Instruction(2, "LOADIN ACC IN1 100", "loadin", ("acc", "in1", 100)),
+            Instruction(3, "ADDR IN1 ACC", "addr", ("in1", "acc")),
+            Instruction(4, "STORE IN1 150", "store", ("in1", 150)),
+            Instruction(5, "SUBI ACC 1", "subi", ("acc", 1)),
+            Instruction(6, "JUMP> -4", "jump_gt", (-4,)),
+            Instruction(7, "STORE IN1 1", "store", ("in1", 1)),
+        ]
+        memories = [shared, shared, other, {0: 2}, None, shared]
+        self.assert_same_results(instructions, memories, None)
+        self.assertEqual(shared[0], 3)  # the shared memory is not modified
+
+        large = PagedMemory({0: 7})
+        large.add_region(Sequence(100, 100 + 10**6, 0, 1))
+        memory = LaneMemory([shared, shared, large])
+        self.assertEqual(len(memory.bases), 2)
+        values, present = memory.read(slice(None), np.array([0, 5, 500_000]))
+        self.assertEqual(values.tolist(), [3, 0, 499_900])
+        self.assertEqual(present.tolist(), [True, False, True])
+        self.assertEqual(len(memory.columns), 2)
+        self.assertEqual(memory.lane(2)[0], 7)
+        self.assertEqual(memory.lane(2)[100 + 10**6 - 1], 10**6 - 1)
+
+    def test_max_lane_cells(self):
+        """Lanes continue on their own Assemblers if the memory matrix grows too large"""
+        random.seed(3)
+        with mock.patch.object(Lockstep, "MAX_LANE_CELLS", 40):
+            for _ in range(50):
+                instructions = random_program(Assembler, random.randint(1, 25))
+                memories = [
+                    {k: random.randint(-20, 20) for k in range(0, 16, 2)}
+                    for _ in range(random.randint(1, 12))
+                ]
+                self.assert_same_results(instructions, memories, 200)
+
+    def test_unknown_command(self):
+        with self.assertRaises(ValueError):
+            run_lockstep([Instruction(1, "FOO", "foo", ())], [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
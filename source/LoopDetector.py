@@ -0,0 +1,158 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Detection of infinite loops. The Assembler is deterministic, so once the machine reaches a state (registers and
+# memory) a second time, it runs through the same steps forever.
+# Every infinite run jumps backwards, so the state is only looked at after a step that did not move the Program
+# Counter forward. Its key are the values of the registers plus the fingerprint of the memory (see Memory.py),
+# which is kept up to date with O(1) per write. The keys of the most recent states are kept in a bounded table.
+# The states of a loop repeat periodically, so a loop is also found if only every n-th backward jump is checked.
+# The Engine does that to keep the cost per step close to zero, the Debugger checks every backward jump.
+# If a key is found in the table, the fingerprint may still be a hash collision. So the loop is proven on a copy
+# of the machine: it computes steps until it is in the very same state again, which also gives the exact period.
+# A collision therefore costs some steps, but never reports a loop.
+
+import sys
+from collections import deque
+from dataclasses import dataclass, replace
+from operator import attrgetter
+from Assembler import Assembler
+from Instruction import Instruction
+from Memory import PagedMemory
+
+# Number of recent states that are remembered. Loops with more backward jumps per period are not detected.
+RECENT_STATES = 4096
+# The Engine checks the state after every CHECK_INTERVAL-th backward jump
+CHECK_INTERVAL = 64
+
+
+@dataclass
+class Loop:
+    step: int  # step after which the machine was in the state that repeats
+    period: int  # number of steps until the state repeats
+    first_line: int  # lowest line number of the instructions in the loop
+    last_line: int  # highest line number of the instructions in the loop
+
+    def __str__(self) -> str:
+        return (
+            f"Infinite Loop: the state of the machine after step {self.step} repeats every {self.period} steps.\n"
+            f"The instructions on lines {self.first_line} to {self.last_line} are computed again and again "
+            f"without ever reaching the terminate instruction.\n"
+        )
+
+
+class LoopDetector:
+    """Remembers the recent states of a run and finds the first state that repeats"""
+
+    def __init__(
+        self,
+        instructions: list[Instruction],
+        assembler_class: type = Assembler,
+        capacity: int = RECENT_STATES,
+    ) -> None:
+        """
+        Args:
+            instructions (list[Instruction]): decoded program that is run
+            assembler_class (type): class of the Assembler that runs the program
+            capacity (int): number of recent states to remember
+        """
+        module = sys.modules[assembler_class.__module__]
+        self.instructions = instructions
+        self.registers = attrgetter(*module.REGISTERS.values())
+        self.terminate = module.TERMINATE
+        self.capacity = capacity
+        # key of a state -> step after which it was reached
+        self.states: dict[tuple, int] = dict()
+        # (key, step) of the remembered states, oldest first
+        self.recent: deque[tuple[tuple, int]] = deque()
+        # memory whose fingerprint is part of the keys
+        self.memory: PagedMemory | None = None
+
+    def reset(self) -> None:
+        """Forgets all states, e.g. after the state of the machine was changed from outside"""
+        self.states.clear()
+        self.recent.clear()
+        if self.memory is not None:
+            self.memory.fingerprint = None
+            self.memory = None
+
+    def check(self, assembler: Assembler, step: int) -> Loop | None:
+        """Remembers the state of the machine. Call after a step that did not move the Program Counter forward.
+
+        Args:
+            assembler (Assembler): machine after the step. Its memory has to be a PagedMemory.
+            step (int): number of steps computed so far
+
+        Returns:
+            Loop | None: the loop the machine is in, None if this state was not reached recently
+        """
+        memory = assembler.s
+        if memory is not self.memory or memory.fingerprint is None:
+            # the memory was replaced or cleared, the keys of the old states can't be compared anymore
+            self.reset()
+            memory.fingerprint = 0
+            self.memory = memory
+        key = (self.registers(assembler), memory.fingerprint)
+        first = self.states.get(key)
+        if first is not None and first < step:
+            loop = self.prove(assembler, first, step)
+            if loop is not None:
+                return loop
+        self.states[key] = step
+        self.recent.append((key, step))
+        if len(self.recent) > self.capacity:
+            old, taken = self.recent.popleft()
+            if self.states.get(old) == taken:
+                del self.states[old]
+        return None
+
+    def prove(self, assembler: Assembler, first: int, step: int) -> Loop | None:
+        """Computes steps on a copy of the machine until it is in the same state again
+
+        Args:
+            assembler (Assembler): machine after the step, not modified
+            first (int): step after which the same key was recorded
+            step (int): current step
+
+        Returns:
+            Loop | None: the loop, None if the state does not repeat within step - first steps (hash collision)
+        """
+        machine = replace(assembler, s=assembler.s.copy())
+        machine.s.journal = []
+        machine.s.fingerprint = 0
+        state = self.registers(assembler)
+        first_line = last_line = None
+        try:
+            for period in range(1, step - first + 1):
+                pc = machine.pc
+                if not 0 <= pc < len(self.instructions):
+                    return None
+                instruction = self.instructions[pc]
+                if instruction.line_raw in self.terminate:
+                    return None
+                line = instruction.line_number
+                if first_line is None or line < first_line:
+                    first_line = line
+                if last_line is None or line > last_line:
+                    last_line = line
+                if instruction.handler(machine):
+                    machine.pc += 1
+                elif (
+                    machine.pc <= pc
+                    and machine.s.fingerprint == 0
+                    and self.registers(machine) == state
+                    and self.same_cells(machine, assembler)
+                ):
+                    return Loop(step, period, first_line, last_line)
+        except Exception:
+            return None  # the run will raise the error itself
+        return None
+
+    def same_cells(self, machine: Assembler, assembler: Assembler) -> bool:
+        """Checks that the cells written by the copy hold the same values as in the original"""
+        for address, _, _ in machine.s.journal:
+            if machine.s.get(address, 0) != assembler.s.get(address, 0):
+                return False
+        return True
@@ -0,0 +1,110 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import random
+import Assembler
+from Compiler_Test import random_program
+from Debugger import Debugger
+from Debugger_Test import Output, example_debugger
+from Engine import run, LOOP, BUDGET_EXHAUSTED, TERMINATED
+from Instruction import Instruction
+
+# Toggles M[5] between 1 and 0 forever
+TOGGLE = [
+    Instruction(1, "LOADI ACC 1", "loadi", ("acc", 1)),
+    Instruction(2, "STORE ACC 5", "store", ("acc", 5)),
+    Instruction(3, "LOADI ACC 0", "loadi", ("acc", 0)),
+    Instruction(4, "STORE ACC 5", "store", ("acc", 5)),
+    Instruction(5, "JUMP -4", "jump", (-4,)),
+]
+# Counts up in M[5], the registers are the same at every JUMP
+COUNTER = [
+    Instruction(1, "LOAD ACC 5", "load", ("acc", 5)),
+    Instruction(2, "ADDI ACC 1", "addi", ("acc", 1)),
+    Instruction(3, "STORE ACC 5", "store", ("acc", 5)),
+    Instruction(4, "LOADI ACC 0", "loadi", ("acc", 0)),
+    Instruction(5, "JUMP -4", "jump", (-4,)),
+]
+
+
+class TestLoopDetector(unittest.TestCase):
+    def test_engine(self):
+        """A loop is reported with its lines and period, interpreted and compiled alike"""
+        for compiled in (False, True):
+            result = run(TOGGLE, None, None, compiled)
+            self.assertEqual(result.reason, LOOP)
+            self.assertIn("repeats every 5 steps", result.message)
+            self.assertIn("lines 1 to 5", result.message)
+            self.assertEqual(result.memory, {5: 0})
+            self.assertEqual(result.line_number, 5)
+
+        result = run(TOGGLE, None, 10_000, detect_loops=False)
+        self.assertEqual(result.reason, BUDGET_EXHAUSTED)
+
+    def test_progress_in_memory(self):
+        """Loops that only change the memory are no infinite loops"""
+        for compiled in (False, True):
+            result = run(COUNTER, None, 20_000, compiled)
+            self.assertEqual(result.reason, BUDGET_EXHAUSTED)
+            self.assertEqual(result.memory, {5: 4000})
+
+    def test_random_programs(self):
+        """Runs stop with LOOP only if they would never terminate, all other runs end the same"""
+        random.seed(3)
+        loops = 0
+        for _ in range(300):
+            instructions = random_program(Assembler, random.randint(1, 20))
+            memory = {k: random.randint(-5, 5) for k in range(0, 12, 2)}
+            result = run(instructions, memory, 5000)
+            expected = run(instructions, memory, 5000, detect_loops=False)
+            if result.reason == LOOP:
+                loops += 1
+                self.assertEqual(expected.reason, BUDGET_EXHAUSTED)
+                self.assertLess(result.steps, 5000)
+            else:
+                self.assertEqual(result, expected)
+        self.assertGreater(loops, 0)
+
+    def test_debugger(self):
+        """Auto stepping stops in a loop and continues after manual steps, the example still terminates"""
+        debugger = Debugger(Assembler.Assembler(max_pc=5), False, TOGGLE, [])
+        debugger.do_auto_step_turbo = True
+        output = Output()
+        wait = 0
+        while wait >= 0:
+            wait, _ = debugger.run_frame(output)
+        self.assertIsNotNone(debugger.loop)
+        self.assertEqual((debugger.loop.first_line, debugger.loop.last_line), (1, 5))
+        self.assertEqual(debugger.loop.period, 5)
+        self.assertFalse(debugger.finished)
+        self.assertIn("I paused the automatic stepping.", "".join(output))
+
+        step = debugger.step
+        debugger.next(Output())
+        self.assertIsNone(debugger.loop)
+        self.assertEqual(debugger.step, step + 1)
+        debugger.previous(Output())
+        self.assertEqual(debugger.step, step)
+
+        debugger = example_debugger()
+        debugger.do_auto_step_turbo = True
+        while not debugger.finished:
+            debugger.run_frame(Output())
+        self.assertTrue(debugger.terminated)
+        self.assertIsNone(debugger.loop)
+
+    def test_example(self):
+        """The faculty example terminates with and without loop detection"""
+        debugger = example_debugger(detect_loops=False)
+        instructions = debugger.instructions
+        memory = dict(debugger.assembler.s.items())
+        result = run(instructions, memory)
+        self.assertEqual(result.reason, TERMINATED)
+        self.assertEqual(result, run(instructions, memory, detect_loops=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,601 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Memory of the Assembler. PagedMemory behaves like the dict[int, int] that Assembler.s used to be
+# (get(i, 0), s[i] = value, items(), ...), but stores the cells in fixed-size array pages that are allocated on
+# the first write into the page. Large memory images need a fraction of the RAM of a dict and copying them
+# (e.g. for snapshots) copies a few arrays instead of every single cell.
+# Regions (ranges, fills, sequences, ... see MemorySpec.py) initialize many cells without storing them: the cells
+# of a region are only written into a page when the page is allocated, i.e. on the first read or write into it.
+# Operations that visit the cells in order (iteration, rank, ...) walk the allocated pages and the runs of region
+# cells between them (see segments()). The cells of a run are counted from its bounds, so they allocate no page.
+# The fingerprint is a hash of all cells that is updated on every write in O(1): the sum of value * weight(address)
+# over all cells. Empty cells count as 0, just like the Assembler reads them. It is only maintained while it is
+# enabled (see LoopDetector.py) and relative to the cells at the moment it was enabled, so enabling it does not
+# need to visit any cell.
+# If watch is set (see Watchpoints.py), every read and every write reports its cell to it. Like the fingerprint,
+# it costs one test for None per access while it is not set.
+
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import (
+    ItemsView,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    ValuesView,
+)
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from dataclasses import dataclass
+from itertools import compress
+import sys
+from typing import ClassVar
+from Watchpoints import Watchpoints
+
+# Maps the most significant byte of a signed integer to the byte that extends its sign
+SIGN_EXTENSION = bytes(0xFF if byte & 0x80 else 0 for byte in range(256))
+
+# Every page holds 2^PAGE_BITS memory cells
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+# Flags of a memory cell
+EMPTY = 0  # never written, reads as default
+STORED = 1  # value is stored in the page
+LARGE = 2  # value does not fit into a C long (or is no int) and is stored in PagedMemory.large
+
+# Number of cells Region.extremes() computes at once, bounds its memory for large regions
+EXTREMES_CHUNK = 64 * PAGE_SIZE
+
+_EMPTY_VALUES = array("l", bytes(PAGE_SIZE * array("l").itemsize))
+_EMPTY_FLAGS = bytes(PAGE_SIZE)
+_STORED_FLAGS = bytes((STORED,)) * PAGE_SIZE
+# Weight of a cell in the fingerprint is its address XOR the seed. The seed fits into one digit of a Python int,
+# which keeps the update cheap.
+_FINGERPRINT_SEED = 0x2545F491
+
+
+def _fingerprint_value(value) -> int:
+    """Value of a cell in the fingerprint, values that are no int count with their hash"""
+    return value if isinstance(value, int) else hash(value)
+
+
+@dataclass(frozen=True)
+class Region(ABC):
+    """Cells start to stop - 1, whose values are computed when they are needed"""
+
+    start: int
+    stop: int
+    # the values always fit into a signed integer of this many bits, None if they may not
+    bits: ClassVar[int | None] = None
+
+    @abstractmethod
+    def values(self, first: int, stop: int) -> array:
+        """Values of the cells first to stop - 1, which lie within the region
+
+        Returns:
+            array: array("l") of the values
+        """
+
+    def extremes(self) -> tuple[int, int]:
+        """Smallest and largest value of the region, computed in chunks of EXTREMES_CHUNK cells"""
+        smallest = largest = None
+        for first in range(self.start, self.stop, EXTREMES_CHUNK):
+            values = self.values(first, min(first + EXTREMES_CHUNK, self.stop))
+            low, high = min(values), max(values)
+            if smallest is None or low < smallest:
+                smallest = low
+            if largest is None or high > largest:
+                largest = high
+        return (smallest, largest)
+
+
+def values_fit(values: array, width: int) -> bool:
+    """True if every value of the array fits into a signed integer of width bytes. Compares the upper bytes of
+    every value with the sign of its lower width bytes, all with slices of the raw bytes.
+    """
+    size = values.itemsize
+    if width >= size:
+        return True
+    data = values.tobytes()
+    if sys.byteorder == "little":
+        sign, upper = width - 1, range(width, size)
+    else:
+        sign, upper = size - width, range(size - width)
+    signs = data[sign::size].translate(SIGN_EXTENSION)
+    return all(data[byte::size] == signs for byte in upper)
+
+
+class PagedMemory(MutableMapping):
+    """Sparse memory of 2^PAGE_BITS sized array('l') pages with the interface of a dict[int, int]"""
+
+    def __init__(self, cells: Mapping[int, int] | Iterable = ()) -> None:
+        # page number -> (values of the cells, flags of the cells)
+        self.pages: dict[int, tuple[array, bytearray]] = dict()
+        self.large: dict[int, object] = dict()
+        self.length = 0
+        # If set to a list, every write appends (address, flag, old value) to it. Used for the undo history.
+        self.journal: list[tuple[int, int, object]] | None = None
+        # If set to an int, every write adds the change of its cell to it (see above). Copies don't inherit it.
+        self.fingerprint: int | None = None
+        # If set, every read and write is reported to it (see Watchpoints.py). Copies don't inherit it.
+        self.watch: Watchpoints | None = None
+        # Regions sorted by their start, they do not overlap. Their cells are counted in length.
+        self.regions: list[Region] = []
+        self.region_starts: list[int] = []
+        if isinstance(cells, PagedMemory):
+            # Copies whole pages instead of single cells. Regions never change, so they are shared.
+            self.pages = {
+                number: (array("l", values), bytearray(flags))
+                for number, (values, flags) in cells.pages.items()
+            }
+            self.large = dict(cells.large)
+            self.length = cells.length
+            self.regions = list(cells.regions)
+            self.region_starts = list(cells.region_starts)
+        elif cells:
+            self.update(cells)
+
+    def new_page(self, number: int) -> tuple[array, bytearray]:
+        """Allocates the page with the given number and writes the cells of the regions into it"""
+        page = (array("l", _EMPTY_VALUES), bytearray(_EMPTY_FLAGS))
+        self.pages[number] = page
+        if self.regions:
+            base = number << PAGE_BITS
+            end = base + PAGE_SIZE
+            index = bisect_left(self.region_starts, end)
+            while index > 0 and self.regions[index - 1].stop > base:
+                index -= 1
+                region = self.regions[index]
+                first = max(region.start, base)
+                stop = min(region.stop, end)
+                page[0][first - base : stop - base] = region.values(first, stop)
+                page[1][first - base : stop - base] = _STORED_FLAGS[: stop - first]
+        return page
+
+    def region_page(self, number: int) -> tuple[array, bytearray] | None:
+        """Allocates the page with the given number, if a region has cells in it
+
+        Returns:
+            tuple[array, bytearray] | None: the page, None if no region has cells in it
+        """
+        base = number << PAGE_BITS
+        index = bisect_left(self.region_starts, base + PAGE_SIZE)
+        if index > 0 and self.regions[index - 1].stop > base:
+            return self.new_page(number)
+        return None
+
+    def add_region(self, region: Region) -> None:
+        """Initializes the cells of a region. The cells are written when their page is allocated.
+        Cells on pages that are already allocated are written immediately.
+
+        Args:
+            region (Region): region that does not overlap the regions added before
+
+        Raises:
+            ValueError: the region overlaps another region
+        """
+        if region.stop <= region.start:
+            return
+        index = bisect_right(self.region_starts, region.start)
+        if (index > 0 and self.regions[index - 1].stop > region.start) or (
+            index < len(self.regions) and self.regions[index].start < region.stop
+        ):
+            raise ValueError(
+                f"The memory region {region.start} to {region.stop - 1} overlaps another region.\n"
+            )
+        lazy = region.stop - region.start
+        first_page = region.start >> PAGE_BITS
+        last_page = (region.stop - 1) >> PAGE_BITS
+        for number in [n for n in self.pages if first_page <= n <= last_page]:
+            first = max(region.start, number << PAGE_BITS)
+            stop = min(region.stop, (number + 1) << PAGE_BITS)
+            self.load_run(first, region.values(first, stop))
+            lazy -= stop - first
+        self.regions.insert(index, region)
+        self.region_starts.insert(index, region.start)
+        self.length += lazy
+
+    def segments(
+        self,
+    ) -> Iterator[tuple[int, int, tuple[array, bytearray] | None, Region | None]]:
+        """Splits the memory into allocated pages and runs of region cells on pages that are not allocated
+
+        Returns:
+            Iterator[tuple[int, int, tuple[array, bytearray] | None, Region | None]]: (start, stop, page, None)
+                for an allocated page, (start, stop, None, region) for the cells start to stop - 1 of a region.
+                In ascending order of the addresses.
+        """
+        numbers = sorted(self.pages)
+        runs = []
+        for region in self.regions:
+            position = region.start
+            index = bisect_left(numbers, position >> PAGE_BITS)
+            while position < region.stop:
+                if index < len(numbers) and numbers[index] << PAGE_BITS < region.stop:
+                    base = numbers[index] << PAGE_BITS
+                    if position < base:
+                        runs.append((position, base, None, region))
+                    position = max(position, base + PAGE_SIZE)
+                    index += 1
+                else:
+                    runs.append((position, region.stop, None, region))
+                    break
+        pages = (
+            (number << PAGE_BITS, (number + 1) << PAGE_BITS, self.pages[number], None)
+            for number in numbers
+        )
+        return merge(pages, runs, key=lambda segment: segment[0])
+
+    def load_run(self, start: int, values: array, flags: bytes | None = None) -> None:
+        """Writes consecutive cells page by page, much faster than writing them one by one
+
+        Args:
+            start (int): address of the first cell
+            values (array): array("l") with the values of the cells
+            flags (bytes | None): STORED or EMPTY for every cell, EMPTY cells are skipped and need the value 0.
+                None writes every cell.
+        """
+        if self.journal is not None or self.fingerprint is not None:
+            offsets = range(len(values))
+            for offset in offsets if flags is None else compress(offsets, flags):
+                self[start + offset] = values[offset]
+            return
+        position = 0
+        while position < len(values):
+            address = start + position
+            number = address >> PAGE_BITS
+            offset = address & PAGE_MASK
+            count = min(PAGE_SIZE - offset, len(values) - position)
+            page = self.pages.get(number)
+            if page is None:
+                page = self.new_page(number)
+            page_values, page_flags = page
+            end = offset + count
+            if flags is None:
+                run_flags = _STORED_FLAGS[:count]
+            else:
+                run_flags = flags[position : position + count]
+                if page_flags.count(EMPTY, offset, end) != count:
+                    # skipped cells must keep their current value
+                    for skipped in compress(range(count), run_flags):
+                        self[address + skipped] = values[position + skipped]
+                    position += count
+                    continue
+            large = page_flags.find(LARGE, offset, end)
+            while large >= 0:
+                del self.large[(number << PAGE_BITS) + large]
+                large = page_flags.find(LARGE, large + 1, end)
+            # the run replaces all cells in its range
+            self.length -= count - page_flags.count(EMPTY, offset, end)
+            self.length += run_flags.count(STORED)
+            page_values[offset:end] = values[position : position + count]
+            page_flags[offset:end] = run_flags
+            position += count
+
+    def get(self, key, default=None):
+        if self.watch is not None:
+            # read the cell as usual, then report it
+            watch, self.watch = self.watch, None
+            try:
+                value = self.get(key, default)
+            finally:
+                self.watch = watch
+            watch.read(key, value)
+            return value
+        try:
+            page = self.pages.get(key >> PAGE_BITS)
+            offset = key & PAGE_MASK
+        except TypeError:
+            return default
+        if page is None:
+            if not self.regions:
+                return default
+            page = self.region_page(key >> PAGE_BITS)
+            if page is None:
+                return default
+        flag = page[1][offset]
+        if flag == STORED:
+            return page[0][offset]
+        if flag == LARGE:
+            return self.large[key]
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        page = self.pages.get(key >> PAGE_BITS)
+        if page is None:
+            page = self.new_page(key >> PAGE_BITS)
+        values, flags = page
+        offset = key & PAGE_MASK
+        flag = flags[offset]
+        journal = self.journal
+        fingerprint = self.fingerprint
+        watch = self.watch
+        if journal is not None or fingerprint is not None or watch is not None:
+            old = self.large[key] if flag == LARGE else values[offset]
+            if journal is not None:
+                journal.append((key, flag, old))
+            if watch is not None:
+                watch.written(key, old, value)
+            if fingerprint is not None:
+                try:
+                    change = value - old
+                except TypeError:
+                    change = _fingerprint_value(value) - _fingerprint_value(old)
+                self.fingerprint = fingerprint + change * (key ^ _FINGERPRINT_SEED)
+        if flag == EMPTY:
+            self.length += 1
+        elif flag == LARGE:
+            del self.large[key]
+        try:
+            values[offset] = value
+            flags[offset] = STORED
+        except (OverflowError, TypeError):
+            values[offset] = 0
+            flags[offset] = LARGE
+            self.large[key] = value
+
+    def __delitem__(self, key) -> None:
+        if self.get(key, self) is self:
+            raise KeyError(key)
+        values, flags = self.pages[key >> PAGE_BITS]
+        offset = key & PAGE_MASK
+        if self.journal is not None:
+            self.journal.append((key, flags[offset], self[key]))
+        if self.fingerprint is not None:
+            old = _fingerprint_value(self[key])
+            self.fingerprint -= old * (key ^ _FINGERPRINT_SEED)
+        if flags[offset] == LARGE:
+            del self.large[key]
+        values[offset] = 0
+        flags[offset] = EMPTY
+        self.length -= 1
+
+    def restore(self, key: int, flag: int, value) -> None:
+        """Reverts a cell to the state recorded in the journal
+
+        Args:
+            key (int): address of the cell
+            flag (int): EMPTY if the cell was not written before, else STORED/LARGE
+            value: previous value of the cell
+        """
+        if flag != EMPTY:
+            self[key] = value
+        elif key in self:
+            del self[key]
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self) is not self
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the addresses of all written cells in ascending order"""
+        for start, stop, page, _ in self.segments():
+            if page is None:
+                yield from range(start, stop)
+            else:
+                yield from compress(range(start, stop), page[1])
+
+    def rank(self, address: int) -> int:
+        """Number of written cells with an address lower than the given address"""
+        count = 0
+        for start, stop, page, _ in self.segments():
+            if start >= address:
+                break
+            end = min(stop, address) - start
+            if page is None:
+                count += end
+            else:
+                count += end - page[1].count(EMPTY, 0, end)
+        return count
+
+    def addresses(self, first: int, count: int) -> list[int]:
+        """Addresses of the written cells with the ranks first to first + count - 1 (see rank()).
+        Whole pages before the first cell are skipped by counting their flags.
+
+        Args:
+            first (int): rank of the first cell
+            count (int): maximum number of addresses
+
+        Returns:
+            list[int]: addresses in ascending order
+        """
+        addresses = []
+        if count <= 0:
+            return addresses
+        skip = first
+        for start, stop, page, _ in self.segments():
+            if page is None:
+                written = stop - start
+                if skip >= written:
+                    skip -= written
+                    continue
+                take = min(count - len(addresses), written - skip)
+                addresses.extend(range(start + skip, start + skip + take))
+                skip = 0
+                if len(addresses) == count:
+                    return addresses
+                continue
+            flags = page[1]
+            written = PAGE_SIZE - flags.count(EMPTY)
+            if skip >= written:
+                skip -= written
+                continue
+            for address in compress(range(start, stop), flags):
+                if skip:
+                    skip -= 1
+                    continue
+                addresses.append(address)
+                if len(addresses) == count:
+                    return addresses
+        return addresses
+
+    def out_of_range(
+        self, min_address: int, max_address: int, min_value: int, max_value: int
+    ) -> list[tuple[int, object]]:
+        """Cells whose address or value is out of range, or whose value is no int. Whole pages are checked at
+        once, only the cells of pages that fail are looked at one by one. If the value range is that of a signed
+        integer of whole bytes (e.g. 32 bits), the values are checked by their bytes (see values_fit) without
+        a Python int per cell, else with min() / max(). Cells of regions are only checked if their page is
+        allocated.
+
+        Args:
+            min_address (int): smallest valid address
+            max_address (int): largest valid address
+            min_value (int): smallest valid value
+            max_value (int): largest valid value
+
+        Returns:
+            list[tuple[int, object]]: (address, value) of the invalid cells, in ascending order of the addresses
+        """
+        invalid = []
+        width = (max_value.bit_length() + 1) // 8
+        if not (
+            width
+            and min_value == -max_value - 1
+            and max_value == (1 << 8 * width - 1) - 1
+        ):
+            width = None  # no signed integer of whole bytes
+        for number, (values, flags) in self.pages.items():
+            base = number << PAGE_BITS
+            if (
+                min_address <= base
+                and base + PAGE_MASK <= max_address
+                and (
+                    values_fit(values, width)
+                    if width
+                    else min_value <= min(values) and max(values) <= max_value
+                )
+            ):
+                continue  # empty cells and large values hold 0 in values, 0 is always valid
+            for offset in compress(range(PAGE_SIZE), flags):
+                address = base + offset
+                if flags[offset] == STORED and not (
+                    min_address <= address <= max_address
+                    and min_value <= values[offset] <= max_value
+                ):
+                    invalid.append((address, values[offset]))
+        for address, value in self.large.items():
+            if not (
+                isinstance(value, int)
+                and min_address <= address <= max_address
+                and min_value <= value <= max_value
+            ):
+                invalid.append((address, value))
+        invalid.sort(key=lambda cell: cell[0])
+        return invalid
+
+    def items(self) -> ItemsView:
+        """(address, value) of all written cells in ascending order of the addresses"""
+        return _Items(self)
+
+    def values(self) -> ValuesView:
+        return _Values(self)
+
+    def iter_items(self) -> Iterator[tuple[int, int]]:
+        large = self.large
+        for base, stop, page, region in self.segments():
+            if page is None:
+                # computed page by page, the run may be much larger than the memory
+                for first in range(base, stop, PAGE_SIZE):
+                    end = min(first + PAGE_SIZE, stop)
+                    yield from zip(range(first, end), region.values(first, end))
+                continue
+            values, flags = page
+            for offset in compress(range(PAGE_SIZE), flags):
+                if flags[offset] == STORED:
+                    yield (base + offset, values[offset])
+                else:
+                    yield (base + offset, large[base + offset])
+
+    def clear(self) -> None:
+        self.pages.clear()
+        self.large.clear()
+        self.regions.clear()
+        self.region_starts.clear()
+        self.length = 0
+        # the fingerprint is relative to the cells that were just dropped
+        self.fingerprint = None
+
+    def size(self) -> int:
+        """Approximate number of bytes used by the pages"""
+        return (
+            len(self.pages) * PAGE_SIZE * (array("l").itemsize + 1)
+            + len(self.large) * 64
+        )
+
+    def copy(self) -> "PagedMemory":
+        """Copy of the memory. Copies whole pages instead of single cells."""
+        return PagedMemory(self)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: dict) -> "PagedMemory":
+        # The cells only hold ints, so a copy of the pages is a deep copy
+        return self.copy()
+
+    def __repr__(self) -> str:
+        return f"PagedMemory({dict(self.items())})"
+
+
+class MemoryWindow:
+    """Rows of the memory browser: a window of consecutive written cells, ordered by address.
+    Moving the window only changes numbers, the cells are looked up in read().
+    """
+
+    def __init__(self, rows: int) -> None:
+        """
+        Args:
+            rows (int): number of cells in the window
+        """
+        self.rows = rows
+        self.first = 0  # rank of the first cell in the window (see PagedMemory.rank)
+        self.anchor: int | None = None  # address the window moves to on the next read()
+
+    def read(self, memory: PagedMemory) -> tuple[int, int, list[tuple[int, int]]]:
+        """Looks up the cells of the window. If there are less written cells than rows,
+        the rows are filled up with the empty cells after the last written one.
+
+        Args:
+            memory (PagedMemory): memory to read
+
+        Returns:
+            tuple[int, int, list[tuple[int, int]]]: rank of the first cell, number of written cells,
+                (address, value) of every row
+        """
+        total = len(memory)
+        if self.anchor is not None:
+            self.first = memory.rank(self.anchor)
+            self.anchor = None
+        self.first = max(0, min(self.first, total - self.rows))
+        addresses = memory.addresses(self.first, self.rows)
+        start = addresses[-1] + 1 if addresses else 0
+        addresses.extend(range(start, start + self.rows - len(addresses)))
+        return (
+            self.first,
+            total,
+            [(address, memory.get(address, 0)) for address in addresses],
+        )
+
+
+class _Items(ItemsView):
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return self._mapping.iter_items()
+
+
+class _Values(ValuesView):
+    def __iter__(self) -> Iterator[int]:
+        return (value for _, value in self._mapping.iter_items())
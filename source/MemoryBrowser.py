@@ -0,0 +1,189 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Memory table of the DebuggerGUI. Only the widgets of the visible rows exist. Scrolling moves a MemoryWindow
+# over the written cells and writes the cells of the new window into the same widgets, so the browser is as
+# fast with hundreds of thousands of written cells as with ten.
+
+import tkinter as tk
+from tkinter.messagebox import showerror
+from typing import Callable, Iterable
+from Assembler import MAX_MEMORY_CELL_SIZE
+from Memory import PagedMemory, MemoryWindow
+from TkinterHelper import Entry, FONT, ToolTip
+
+ROWS = 10  # number of visible rows
+_MASK = (1 << MAX_MEMORY_CELL_SIZE) - 1
+_HEX_DIGITS = (MAX_MEMORY_CELL_SIZE + 3) // 4
+
+
+class MemoryBrowser(tk.Frame):
+    """Scrollable table of the written memory cells with an address, a decimal, a binary and a hex column"""
+
+    def __init__(self, master, on_move: Callable[[], None], rows: int = ROWS):
+        """
+        Args:
+            master: parent widget
+            on_move (Callable[[], None]): called after the user moved the window, has to show the new cells
+            rows (int): number of visible rows
+        """
+        tk.Frame.__init__(self, master)
+        self.window = MemoryWindow(rows)
+        self.on_move = on_move
+        self.total = 0  # number of written cells
+        # (address, value) shown in every row, to skip rows that did not change
+        self.shown: list[tuple[int, int] | None] = [None] * rows
+        self.row_of: dict[int, int] = dict()  # shown address -> row
+        self.rows: list[tuple[Entry, Entry, Entry, tk.Label]] = []
+        # address entry -> (decimal entry, binary entry), used to inject custom values
+        self.entries: dict[Entry, tuple[Entry, Entry]] = dict()
+        self.setup()
+
+    def setup(self):
+        """Setup the legend, the rows, the scrollbar and the address jump"""
+        legend = tk.Label(
+            master=self,
+            text="Memory Cell  |  Value (decimal)  |  Value (binary)  |  Value (hex)",
+            font=FONT,
+            anchor="w",
+        )
+        legend.pack(side=tk.TOP)
+
+        self.jump_frame = tk.Frame(master=self)
+        self.jump_frame.pack(side=tk.TOP, fill=tk.X, pady=2)
+        self.jump_label = tk.Label(
+            master=self.jump_frame, text="Go to address:", font=FONT
+        )
+        self.jump_label.pack(side=tk.LEFT)
+        self.jump_entry = Entry(
+            master=self.jump_frame, width=12, font=FONT, justify="right"
+        )
+        self.jump_entry.pack(side=tk.LEFT)
+        self.jump_entry.bind("<Return>", lambda e: self.jump())
+        self.jump_button = tk.Button(
+            master=self.jump_frame, text="Go", font=FONT, command=lambda: self.jump()
+        )
+        self.jump_button_tooltip = ToolTip(
+            widget=self.jump_button,
+            text="Scroll to the first written memory cell at or after this address (decimal or 0x hex)",
+        )
+        self.jump_button.pack(side=tk.LEFT, padx=5)
+
+        self.table = tk.Frame(master=self)
+        self.table.pack(side=tk.TOP, fill=tk.X, expand=True)
+        self.scrollbar = tk.Scrollbar(
+            master=self.table, orient="vertical", command=self.scroll
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for _ in range(self.window.rows):
+            row = tk.Frame(master=self.table)
+            row.pack(side=tk.TOP, fill=tk.X, expand=True, padx=2, pady=1)
+
+            select = Entry(master=row, width=12, font=FONT, justify="right")
+            select.pack(side=tk.LEFT, expand=True)
+            decimal = Entry(master=row, width=12, font=FONT, justify="right")
+            decimal.pack(side=tk.LEFT, expand=True)
+            binary = Entry(
+                master=row, width=MAX_MEMORY_CELL_SIZE, font=FONT, justify="right"
+            )
+            binary.pack(side=tk.LEFT, expand=True)
+            hexadecimal = tk.Label(
+                master=row, width=_HEX_DIGITS + 1, font=FONT, anchor="e"
+            )
+            hexadecimal.pack(side=tk.LEFT, expand=True)
+
+            for widget in (row, select, decimal, binary, hexadecimal):
+                widget.bind("<MouseWheel>", self.wheel)
+                widget.bind("<Button-4>", lambda e: self.scroll("scroll", -1, "units"))
+                widget.bind("<Button-5>", lambda e: self.scroll("scroll", 1, "units"))
+            self.rows.append((select, decimal, binary, hexadecimal))
+            self.entries[select] = (decimal, binary)
+
+    def refresh(self, memory: PagedMemory, addresses: Iterable[int] | None = None):
+        """Shows the current values of memory
+
+        Args:
+            memory (PagedMemory): memory of the Assembler
+            addresses (Iterable[int] | None): addresses of the cells that changed since the last refresh.
+                None reads the whole window again and rewrites every row.
+        """
+        if addresses is not None and len(memory) == self.total:
+            # no cell was added or removed, so the window still shows the same addresses
+            for address in addresses:
+                row = self.row_of.get(address)
+                if row is not None:
+                    self.set_row(row, address, memory.get(address, 0))
+            return
+        self.show(*self.window.read(memory), force=addresses is None)
+
+    def show(
+        self,
+        first: int,
+        total: int,
+        cells: list[tuple[int, int]],
+        force: bool = False,
+    ):
+        """Writes a window of cells (see MemoryWindow.read) into the rows
+
+        Args:
+            first (int): rank of the first cell
+            total (int): number of written cells
+            cells (list[tuple[int, int]]): (address, value) of every row
+            force (bool): also rewrite rows that show the same cell as before, e.g. to reset invalid user input
+        """
+        for row, (address, value) in enumerate(cells):
+            if force or self.shown[row] != (address, value):
+                self.set_row(row, address, value)
+        self.row_of = {address: row for row, (address, _) in enumerate(cells)}
+        self.total = total
+        if total:
+            self.scrollbar.set(first / total, min(1, (first + len(cells)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def set_row(self, row: int, address: int, value: int):
+        """Writes one cell into a row"""
+        select, decimal, binary, hexadecimal = self.rows[row]
+        select.set(address)
+        decimal.set(str(value))
+        # Two's complement, like the registers
+        binary.set("{:0{}b}".format(value & _MASK, MAX_MEMORY_CELL_SIZE))
+        hexadecimal.configure(text="{:0{}X}".format(value & _MASK, _HEX_DIGITS))
+        self.shown[row] = (address, value)
+
+    def scroll(self, action: str, amount: str | int, unit: str | None = None):
+        """Command of the scrollbar: moves the window and lets on_move show it
+
+        Args:
+            action (str): "moveto" or "scroll"
+            amount (str | int): fraction for "moveto", number of units/pages for "scroll"
+            unit (str | None): "units" (one row) or "pages" (all rows)
+        """
+        if action == "moveto":
+            self.window.first = round(float(amount) * self.total)
+        else:
+            rows = self.window.rows if unit == "pages" else 1
+            self.window.first = max(0, self.window.first + int(amount) * rows)
+        self.on_move()
+        return "break"
+
+    def wheel(self, event: tk.Event):
+        """Scrolls one row per step of the mouse wheel"""
+        return self.scroll("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def jump(self):
+        """Moves the window to the address of the jump entry"""
+        text = self.jump_entry.get().strip()
+        try:
+            address = int(text, 0)
+        except ValueError:
+            showerror(
+                "Input Error",
+                f"The string '{text}' is not a valid memory address.",
+            )
+            return
+        self.window.anchor = address
+        self.on_move()
@@ -0,0 +1,168 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Binary memory images. Large JSON memory files are slow to load: the whole file is decoded into a dict of string
+# keys and every cell is converted one by one. A memory image stores runs of cells as raw words:
+#   header:  magic b"RETIMEM\0" | version (uint32) | number of runs (uint32)
+#   run:     start address (uint64) | number of words (uint32) | number of empty cells (uint32)
+#            | words (int32, two's complement) | if there are empty cells: one byte per word, 1 if the cell is stored
+# Everything is little-endian. Cells of the same page or with at most MAX_GAP empty cells between them share a run,
+# the empty cells are written as 0. So a sparse memory still has at most about one run per page and the run
+# overhead does not grow with the number of cells. The loader memory-maps the file and copies every run page by
+# page into a PagedMemory, so loading never touches single cells in Python. Version 1 images have no empty cells
+# and no count of them in the run header.
+# Convert a JSON memory file with:
+#   python MemoryImage.py memory.json memory.mem
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from Assembler import MAX_MEMORY_CELL_SIZE
+from Memory import EMPTY, PAGE_BITS, STORED, PagedMemory, SIGN_EXTENSION
+
+MAGIC = b"RETIMEM\0"
+VERSION = 2
+EXTENSION = ".mem"
+# empty cells between two cells of different pages that are still written into one run
+MAX_GAP = 16
+_HEADER = struct.Struct("<8sII")
+_RUNS = {1: struct.Struct("<QI"), 2: struct.Struct("<QII")}
+_WORD_SIZE = 4
+# presence bytes of the image -> flags of PagedMemory
+_FLAGS = bytes((EMPTY,)) + bytes((STORED,)) * 255
+# Values of the cells are stored in words, so they need to fit into both
+_VALUE_BITS = min(MAX_MEMORY_CELL_SIZE, 8 * _WORD_SIZE)
+
+
+def is_image(path: str) -> bool:
+    """True if the file at path starts like a memory image"""
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def widen(words: bytes) -> array:
+    """Converts little-endian int32 words into an array("l") without a Python loop over the words"""
+    if array("l").itemsize != 8 or sys.byteorder != "little":
+        narrow = array("i", words)
+        if sys.byteorder == "big":
+            narrow.byteswap()
+        return array("l", narrow)
+    # copy the four bytes of every word and fill the upper four bytes with its sign
+    wide = bytearray(2 * len(words))
+    for byte in range(4):
+        wide[byte::8] = words[byte::4]
+    sign = words[3::4].translate(SIGN_EXTENSION)
+    for byte in range(4, 8):
+        wide[byte::8] = sign
+    values = array("l")
+    values.frombytes(wide)
+    return values
+
+
+def read_image(path: str) -> PagedMemory:
+    """Loads a memory image
+
+    Args:
+        path (str): path of the image
+
+    Raises:
+        ValueError: the file is no valid memory image
+
+    Returns:
+        PagedMemory: memory with the cells of the image
+    """
+    memory = PagedMemory()
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as image:
+            if len(image) < _HEADER.size:
+                raise ValueError(f"{path} is too short to be a memory image.\n")
+            magic, version, runs = _HEADER.unpack_from(image, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a memory image.\n")
+            if version not in _RUNS:
+                raise ValueError(
+                    f"{path} is a memory image of version {version}, but I can only read versions up to {VERSION}.\n"
+                )
+            run = _RUNS[version]
+            position = _HEADER.size
+            for _ in range(runs):
+                if position + run.size > len(image):
+                    raise ValueError(f"The memory image {path} is truncated.\n")
+                start, count, *empty = run.unpack_from(image, position)
+                position += run.size
+                end = position + count * _WORD_SIZE
+                flags = None
+                if empty and empty[0]:
+                    flags = image[end : end + count].translate(_FLAGS)
+                    end += count
+                if end > len(image):
+                    raise ValueError(f"The memory image {path} is truncated.\n")
+                words = image[position : position + count * _WORD_SIZE]
+                memory.load_run(start, widen(words), flags)
+                position = end
+    return memory
+
+
+def write_image(path: str, memory: Mapping[int, int]) -> int:
+    """Writes the cells of a memory into an image
+
+    Args:
+        path (str): path of the image
+        memory (Mapping[int, int]): address -> value. Every value needs to fit into a word.
+
+    Raises:
+        ValueError: an address is negative or a value does not fit into a word
+
+    Returns:
+        int: number of runs
+    """
+    runs: list[tuple[int, array, bytearray]] = []
+    previous = None
+    for address, value in sorted(memory.items()):
+        if address < 0:
+            raise ValueError(f"Memory address {address} is negative.\n")
+        if not -(2 ** (_VALUE_BITS - 1)) <= value < 2 ** (_VALUE_BITS - 1):
+            raise ValueError(
+                f"The value {value} of memory cell {address} does not fit into {_VALUE_BITS} bits.\n"
+            )
+        gap = None if previous is None else address - previous - 1
+        if gap is not None and (
+            address >> PAGE_BITS == previous >> PAGE_BITS or gap <= MAX_GAP
+        ):
+            _, words, stored = runs[-1]
+            if gap:
+                words.frombytes(bytes(gap * _WORD_SIZE))
+                stored.extend(bytes(gap))
+        else:
+            words, stored = array("i"), bytearray()
+            runs.append((address, words, stored))
+        words.append(value)
+        stored.append(1)
+        previous = address
+
+    run = _RUNS[VERSION]
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(runs)))
+        for start, words, stored in runs:
+            if sys.byteorder == "big":
+                words.byteswap()
+            empty = stored.count(0)
+            file.write(run.pack(start, len(words), empty))
+            file.write(words.tobytes())
+            if empty:
+                file.write(stored)
+    return len(runs)
+
+
+if __name__ == "__main__":
+    from Parser import create_memory
+
+    if len(sys.argv) != 3:
+        sys.exit(f"usage: python {sys.argv[0]} memory.json memory{EXTENSION}")
+    memory, _ = create_memory(sys.argv[1])
+    runs = write_image(sys.argv[2], memory)
+    print(f"Wrote {len(memory)} memory cells in {runs} runs to {sys.argv[2]}.")
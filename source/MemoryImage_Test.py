@@ -0,0 +1,119 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import json
+import os
+import random
+import struct
+import tempfile
+from array import array
+from Memory import PagedMemory, PAGE_SIZE
+from MemoryImage import MAGIC, MAX_GAP, read_image, write_image, is_image, widen
+from Parser import create_memory
+
+
+class TestMemoryImage(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def test_round_trip(self):
+        """An image holds the same cells as the memory it was written from, also across pages"""
+        random.seed(4)
+        cells = {
+            address: random.randint(-(2**31), 2**31 - 1)
+            for address in range(3 * PAGE_SIZE + 5)
+        }
+        cells.update({address: -1 for address in range(10**6, 10**6 + 7)})
+        cells[2**32 - 1] = 2**31 - 1
+        self.assertEqual(write_image(self.path("a.mem"), cells), 3)
+        self.assertTrue(is_image(self.path("a.mem")))
+        memory = read_image(self.path("a.mem"))
+        self.assertEqual(len(memory), len(cells))
+        self.assertEqual(dict(memory.items()), cells)
+
+    def test_sparse(self):
+        """Cells with gaps share a run per page, the empty cells of a run stay empty"""
+        cells = {address: address - 10**4 for address in range(0, 3 * PAGE_SIZE, 3)}
+        # MAX_GAP empty cells after the last cell of the third page
+        cells[3 * PAGE_SIZE - 3 + MAX_GAP + 1] = 5
+        cells[6 * PAGE_SIZE] = 6
+        self.assertEqual(write_image(self.path("a.mem"), cells), 2)
+        memory = read_image(self.path("a.mem"))
+        self.assertEqual(len(memory), len(cells))
+        self.assertEqual(dict(memory.items()), cells)
+        self.assertNotIn(1, memory)
+
+    def test_version_1(self):
+        """Images without empty cells in their runs are still read"""
+        with open(self.path("a.mem"), "wb") as file:
+            file.write(struct.pack("<8sII", MAGIC, 1, 2))
+            file.write(struct.pack("<QI", 4, 2) + array("i", [-3, 7]).tobytes())
+            file.write(struct.pack("<QI", 10**6, 1) + array("i", [9]).tobytes())
+        memory = read_image(self.path("a.mem"))
+        self.assertEqual(dict(memory.items()), {4: -3, 5: 7, 10**6: 9})
+
+    def test_widen(self):
+        """Sign extension of the words"""
+        words = array("i", [0, 1, -1, 2**31 - 1, -(2**31), 123456, -654321])
+        self.assertEqual(list(widen(words.tobytes())), list(words))
+
+    def test_load_run(self):
+        """load_run overwrites written cells and keeps the number of cells right"""
+        memory = PagedMemory({5: 1, PAGE_SIZE + 2: 2**70, 3 * PAGE_SIZE: 4})
+        memory.load_run(3, array("l", range(PAGE_SIZE)))
+        expected = {3 + offset: offset for offset in range(PAGE_SIZE)}
+        expected[3 * PAGE_SIZE] = 4
+        self.assertEqual(dict(memory.items()), expected)
+        self.assertEqual(len(memory), len(expected))
+        self.assertEqual(memory.large, dict())
+
+        memory.journal = []
+        memory.load_run(3, array("l", [7]))
+        self.assertEqual(memory.journal, [(3, 1, 0)])
+
+    def test_load_run_flags(self):
+        """load_run skips the empty cells of a run, also on pages that already hold cells"""
+        flags = bytes([1, 0, 1])
+        for cells in ({}, {4: 8, 5: 2**70}):
+            memory = PagedMemory(cells)
+            memory.load_run(3, array("l", [1, 0, 3]), flags)
+            self.assertEqual(dict(memory.items()), cells | {3: 1, 5: 3})
+            self.assertEqual(len(memory), len(cells | {3: 1, 5: 3}))
+            self.assertEqual(memory.large, dict())
+
+            memory.journal = []
+            memory.load_run(10, array("l", [1, 0, 3]), flags)
+            self.assertEqual(memory.journal, [(10, 0, 0), (12, 0, 0)])
+
+    def test_create_memory(self):
+        """create_memory loads JSON files and images alike, invalid images raise SyntaxError"""
+        with open(self.path("a.json"), "w") as file:
+            json.dump({"1": 101, "6": 7, "7": -98}, file)
+        memory, _ = create_memory(self.path("a.json"))
+        write_image(self.path("a.mem"), memory)
+        self.assertFalse(is_image(self.path("a.json")))
+        image, message = create_memory(self.path("a.mem"))
+        self.assertEqual(dict(image.items()), {1: 101, 6: 7, 7: -98})
+        self.assertIn("3 cells", message)
+
+        with open(self.path("a.mem"), "rb") as file:
+            data = file.read()
+        with open(self.path("b.mem"), "wb") as file:
+            file.write(data[:-2])
+        with self.assertRaises(SyntaxError):
+            create_memory(self.path("b.mem"))
+
+        with self.assertRaises(ValueError):
+            write_image(self.path("c.mem"), {1: 2**31})
+
+
+if __name__ == "__main__":
+    unittest.main()
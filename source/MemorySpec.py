@@ -0,0 +1,149 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Regions of a memory file. Next to the single cells, a .json memory file may hold a list "regions":
+#   {
+#   "1": 101,
+#   "regions": [
+#       {"start": 1000, "end": 500000, "first": 0, "step": 1},   cells 1000 to 500000 hold 0, 1, 2, ...
+#       {"start": 600000, "count": 4096, "value": 7},            4096 cells hold 7
+#       {"start": 700000, "blob": "data.bin"}                    the int32 little-endian words of data.bin
+#   ]
+#   }
+# "end" is the last address of the region, "count" the number of cells. The path of a blob is relative to the
+# memory file. Single cells overwrite the cells of regions, regions must not overlap each other.
+# The regions are added to the PagedMemory as they are, a cell is only computed when its page is used first.
+# So the size of the memory file and the time to load it do not depend on the size of the regions.
+
+import mmap
+import os
+import sys
+from array import array
+from dataclasses import dataclass
+from Memory import Region, EXTREMES_CHUNK
+from MemoryImage import widen
+
+_WORD_SIZE = 4
+
+
+@dataclass(frozen=True)
+class Fill(Region):
+    """Every cell holds the same value"""
+
+    value: int
+
+    def values(self, first: int, stop: int) -> array:
+        return array("l", (self.value,)) * (stop - first)
+
+    def extremes(self) -> tuple[int, int]:
+        return (self.value, self.value)
+
+
+@dataclass(frozen=True)
+class Sequence(Region):
+    """Arithmetic sequence: the cell at start holds first, every following cell step more"""
+
+    first: int
+    step: int
+
+    def values(self, first: int, stop: int) -> array:
+        value = self.first + (first - self.start) * self.step
+        if self.step == 0:
+            return array("l", (value,)) * (stop - first)
+        return array("l", range(value, value + (stop - first) * self.step, self.step))
+
+    def extremes(self) -> tuple[int, int]:
+        last = self.first + (self.stop - 1 - self.start) * self.step
+        return (min(self.first, last), max(self.first, last))
+
+
+@dataclass(frozen=True)
+class Blob(Region):
+    """The cells hold the int32 little-endian words of a file"""
+
+    words: mmap.mmap | bytes
+    bits = 8 * _WORD_SIZE
+
+    def values(self, first: int, stop: int) -> array:
+        offset = (first - self.start) * _WORD_SIZE
+        return widen(self.words[offset : offset + (stop - first) * _WORD_SIZE])
+
+    def extremes(self) -> tuple[int, int]:
+        """Scans the words in chunks of EXTREMES_CHUNK, without widening them"""
+        smallest = largest = None
+        view = memoryview(self.words)
+        size = EXTREMES_CHUNK * _WORD_SIZE
+        for offset in range(0, (self.stop - self.start) * _WORD_SIZE, size):
+            words = array("i")
+            words.frombytes(view[offset : offset + size])
+            if sys.byteorder == "big":
+                words.byteswap()
+            low, high = min(words), max(words)
+            if smallest is None or low < smallest:
+                smallest = low
+            if largest is None or high > largest:
+                largest = high
+        view.release()
+        return (smallest, largest)
+
+
+def _integer(spec: dict, key: str) -> int:
+    value = spec[key]
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"'{key}' of the memory region {spec} is not an integer.\n")
+    return value
+
+
+def _stop(spec: dict, start: int) -> int:
+    """Address after the last cell of a region with "end" or "count\""""
+    if "end" in spec:
+        return _integer(spec, "end") + 1
+    if "count" in spec:
+        return start + _integer(spec, "count")
+    raise ValueError(f"The memory region {spec} needs an 'end' or a 'count'.\n")
+
+
+def _blob(path: str) -> mmap.mmap | bytes:
+    """Memory-maps a blob, empty files can not be mapped"""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_region(spec: dict, directory: str) -> Region:
+    """Turns the description of a region in a memory file into a Region
+
+    Args:
+        spec (dict): description of the region, see above
+        directory (str): directory of the memory file, blobs are relative to it
+
+    Raises:
+        ValueError: the description is invalid
+        FileNotFoundError: the blob does not exist
+
+    Returns:
+        Region: region for PagedMemory.add_region
+    """
+    if not isinstance(spec, dict) or "start" not in spec:
+        raise ValueError(f"The memory region {spec} needs a 'start'.\n")
+    start = _integer(spec, "start")
+    if "blob" in spec:
+        try:
+            words = _blob(os.path.join(directory, spec["blob"]))
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Unable to find the blob {spec['blob']} of the memory region {spec}.\n"
+            )
+        return Blob(start, start + len(words) // _WORD_SIZE, words)
+    stop = _stop(spec, start)
+    if "value" in spec:
+        return Fill(start, stop, _integer(spec, "value"))
+    if "first" in spec:
+        step = _integer(spec, "step") if "step" in spec else 1
+        return Sequence(start, stop, _integer(spec, "first"), step)
+    raise ValueError(
+        f"The memory region {spec} needs a 'value', a 'first' (and 'step') or a 'blob'.\n"
+    )
@@ -0,0 +1,176 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+from Memory import PagedMemory, MemoryWindow, Region, PAGE_SIZE, EXTREMES_CHUNK
+from MemorySpec import Fill, Sequence, Blob
+from Parser import create_memory, MemoryRangeError
+
+
+class TestMemorySpec(unittest.TestCase):
+    def test_lazy(self):
+        """Cells of a region are computed on the first access of their page and count as written"""
+        memory = PagedMemory({5: 1})
+        memory.add_region(Sequence(1000, 500_001, 0, 1))
+        memory.add_region(Fill(10**9, 10**9 + 4096, 7))
+        self.assertEqual(len(memory), 1 + 499_001 + 4096)
+        self.assertEqual(len(memory.pages), 1)
+        self.assertEqual(memory.get(1000), 0)
+        self.assertEqual(memory[250_000], 249_000)
+        self.assertEqual(memory.get(500_001, 0), 0)
+        self.assertNotIn(999, memory)
+        self.assertEqual(memory[10**9 + 4095], 7)
+        self.assertEqual(len(memory.pages), 4)
+
+        memory[300_000] = -1  # writing into a region overwrites the cell
+        self.assertEqual(memory[300_000], -1)
+        self.assertEqual(memory[300_001], 299_001)
+        del memory[1000]
+        self.assertEqual(len(memory), 1 + 499_001 + 4096 - 1)
+
+        pages = len(memory.pages)
+        copy = memory.copy()
+        self.assertEqual(copy[400_000], 399_000)
+        self.assertEqual(len(copy), len(memory))
+        self.assertEqual(len(memory.pages), pages)  # not allocated in the original
+
+        self.assertEqual(memory.rank(1001), 1)
+        self.assertEqual(memory.rank(10**9 + 1), len(memory) - 4095)
+        self.assertEqual(memory.addresses(0, 3), [5, 1001, 1002])
+        self.assertEqual(memory.addresses(299_000, 2), [300_000, 300_001])
+        self.assertEqual(len(memory.pages), pages)  # counted from the bounds of the regions
+        items = dict(memory.items())
+        self.assertEqual(len(items), len(memory))
+        self.assertEqual(list(items), list(memory))
+        self.assertEqual(items[400_000], 399_000)
+
+    def test_window_stays_lazy(self):
+        """The memory browser only allocates the pages of the cells it shows"""
+        memory = PagedMemory()
+        memory.add_region(Fill(0, 50_000_000, 3))
+        window = MemoryWindow(10)
+        self.assertEqual(window.read(memory)[:2], (0, 50_000_000))
+        window.anchor = 30_000_000
+        first, _, cells = window.read(memory)
+        self.assertEqual((first, cells[0]), (30_000_000, (30_000_000, 3)))
+        self.assertEqual(len(memory.pages), 2)
+
+    def test_overlap(self):
+        """Regions must not overlap, but may cover pages that are already written"""
+        memory = PagedMemory({PAGE_SIZE + 3: 9, 2: 4})
+        memory.add_region(Fill(PAGE_SIZE, 2 * PAGE_SIZE, 1))
+        self.assertEqual(memory[PAGE_SIZE + 3], 1)
+        self.assertEqual(len(memory), PAGE_SIZE + 1)
+        for region in (
+            Fill(0, PAGE_SIZE + 1, 0),
+            Fill(2 * PAGE_SIZE - 1, 3 * PAGE_SIZE, 0),
+        ):
+            with self.assertRaises(ValueError):
+                memory.add_region(region)
+
+    def test_create_memory(self):
+        """Regions of a .json memory file, single cells overwrite them"""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "data.bin"), "wb") as file:
+                file.write(array("i", [3, -4, 5]).tobytes())
+            with open(os.path.join(directory, "memory.json"), "w") as file:
+                json.dump(
+                    {
+                        "1": 101,
+                        "1001": -5,
+                        "regions": [
+                            {"start": 1000, "end": 500000, "first": 0, "step": 2},
+                            {"start": 600000, "count": 4096, "value": 7},
+                            {"start": 700000, "blob": "data.bin"},
+                        ],
+                    },
+                    file,
+                )
+            memory, _ = create_memory(os.path.join(directory, "memory.json"))
+            self.assertEqual(len(memory), 1 + 499_001 + 4096 + 3)
+            self.assertEqual(
+                [memory.get(address) for address in (1, 1000, 1001, 1002, 500000)],
+                [101, 0, -5, 4, 998_000],
+            )
+            self.assertEqual(memory[604095], 7)
+            self.assertEqual([memory[700000 + i] for i in range(3)], [3, -4, 5])
+            self.assertNotIn(700003, memory)
+
+            for region in (
+                {"start": 5},
+                {"start": 5, "end": 6},
+                {"start": "5", "count": 1, "value": 1},
+            ):
+                with open(os.path.join(directory, "memory.json"), "w") as file:
+                    json.dump({"regions": [region]}, file)
+                with self.assertRaises(SyntaxError):
+                    create_memory(os.path.join(directory, "memory.json"))
+
+    def test_extremes(self):
+        """Smallest and largest value over several chunks, blobs without widening them"""
+        words = array("i", range(-100_000, 100_000))
+        words[123_456] = 2**31 - 1
+        words[3] = -(2**31)
+        if sys.byteorder == "big":
+            words.byteswap()
+        blob = Blob(5, 5 + len(words), words.tobytes())
+        self.assertEqual(blob.extremes(), (-(2**31), 2**31 - 1))
+        self.assertEqual(blob.bits, 32)
+        sequence = Sequence(0, 3 * EXTREMES_CHUNK + 7, 10, -1)
+        self.assertEqual(sequence.extremes(), (10 - 3 * EXTREMES_CHUNK - 6, 10))
+        self.assertEqual(Region.extremes(sequence), (10 - 3 * EXTREMES_CHUNK - 6, 10))
+
+    def test_abstract(self):
+        """A region without values can not be created"""
+
+        @dataclass(frozen=True)
+        class Incomplete(Region):
+            value: int
+
+        with self.assertRaises(TypeError):
+            Incomplete(0, 10, 5)
+
+    def test_validation(self):
+        """create_memory reports every cell and region out of range at once"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.json")
+            cells = {str(address): address for address in range(0, 100_000)}
+            cells.update({"5": 2**31, "-3": 1, "4294967297": 0})
+            cells["regions"] = [
+                {"start": 200_000, "count": 10, "first": 2**31 - 5},
+                {"start": 300_000, "count": 10**12, "value": 1},
+            ]
+            with open(path, "w") as file:
+                json.dump(cells, file)
+            with self.assertRaises(MemoryRangeError) as context:
+                create_memory(path)
+            self.assertEqual(len(context.exception.violations), 4)
+            self.assertIn("4 memory cells or regions", str(context.exception))
+            self.assertIn("Memory cell 5 holds 2147483648", str(context.exception))
+            self.assertEqual(
+                [
+                    violation.split(" holds")[0]
+                    for violation in context.exception.violations[-2:]
+                ],
+                ["Memory cell -3", "Memory cell 5"],
+            )
+
+            del cells["regions"]
+            cells.update({"5": 5, "-3": 0, "4294967297": 0})
+            del cells["-3"], cells["4294967297"]
+            with open(path, "w") as file:
+                json.dump(cells, file)
+            memory, _ = create_memory(path)
+            self.assertEqual(len(memory), 100_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
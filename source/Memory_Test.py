@@ -0,0 +1,192 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import random
+from copy import deepcopy
+from Decoder_Test import load_assembler
+from Memory import PagedMemory, MemoryWindow, PAGE_SIZE
+
+
+class TestPagedMemory(unittest.TestCase):
+    def test_behaves_like_dict(self):
+        """Random writes, reads and deletes give the same results as a dict"""
+        random.seed(2)
+        memory = PagedMemory()
+        expected = dict()
+        for _ in range(5000):
+            key = random.choice(
+                [random.randint(-50, 50), random.randint(0, 2**32), 3 * PAGE_SIZE]
+            )
+            operation = random.random()
+            if operation < 0.6:
+                value = random.randint(-(2**31), 2**31 - 1)
+                memory[key] = value
+                expected[key] = value
+            elif operation < 0.7 and key in expected:
+                del memory[key]
+                del expected[key]
+            self.assertEqual(memory.get(key, 0), expected.get(key, 0))
+            self.assertEqual(key in memory, key in expected)
+        self.assertEqual(len(memory), len(expected))
+        self.assertEqual(list(memory.items()), sorted(expected.items()))
+        self.assertEqual(list(memory), sorted(expected))
+        self.assertEqual(memory, expected)
+
+    def test_get(self):
+        """Test get with and without default"""
+        memory = PagedMemory({5: 0, 7: 3})
+        self.assertEqual(memory.get(5, 1), 0)
+        self.assertEqual(memory.get(6, 0), 0)
+        self.assertIsNone(memory.get(6))
+        self.assertIsNone(memory.get("6"))
+        self.assertEqual(memory[7], 3)
+        with self.assertRaises(KeyError):
+            memory[6]
+
+    def test_values_that_do_not_fit(self):
+        """Values beyond the size of a C long or of another type are kept as well"""
+        memory = PagedMemory()
+        memory[1] = 2**100
+        memory[2] = None
+        memory[3] = 4
+        self.assertEqual(memory[1], 2**100)
+        self.assertIsNone(memory[2])
+        memory[1] = 5
+        self.assertEqual(memory[1], 5)
+        self.assertEqual(memory.large, {2: None})
+        self.assertEqual(dict(memory.items()), {1: 5, 2: None, 3: 4})
+
+    def test_copy(self):
+        """Copies are independent of the original"""
+        memory = PagedMemory({1: 1, 5000: 2})
+        for copy in (memory.copy(), deepcopy(memory), PagedMemory(memory)):
+            copy[1] = 10
+            copy[9999] = 3
+            self.assertEqual(memory, {1: 1, 5000: 2})
+            self.assertEqual(copy, {1: 10, 5000: 2, 9999: 3})
+
+    def test_fingerprint(self):
+        """The fingerprint only depends on the cells, not on the writes that lead to them"""
+        random.seed(5)
+        first = PagedMemory({1: 4, 2: 2**70})
+        second = first.copy()
+        self.assertIsNone(second.fingerprint)
+        first.fingerprint = second.fingerprint = 0
+        for _ in range(2000):
+            key = random.randint(0, 3 * PAGE_SIZE)
+            first[key] = random.choice([random.randint(-9, 9), 2**80, None])
+            if random.random() < 0.1:
+                del first[key]
+        for key, value in first.items():
+            second[key] = value
+        for key in list(second):
+            if key not in first:
+                del second[key]
+        self.assertEqual(first, second)
+        self.assertEqual(first.fingerprint, second.fingerprint)
+        second[1] += 1
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+        first.clear()
+        self.assertIsNone(first.fingerprint)
+
+    def test_rank_and_addresses(self):
+        """rank() and addresses() agree with the sorted addresses"""
+        random.seed(4)
+        keys = random.sample(range(-PAGE_SIZE, 20 * PAGE_SIZE), 3000)
+        memory = PagedMemory({key: 1 for key in keys})
+        for key in keys[:500]:
+            del memory[key]
+        expected = sorted(keys[500:])
+        for address in random.sample(range(-PAGE_SIZE, 21 * PAGE_SIZE), 200):
+            self.assertEqual(memory.rank(address), sum(k < address for k in expected))
+        for first in random.sample(range(len(expected) + 5), 200):
+            self.assertEqual(memory.addresses(first, 7), expected[first : first + 7])
+        self.assertEqual(memory.addresses(0, 0), [])
+
+    def test_out_of_range(self):
+        """out_of_range finds every invalid cell, also in pages that are valid on average"""
+        memory = PagedMemory({address: address - 500 for address in range(3000)})
+        memory[5] = 2**40
+        memory[2000] = 2**70  # large value
+        memory[2001] = "1"  # no int
+        memory[2**20] = 7
+        memory[-1] = 0
+        self.assertEqual(
+            memory.out_of_range(0, 2**20 - 1, -500, 2**40),
+            [(-1, 0), (2000, 2**70), (2001, "1"), (2**20, 7)],
+        )
+        self.assertEqual(
+            [address for address, _ in memory.out_of_range(0, 2**20, -400, 2000)],
+            [-1] + list(range(100)) + [2000, 2001] + list(range(2501, 3000)),
+        )
+
+        # ranges of signed integers of whole bytes are checked by the bytes of the values
+        for bits in (8, 16, 32):
+            low, high = -(2 ** (bits - 1)), 2 ** (bits - 1) - 1
+            memory = PagedMemory({1: low, 2: high, 3: -1, 2000: 0})
+            self.assertEqual(memory.out_of_range(0, 2**20, low, high), [])
+            memory[3] = high + 1
+            memory[2000] = low - 1
+            self.assertEqual(
+                memory.out_of_range(0, 2**20, low, high),
+                [(3, high + 1), (2000, low - 1)],
+            )
+        self.assertEqual(PagedMemory({1: 8}).out_of_range(0, 10, -8, 7), [(1, 8)])
+
+    def test_memory_window(self):
+        """The window is clamped to the written cells and filled up with empty cells"""
+        memory = PagedMemory({key: key * 2 for key in range(0, 3000, 3)})
+        window = MemoryWindow(4)
+        window.anchor = 1000
+        self.assertEqual(
+            window.read(memory), (334, 1000, [(1002, 2004), (1005, 2010), (1008, 2016), (1011, 2022)])
+        )
+        window.first = 5000
+        first, total, cells = window.read(memory)
+        self.assertEqual((first, total), (996, 1000))
+        self.assertEqual(cells[-1], (2997, 5994))
+        window = MemoryWindow(4)
+        self.assertEqual(
+            window.read(PagedMemory({5: 1})), (0, 1, [(5, 1), (6, 0), (7, 0), (8, 0)])
+        )
+
+    def assert_assembler_commands(self, module):
+        """Every command of the Assembler computes the same with a PagedMemory as with a dict"""
+        random.seed(3)
+        registers = list(module.REGISTERS.values())
+        for method, argument_types in module.COMMANDS.values():
+            for _ in range(30):
+                arguments = tuple(
+                    (
+                        random.choice(registers)
+                        if kind == "register"
+                        else random.randint(0, 12)
+                    )
+                    for kind in argument_types
+                )
+                cells = {k: random.randint(-9, 9) for k in range(0, 14, 3)}
+                expected = module.Assembler(s=dict(cells), max_pc=20)
+                actual = module.Assembler(s=PagedMemory(cells), max_pc=20)
+                try:
+                    result = getattr(expected, method)(*arguments)
+                except Exception as e:
+                    with self.assertRaises(type(e)):
+                        getattr(actual, method)(*arguments)
+                    continue
+                self.assertEqual(result, getattr(actual, method)(*arguments))
+                self.assertEqual(expected, actual)
+
+    def test_assembler_ti(self):
+        """Test all commands of Assembler_TI"""
+        self.assert_assembler_commands(load_assembler("Assembler_TI"))
+
+    def test_assembler_bs(self):
+        """Test all commands of Assembler_BS"""
+        self.assert_assembler_commands(load_assembler("Assembler_BS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
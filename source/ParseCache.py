@@ -0,0 +1,182 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Persistent cache of parsed programs, so analyzing the same program again (in the StartGUI or in every test
+# case of a grading run) skips the InstructionParser. An entry is keyed by the SHA-256 of the program text, the
+# active instruction set (ASSEMBLER_NAME, COMMANDS, REGISTERS, MAX_INTERMEDIATE_SIZE) and the parser options.
+# Changing any of them leads to a different entry, so an entry never has to be invalidated.
+#
+# Entry format: zlib-compressed marshal of (FORMAT_VERSION, table, line numbers, indices). The table holds every
+# distinct instruction once as (line_raw, command, arguments), the instructions are two array("I") with the line
+# number and the table index of every instruction. Handlers can not be stored, they are decoded once per table
+# entry when the entry is loaded, which is cheap because the Decoder caches the function of every command.
+#
+# Every load touches the file, when the directory grows beyond max_bytes the least recently used entries are
+# deleted. The cache is only an optimization: a cache that can not be read or written behaves like an empty one.
+
+import marshal
+import os
+import zlib
+from array import array
+from hashlib import sha256
+from Assembler import ASSEMBLER_NAME, COMMANDS, REGISTERS, MAX_INTERMEDIATE_SIZE
+from Decoder import decode_instruction
+from Instruction import Instruction
+
+# Default location of the cache
+CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "reti_debugger")
+# Default size of the cache directory, before the least recently used entries are deleted
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Increase whenever the entry format changes
+FORMAT_VERSION = 1
+EXTENSION = ".parse"
+# Lines of the program that are encoded and hashed at once by ParseCache.key
+KEY_CHUNK_LINES = 4096
+
+# Identifies the instruction set and the entry format. Part of every key.
+_ISA = repr(
+    (
+        FORMAT_VERSION,
+        marshal.version,
+        ASSEMBLER_NAME,
+        sorted(COMMANDS.items()),
+        sorted(REGISTERS.items()),
+        MAX_INTERMEDIATE_SIZE,
+    )
+).encode()
+
+
+class ParseCache:
+    """Directory of parsed programs, keyed by program text, instruction set and parser options"""
+
+    def __init__(
+        self, directory: str = CACHE_DIRECTORY, max_bytes: int = MAX_CACHE_BYTES
+    ) -> None:
+        """
+        Args:
+            directory (str): directory of the entries, created on the first store
+            max_bytes (int): size of all entries, before the least recently used ones are deleted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(
+        self, lines: list[str], expect_semicolon: bool, case_sensitive: bool
+    ) -> str:
+        """Key of a program. The lines are hashed in chunks, without joining the whole program into one string.
+
+        Args:
+            lines (list[str]): lines of the program file, with their line breaks
+            expect_semicolon (bool): option of the InstructionParser
+            case_sensitive (bool): option of the InstructionParser
+
+        Returns:
+            str: hex digest that identifies the parsed program
+        """
+        digest = sha256(_ISA)
+        digest.update(bytes((expect_semicolon, case_sensitive)))
+        for start in range(0, len(lines), KEY_CHUNK_LINES):
+            chunk = "".join(lines[start : start + KEY_CHUNK_LINES])
+            digest.update(chunk.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def load(self, key: str) -> list[Instruction] | None:
+        """Decoded instructions of an entry
+
+        Args:
+            key (str): key of the program, see key()
+
+        Returns:
+            list[Instruction] | None: instructions with handlers, None if there is no (readable) entry
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            version, table, line_numbers, indices = marshal.loads(
+                zlib.decompress(data)
+            )
+            if version != FORMAT_VERSION:
+                return None
+            os.utime(path)  # mark as recently used
+        except (OSError, EOFError, ValueError, TypeError, zlib.error):
+            return None
+
+        decoded = []
+        for line_raw, command, arguments in table:
+            instruction = Instruction(0, line_raw, command, arguments)
+            decoded.append(
+                (line_raw, command, arguments, decode_instruction(instruction))
+            )
+        return [
+            Instruction(line_number, *decoded[index])
+            for line_number, index in zip(
+                array("I", line_numbers), array("I", indices)
+            )
+        ]
+
+    def store(self, key: str, instructions: list[Instruction]) -> None:
+        """Writes the instructions into an entry and deletes old entries if the cache is too large
+
+        Args:
+            key (str): key of the program, see key()
+            instructions (list[Instruction]): parsed instructions
+        """
+        # the parsed command and arguments only depend on line_raw
+        index: dict[str, int] = dict()
+        table = []
+        line_numbers = array("I")
+        indices = array("I")
+        for instruction in instructions:
+            position = index.get(instruction.line_raw)
+            if position is None:
+                position = index[instruction.line_raw] = len(table)
+                table.append(
+                    (instruction.line_raw, instruction.command, instruction.arguments)
+                )
+            line_numbers.append(instruction.line_number)
+            indices.append(position)
+        data = zlib.compress(
+            marshal.dumps(
+                (FORMAT_VERSION, table, line_numbers.tobytes(), indices.tobytes())
+            ),
+            1,
+        )
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)  # readers never see half-written entries
+            self.evict()
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """Deletes the least recently used entries until all entries fit into max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(EXTENSION):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
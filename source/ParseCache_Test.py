@@ -0,0 +1,100 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import tempfile
+from Assembler import Assembler
+from Memory import PagedMemory
+from ParseCache import ParseCache, EXTENSION
+from Parser import InstructionParser
+from Parser_Test import write_program
+
+
+def entries(cache: ParseCache) -> list[str]:
+    return [name for name in os.listdir(cache.directory) if name.endswith(EXTENSION)]
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ParseCache(os.path.join(directory.name, "cache"))
+        self.program = write_program(
+            ["LOADI ACC 3; # counter", "", "ADDI IN1 7;", "SUBI ACC 1;", "JUMP> -2;"]
+        )
+        self.addCleanup(os.remove, self.program)
+
+    def parse(self, **options) -> tuple[InstructionParser, str]:
+        parser = InstructionParser(**options)
+        return (parser, parser.parse(self.program, self.cache))
+
+    def test_hit(self):
+        """The second parse of a program loads the same instructions from the cache"""
+        parsed, message = self.parse()
+        self.assertNotIn("cache", message)
+        cached, message = self.parse()
+        self.assertIn("cache", message)
+        self.assertEqual(cached.instructions, parsed.instructions)
+        self.assertEqual(cached.raw_text, parsed.raw_text)
+
+        assembler = Assembler(s=PagedMemory())
+        assembler.max_pc = len(cached.instructions)
+        while assembler.pc < len(cached.instructions):
+            if cached.instructions[assembler.pc].handler(assembler):
+                assembler.pc += 1
+        self.assertEqual((assembler.acc, assembler.in1), (0, 21))
+
+    def test_key(self):
+        """Other parser options or another program text use another entry"""
+        self.parse()
+        _, message = self.parse(case_sensitive=True)
+        self.assertNotIn("cache", message)
+        _, message = self.parse(expect_semicolon=False)
+        self.assertNotIn("cache", message)
+        self.assertEqual(len(entries(self.cache)), 3)
+
+        with open(self.program, "a") as file:
+            file.write("NOP;\n")
+        parser, message = self.parse()
+        self.assertNotIn("cache", message)
+        self.assertEqual(parser.instructions[-1].command, "nop")
+
+    def test_errors_are_not_cached(self):
+        """A program with an error raises every time"""
+        with open(self.program, "a") as file:
+            file.write("NOPE;\n")
+        for _ in range(2):
+            with self.assertRaises(KeyError):
+                self.parse()
+        self.assertFalse(os.path.exists(self.cache.directory))
+
+    def test_corrupt_entry(self):
+        """An unreadable entry is parsed again and replaced"""
+        self.parse()
+        (name,) = entries(self.cache)
+        with open(os.path.join(self.cache.directory, name), "wb") as file:
+            file.write(b"garbage")
+        _, message = self.parse()
+        self.assertNotIn("cache", message)
+        _, message = self.parse()
+        self.assertIn("cache", message)
+
+    def test_eviction(self):
+        """The least recently used entries are deleted once the cache is too large"""
+        self.parse()
+        (name,) = entries(self.cache)
+        size = os.path.getsize(os.path.join(self.cache.directory, name))
+        self.cache.max_bytes = 2 * size + size // 2
+        self.parse(case_sensitive=True)
+        os.utime(os.path.join(self.cache.directory, name), (0, 0))  # least recently used
+        self.parse(expect_semicolon=False)
+        remaining = entries(self.cache)
+        self.assertEqual(len(remaining), 2)
+        self.assertNotIn(name, remaining)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,36 +3,146 @@
 # License: MIT (view License.txt)
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
+import os
+import re
 from dataclasses import dataclass, field
+from itertools import count
+from types import MethodType
 from json import loads, JSONDecodeError
-from Assembler import COMMANDS, REGISTERS, MAX_INTERMEDIATE_SIZE
+from typing import Callable
+from Assembler import (
+    COMMANDS,
+    REGISTERS,
+    MAX_INTERMEDIATE_SIZE,
+    MAX_MEMORY_ADDRESS,
+    MAX_MEMORY_CELL_SIZE,
+)
 from Instruction import Instruction
+from Decoder import decode_command, decode_instruction
+from Memory import PagedMemory
+from MemoryImage import is_image, read_image
+from MemorySpec import parse_region
+from ParseCache import ParseCache
+
+
+# Matches every line of a program. A well-formed line consists of indent, command, registers (start with a letter),
+# an optional integer, semicolon and comment. Groups: instruction, command and registers, integer, semicolon.
+# All groups are empty for other lines, they take the slow path in InstructionParser.strip and
+# InstructionParser.parse_line, which also reports the errors.
+_LINES = re.compile(
+    r"^[ \t]*(?:(([^\s#;]+(?:[ \t]+[A-Za-z][^\s#;]*)*)(?:[ \t]+([-+]?[0-9]+))?)(;?)[ \t]*(?:#.*)?|.*)$",
+    re.MULTILINE,
+)
+# Number of lines matched at once, findall() returns a tuple of strings for every line
+_CHUNK_LINES = 4096
+_INTEGER_RANGE = (
+    -(2 ** (MAX_INTERMEDIATE_SIZE - 1)),
+    2 ** (MAX_INTERMEDIATE_SIZE - 1) - 1,
+)
+
+# Number of violations listed in the message of a MemoryRangeError
+MAX_LISTED_VIOLATIONS = 20
+
+
+class MemoryRangeError(SyntaxError):
+    """Memory file with addresses or values out of range. Holds every invalid cell and region."""
+
+    def __init__(self, filepath: str, violations: list[str]) -> None:
+        self.violations = violations
+        listed = "".join(violations[:MAX_LISTED_VIOLATIONS])
+        more = len(violations) - MAX_LISTED_VIOLATIONS
+        SyntaxError.__init__(
+            self,
+            f"I found {len(violations)} memory cells or regions out of range in {filepath}. Addresses need to be within [0, {2 ** MAX_MEMORY_ADDRESS}], values within [{-(2 ** (MAX_MEMORY_CELL_SIZE - 1))}, {2 ** (MAX_MEMORY_CELL_SIZE - 1) - 1}]:\n{listed}"
+            + (f"... and {more} more.\n" if more > 0 else ""),
+        )
+
+
+def check_memory(memory: PagedMemory) -> list[str]:
+    """
+    Checks that every address of the memory lies within [0, 2^MAX_MEMORY_ADDRESS] and every value fits into
+    MAX_MEMORY_CELL_SIZE bits, like the Assembler does at runtime. Pages are checked as a whole by the bytes of
+    their values (see PagedMemory.out_of_range), about 10 ms per million allocated cells, and regions by their
+    smallest and largest value. Regions whose values always fit (Region.bits, e.g. blobs) are not looked at.
+
+    Arguments:
+    memory: PagedMemory memory to check
+
+    Returns:
+    list[str]: a message for every invalid cell and region, empty if the memory is valid
+    """
+    max_address = 2**MAX_MEMORY_ADDRESS
+    min_value = -(2 ** (MAX_MEMORY_CELL_SIZE - 1))
+    max_value = 2 ** (MAX_MEMORY_CELL_SIZE - 1) - 1
+    violations = []
+    invalid_regions = []
+    for region in memory.regions:
+        if not (0 <= region.start and region.stop - 1 <= max_address):
+            violations.append(
+                f"The region from {region.start} to {region.stop - 1} exceeds the memory.\n"
+            )
+            invalid_regions.append(region)
+            continue
+        if region.bits is not None and region.bits <= MAX_MEMORY_CELL_SIZE:
+            continue  # e.g. the int32 words of a blob, no need to look at them
+        smallest, largest = region.extremes()
+        if not (min_value <= smallest and largest <= max_value):
+            violations.append(
+                f"The region from {region.start} to {region.stop - 1} holds values from {smallest} to {largest}.\n"
+            )
+            invalid_regions.append(region)
+    for address, value in memory.out_of_range(0, max_address, min_value, max_value):
+        # cells of invalid regions on allocated pages are already reported by their region
+        if not any(region.start <= address < region.stop for region in invalid_regions):
+            violations.append(f"Memory cell {address} holds {value!r}.\n")
+    return violations
 
 
-def create_memory(filepath: str) -> tuple[dict[int, int], str]:
+def create_memory(filepath: str) -> tuple[PagedMemory, str]:
     """
-    Converts a JSON-like dictionary into a Python dictionary of type dict[int, int], that is used as memory for the Assembler.
+    Converts a JSON-like dictionary into a PagedMemory (behaves like a dict[int, int]), that is used as memory for the Assembler.
+    Binary memory images (see MemoryImage.py) are recognized by their first bytes and loaded directly.
+    The JSON may also hold a list of "regions" (ranges, fills, sequences, blobs), see MemorySpec.py.
+    Raises a MemoryRangeError that lists every address and value out of range (see check_memory).
 
     Arguments:
-    filepath: str filepath of the json file
+    filepath: str filepath of the json file or memory image
 
     Returns:
-    Converted dictionary and status message: tuple[dict[int, int], str]
+    Converted memory and status message: tuple[PagedMemory, str]
     """
     if filepath == "":
         return (
-            {},
+            PagedMemory(),
             "Memory path was left empty. I will initialize the memory with 0. This is not an error.\n",
         )
 
     try:
-        with open(filepath, "r") as f:
-            content = f.read()
-            memory: dict[int, int] = loads(content)
-            memory = {
-                int(k): v for k, v in memory.items()
-            }  # json.load treats keys as strings. Convert them to int
-            return (memory, "Memory initialized successfully.\n")
+        if is_image(filepath):
+            try:
+                memory = read_image(filepath)
+            except ValueError as error:
+                raise SyntaxError(str(error))
+            message = f"Memory image with {len(memory)} cells initialized successfully.\n"
+        else:
+            with open(filepath, "r") as f:
+                content = f.read()
+                cells: dict[str, int] = loads(content)
+                regions = cells.pop("regions", []) if isinstance(cells, dict) else []
+                memory = PagedMemory()
+                try:
+                    for spec in regions:
+                        memory.add_region(parse_region(spec, os.path.dirname(filepath)))
+                except ValueError as error:
+                    raise SyntaxError(str(error))
+                memory.update(
+                    (int(k), v) for k, v in cells.items()
+                )  # json.load treats keys as strings. Convert them to int
+                message = "Memory initialized successfully.\n"
+        violations = check_memory(memory)
+        if violations:
+            raise MemoryRangeError(filepath, violations)
+        return (memory, message)
 
     except JSONDecodeError:
         memory_example = """
@@ -53,171 +163,380 @@ def create_memory(filepath: str) -> tuple[dict[int, int], str]:
         )
 
 
+@dataclass
+class Diagnostic:
+    line_number: int  # line of the error
+    column: int  # column of the error within the line, starts at 1
+    message: str  # error message
+
+    def __str__(self) -> str:
+        return f"Line {self.line_number}, column {self.column}: {self.message}"
+
+
 @dataclass
 class InstructionParser:
     expect_semicolon: bool = True
     case_sensitive: bool = False
     raw_text: list[str] = field(default_factory=list)
     instructions: list[Instruction] = field(default_factory=list)
-
-    def read_instructions(self, path: str) -> str:
+    # Raise on the first error (False) or check the whole program and collect all errors in diagnostics (True)
+    collect_errors: bool = False
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    # Lookup tables for commands and registers, built once per parser. Lowercase keys if not case sensitive.
+    commands: dict[str, tuple[str, tuple]] = field(init=False, repr=False)
+    registers: dict[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.case_sensitive:
+            self.commands = dict(COMMANDS)
+            self.registers = dict(REGISTERS)
+        else:
+            self.commands = {
+                command.lower(): value for command, value in COMMANDS.items()
+            }
+            self.registers = {
+                register.lower(): value for register, value in REGISTERS.items()
+            }
+
+    def parse(self, path: str, cache: ParseCache | None = None) -> str:
         """
-        Builds a list of instructions that are specified in the file at <path>.
-        Fills the member variables line_number, raw_line of each instruction in self.instructions
+        Reads the file at <path> and turns every line into a decoded Instruction in a single pass.
+        A well-formed line is split by one regular expression into its command with registers and its integer.
+        The command with registers is looked up and decoded once (see decode_shape), so for every further line
+        with the same command and registers only the integer is converted and bound to the shared function.
+        Fills self.raw_text and self.instructions. If a cache is given and holds the program, the instructions are
+        taken from the cache instead of being parsed.
+        If collect_errors is set, lines with errors are skipped and all errors are collected in self.diagnostics.
 
         Arguments:
         path: str filepath to the file that contains the instructions
+        cache: ParseCache | None cache of parsed programs, None to always parse
 
         Returns:
         str: message
         """
         if path == "":
             raise ValueError("program file path not set.")
+        raw_text = self.raw_text
+        instructions = self.instructions
+        append = instructions.append
         with open(path, "r") as file:
-            for line_number, line in enumerate(file, 1):  # Start line numbers from 1
-                self.raw_text.append(line)
+            raw_text.extend(file)
+        if cache is not None:
+            key = cache.key(raw_text, self.expect_semicolon, self.case_sensitive)
+            cached = cache.load(key)
+            if cached is not None:
+                instructions.extend(cached)
+                return f"I loaded all {len(instructions)} decoded instructions from the parse cache.\n"
+        # command with registers -> result of decode_shape
+        shapes: dict[str, tuple[str, tuple, Callable, Callable | None] | None] = dict()
+        lowest, highest = _INTEGER_RANGE
+        semicolon_optional = not self.expect_semicolon
+        for first in range(0, len(raw_text), _CHUNK_LINES):
+            lines = raw_text[first : first + _CHUNK_LINES]
+            # findall() has an extra empty match after the last newline, zip() drops it
+            for line_number, line, (line_raw, shape, integer, semicolon) in zip(
+                count(first + 1), lines, _LINES.findall("".join(lines))
+            ):
+                if shape and (semicolon or semicolon_optional):
+                    try:
+                        decoded = shapes[shape]
+                    except KeyError:
+                        decoded = shapes[shape] = self.decode_shape(shape)
+                    if decoded is not None:
+                        method, registers, function, handler = decoded
+                        if not integer:
+                            if handler is not None:
+                                append(
+                                    Instruction(
+                                        line_number,
+                                        line_raw,
+                                        method,
+                                        registers,
+                                        handler,
+                                    )
+                                )
+                                continue
+                        elif handler is None:
+                            value = int(integer)
+                            if lowest <= value <= highest:
+                                append(
+                                    Instruction(
+                                        line_number,
+                                        line_raw,
+                                        method,
+                                        (*registers, value),
+                                        MethodType(function, value),
+                                    )
+                                )
+                                continue
+                self.parse_slow(line, line_number)
+        if self.diagnostics:
+            return f"I found {len(self.diagnostics)} errors in the program.\n"
+        if len(instructions) == 0:
+            raise ValueError(
+                f"The file at {path} is empty. Please select a file that contains instructions.\n"
+            )
+        if cache is not None:
+            cache.store(key, instructions)
+        return f"I parsed and decoded all {len(instructions)} instructions successfully.\n"
 
-                # Get rid of leading/trailing white spaces, comments and empty lines
-                line = line.strip()
-                if line.startswith("#") or line == "":
-                    continue
+    def parse_slow(self, line: str, line_number: int) -> None:
+        """
+        Parses a line the regular expression of parse() does not take: comments, empty lines, errors and
+        unusual formatting. Appends the instruction of the line to self.instructions, if it holds one without errors
 
-                # Get rid of any inline comments as well and remove any trailing white spaces that get added during inline comment removal
-                line = line.split("#", 1)[0].strip()
-                line = line.strip()
+        arguments:
+        line: str line of the program file
+        line_number: int line number (needed for error message)
+        """
+        errors = len(self.diagnostics)
+        line_raw = self.strip(line, line_number)
+        if line_raw is None:
+            return
+        indent = len(line) - len(line.lstrip())
+        decoded = self.parse_line(line_raw, line_number, indent)
+        if decoded is not None and len(self.diagnostics) == errors:
+            self.instructions.append(Instruction(line_number, line_raw, *decoded))
+
+    def decode_shape(
+        self, shape: str
+    ) -> tuple[str, tuple, Callable, Callable | None] | None:
+        """
+        Looks up the command and the registers of an instruction without its trailing integer and decodes them
 
-                if self.expect_semicolon and not line.endswith(";"):
-                    raise ValueError(
-                        f"There's a semicolon missing at line: '{line_number}' with content: '{line}'.\n I expect each instruction to end with a semicolon. You can deactivate this check within the GUI.\n"
-                    )
+        arguments:
+        shape: str command and register operands of an instruction, e.g. 'LOADIN IN1 ACC'
 
-                # remove the semicolon to make the output easier to work with
-                line = line.rstrip(";")
+        returns:
+        tuple[str, tuple, Callable, Callable | None] | None: name of the method, registers, function of the
+            command (see Decoder.decode_command), the handler if the command takes no integer.
+            None if the shape is invalid or the command takes its integers elsewhere; such lines are left to
+            parse_line.
+        """
+        command, *operands = shape.split()
+        key = command if self.case_sensitive else command.lower()
+        if key not in self.commands:
+            return None
+        method, needed_arguments = self.commands[key]
+        takes_integer = bool(needed_arguments) and needed_arguments[-1] is int
+        needed_registers = needed_arguments[:-1] if takes_integer else needed_arguments
+        if len(operands) != len(needed_registers) or any(
+            needed != "register" for needed in needed_registers
+        ):
+            return None
+        registers = tuple(
+            self.registers.get(operand if self.case_sensitive else operand.lower())
+            for operand in operands
+        )
+        if None in registers:
+            return None
+        if takes_integer:
+            return (method, registers, decode_command(method, (*registers, None)), None)
+        function = decode_command(method, registers)
+        return (method, registers, function, function)
+
+    def fail(
+        self, error: type[Exception], message: str, line_number: int, column: int
+    ) -> None:
+        """
+        Raises an error about a line of the program. If collect_errors is set, the error is recorded in
+        self.diagnostics instead, so the parser can go on and find the errors of the other lines
 
-                self.instructions.append(Instruction(line_number, line, "", tuple()))
-        if len(self.instructions) == 0:
-            raise ValueError(
-                f"The file at {path} is empty. Please select a file that contains instructions.\n"
-            )
-        return "Instructions read successfully. Will now try to parse them.\n"
+        arguments:
+        error: type[Exception] KeyError or ValueError
+        message: str error message
+        line_number: int line of the error
+        column: int column of the error within the line, starts at 1
+        """
+        if not self.collect_errors:
+            raise error(message)
+        self.diagnostics.append(Diagnostic(line_number, column, message))
 
-    def convert_commands(self) -> str:
+    def strip(self, line: str, line_number: int) -> str | None:
         """
-        Takes a list of instructions processed by read_instructions(). For every instruction fills the instruction.command member variable
-        and fills instruction.arguments with the types of arguments that are required for this command
+        Removes comments, white spaces and the semicolon from a line of the program
 
-        Returns:
-        str: status message
+        arguments:
+        line: str line of the program file
+        line_number: int line number (needed for error message)
+
+        returns:
+        str | None: the instruction of the line, None if the line holds no instruction
         """
-        valid_commands = COMMANDS
-        valid_commands_lower = {
-            command.lower(): COMMANDS[command] for command in list(COMMANDS.keys())
-        }
-        for instruction in self.instructions:
-            split = instruction.line_raw.split()
-            command = split[0]
-            if self.case_sensitive:
-                if command not in valid_commands.keys():
-                    raise KeyError(
-                        f"'{command}' is not a valid command. I found this command within '{instruction.line_raw}' at line {instruction.line_number}. I am case sensitive. You can disable case sensitivity within this GUI. Here is a list of valid commands: {list(valid_commands.keys())}\n"
-                    )
-                parsed_command, needed_arguments = valid_commands[command]
-            else:
-                if command.lower() not in valid_commands_lower.keys():
-                    raise KeyError(
-                        f"'{command}' is not a valid command. I found this command within '{instruction.line_raw}' at line {instruction.line_number}. I am NOT case sensitive, so this is not due to a Uppercase/Lowercase Error. Here is a list of valid commands: \n{list(valid_commands.keys())}\n"
-                    )
-                parsed_command, needed_arguments = valid_commands_lower[command.lower()]
+        # Get rid of leading/trailing white spaces, comments and empty lines
+        indent = len(line) - len(line.lstrip())
+        line = line.strip()
+        if line.startswith("#") or line == "":
+            return None
+
+        # Get rid of any inline comments as well and remove any trailing white spaces that get added during inline comment removal
+        if "#" in line:
+            line = line.split("#", 1)[0].strip()
+
+        if self.expect_semicolon and not line.endswith(";"):
+            self.fail(
+                ValueError,
+                f"There's a semicolon missing at line: '{line_number}' with content: '{line}'.\n I expect each instruction to end with a semicolon. You can deactivate this check within the GUI.\n",
+                line_number,
+                indent + len(line) + 1,
+            )
 
-            instruction.command = parsed_command
-            instruction.arguments = needed_arguments
-        return "Parse Stage 1 of 2 completed successfully. I parsed all commands. Will now try to parse their arguments.\n"
+        # remove the semicolon to make the output easier to work with
+        return line.rstrip(";")
 
-    def convert_arguments(self) -> str:
+    def parse_line(
+        self, line_raw: str, line_number: int, indent: int = 0
+    ) -> tuple[str, tuple, Callable] | None:
         """
-        Takes a list of instructions from convert_commands(). For every instruction fills the instruction.command member variable
-        and fills instruction.arguments with the types of arguments that are required for this command
+        Splits an instruction into its tokens, looks up the command and converts the arguments.
+        Then decodes the instruction into a ready-to-call handler, so the Debugger does not need to look up
+        commands and registers by name at runtime
 
-        Returns:
-        str Status Message
-        """
-        for instruction in self.instructions:
-            arguments = instruction.line_raw.split()[1:]
-            needed_arguments = instruction.arguments
-
-            if len(arguments) != len(needed_arguments):
-                error = f"I expected {len(needed_arguments)} arguments but got {len(arguments)} arguments. The required arguments are: {needed_arguments}. I encountered this error in line={instruction.line_number} with content={instruction.line_raw}.\n"
-                self.error = True
-                return error
-
-            parsed_arguments = list()
-            for number, needed_argument in enumerate(needed_arguments):
-                if needed_argument == "register":
-                    parsed_argument = self.prepare_register(
-                        arguments[number], instruction.line_raw, instruction.line_number
-                    )
-                else:
-                    parsed_argument = self.prepare_integer(
-                        arguments[number], instruction.line_raw, instruction.line_number
-                    )
-                parsed_arguments.append(parsed_argument)
-            instruction.arguments = tuple(parsed_arguments)
-        return "Parse Stage 2 of 2 completed successfully. I parsed all arguments.\n"
-
-    def prepare_register(self, register: str, line_raw: str, line_number: int) -> str:
+        arguments:
+        line_raw: str instruction without comments and semicolon
+        line_number: int line number (needed for error message)
+        indent: int number of white spaces in front of the instruction (needed for the column of errors)
+
+        returns:
+        tuple[str, tuple, Callable] | None: name of the method, converted arguments, handler.
+            None if the line has an error and collect_errors is set.
+        """
+        tokens = line_raw.split()
+        if not tokens:
+            self.fail(
+                ValueError,
+                f"I expected an instruction at line {line_number} but only found '{line_raw}'.\n",
+                line_number,
+                indent + 1,
+            )
+            return None
+        command = tokens[0]
+        arguments = tokens[1:]
+        key = command if self.case_sensitive else command.lower()
+        if key not in self.commands:
+            if self.case_sensitive:
+                self.fail(
+                    KeyError,
+                    f"'{command}' is not a valid command. I found this command within '{line_raw}' at line {line_number}. I am case sensitive. You can disable case sensitivity within this GUI. Here is a list of valid commands: {list(COMMANDS.keys())}\n",
+                    line_number,
+                    indent + 1,
+                )
+            else:
+                self.fail(
+                    KeyError,
+                    f"'{command}' is not a valid command. I found this command within '{line_raw}' at line {line_number}. I am NOT case sensitive, so this is not due to a Uppercase/Lowercase Error. Here is a list of valid commands: \n{list(COMMANDS.keys())}\n",
+                    line_number,
+                    indent + 1,
+                )
+            return None
+        method, needed_arguments = self.commands[key]
+
+        if len(arguments) != len(needed_arguments):
+            # the first surplus argument, or the end of the line if arguments are missing
+            surplus = tokens[len(needed_arguments) + 1 :]
+            column = (
+                line_raw.index(surplus[0], len(command)) if surplus else len(line_raw)
+            )
+            self.fail(
+                ValueError,
+                f"I expected {len(needed_arguments)} arguments but got {len(arguments)} arguments. The required arguments are: {needed_arguments}. I encountered this error in line={line_number} with content={line_raw}.\n",
+                line_number,
+                indent + column + 1,
+            )
+            return None
+        parsed_arguments = []
+        position = len(command)
+        for argument, needed_argument in zip(arguments, needed_arguments):
+            position = line_raw.index(argument, position)
+            column = indent + position + 1
+            position += len(argument)
+            parsed_arguments.append(
+                self.prepare_register(argument, command, line_raw, line_number, column)
+                if needed_argument == "register"
+                else self.prepare_integer(
+                    argument, command, line_raw, line_number, column
+                )
+            )
+        if None in parsed_arguments:
+            return None
+        parsed_arguments = tuple(parsed_arguments)
+        instruction = Instruction(line_number, line_raw, method, parsed_arguments)
+        return (method, parsed_arguments, decode_instruction(instruction))
+
+    def prepare_register(
+        self,
+        register: str,
+        command: str,
+        line_raw: str,
+        line_number: int,
+        column: int = 1,
+    ) -> str | None:
         """
         Some commands need a destination or source which can be any of the REGISTERS.
         Uses the REGISTERS dict to convert a raw register into a processed register
 
         arguments:
         register: str Attempts to convert this raw register into a processed register using the REGISTER dict
+        command: str Command of the instruction (needed for error message)
         line_raw: str Content of the line where instruction was found (needed for error message)
         line_number: int Line number of the instruction (needed for error message)
+        column: int Column of the register within the line (needed for error message)
 
         returns:
-        str: processed register
+        str | None: processed register, None if it is invalid and collect_errors is set
         """
-        valid_registers = REGISTERS
-        valid_registers_lower = {
-            register.lower(): REGISTERS[register] for register in list(REGISTERS.keys())
-        }
-
+        register_key = register if self.case_sensitive else register.lower()
+        processed = self.registers.get(register_key)
+        if processed is not None:
+            return processed
         if self.case_sensitive:
-            if register in valid_registers.keys():
-                return valid_registers[register]
-            else:
-                raise KeyError(
-                    f"I expected one of the registers {list(REGISTERS.keys())} for the command '{line_raw.split()[0]}' but got '{register}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'. Note: I am case sensitive. You can disable case sensitivity within the GUI.\n"
-                )
+            self.fail(
+                KeyError,
+                f"I expected one of the registers {list(REGISTERS.keys())} for the command '{command}' but got '{register}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'. Note: I am case sensitive. You can disable case sensitivity within the GUI.\n",
+                line_number,
+                column,
+            )
         else:
-            register_lower = register.lower()
-            if register_lower in valid_registers_lower.keys():
-                return valid_registers_lower[register_lower]
-            else:
-                raise KeyError(
-                    f"I expected one of the registers {list(REGISTERS.keys())} for the command '{line_raw.split()[0]}' but got '{register}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'. Note: I am NOT case sensitive, so this is not due to a Uppercase/Lowercase Error.\n"
-                )
+            self.fail(
+                KeyError,
+                f"I expected one of the registers {list(REGISTERS.keys())} for the command '{command}' but got '{register}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'. Note: I am NOT case sensitive, so this is not due to a Uppercase/Lowercase Error.\n",
+                line_number,
+                column,
+            )
+        return None
 
     def prepare_integer(
-        self, integer: str, line_raw: str, line_number: int
-    ) -> int | str:
+        self,
+        integer: str,
+        command: str,
+        line_raw: str,
+        line_number: int,
+        column: int = 1,
+    ) -> int | None:
         """
         Some commands need an integer. Converts the integer_string into an integer
 
         arguments:
         integer: str Integer to be converted to int
+        command: str Command of the instruction (needed for error message)
         line_raw: str Full Content of the line where instruction was found (needed for error message)
         line_number: int Line number of the instruction (needed for error message)
+        column: int Column of the integer within the line (needed for error message)
 
         returns:
-        int converted integer
+        int | None: converted integer, None if it is invalid and collect_errors is set
         """
         try:
             num = int(integer)
         except ValueError:
-            raise ValueError(
-                f"I expected an integer for the command '{line_raw.split()[0]}' but got '{integer}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'.\n"
+            self.fail(
+                ValueError,
+                f"I expected an integer for the command '{command}' but got '{integer}'. Error occurred on line: {line_number}. Content of that line: '{line_raw}'.\n",
+                line_number,
+                column,
             )
+            return None
 
         if (
             -(2 ** (MAX_INTERMEDIATE_SIZE - 1))
@@ -225,7 +544,10 @@ class InstructionParser:
             <= 2 ** (MAX_INTERMEDIATE_SIZE - 1) - 1
         ):
             return num
-        else:
-            raise ValueError(
-                f"I expected an integer between [{-2 ** (MAX_INTERMEDIATE_SIZE - 1)}, {2 ** (MAX_INTERMEDIATE_SIZE - 1) - 1}] but got {num}. Error occurred on line: {line_number}. Content of that line: '{line_raw}'.\n"
-            )
+        self.fail(
+            ValueError,
+            f"I expected an integer between [{-2 ** (MAX_INTERMEDIATE_SIZE - 1)}, {2 ** (MAX_INTERMEDIATE_SIZE - 1) - 1}] but got {num}. Error occurred on line: {line_number}. Content of that line: '{line_raw}'.\n",
+            line_number,
+            column,
+        )
+        return None
@@ -0,0 +1,144 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import tempfile
+from Assembler import Assembler
+from Parser import InstructionParser
+
+
+def write_program(lines: list[str]) -> str:
+    """Writes a temporary program file and returns its path"""
+    file = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+    with file:
+        file.writelines(line + "\n" for line in lines)
+    return file.name
+
+
+class TestInstructionParser(unittest.TestCase):
+    def parse(self, lines: list[str], **options) -> InstructionParser:
+        path = write_program(lines)
+        self.addCleanup(os.remove, path)
+        parser = InstructionParser(**options)
+        parser.parse(path)
+        return parser
+
+    def test_example(self):
+        """Every instruction of the example is parsed and decoded, comments and empty lines are skipped"""
+        directory = os.path.join(os.path.dirname(__file__), "Assembler_BS")
+        parser = InstructionParser(expect_semicolon=False)
+        message = parser.parse(os.path.join(directory, "Example.txt"))
+        self.assertIn(str(len(parser.instructions)), message)
+        with open(os.path.join(directory, "Example.txt")) as file:
+            self.assertEqual(parser.raw_text, file.readlines())
+        first = parser.instructions[0]
+        self.assertEqual(
+            (first.line_number, first.line_raw, first.command, first.arguments),
+            (11, "LOAD ACC 10", "load", ("acc", 10)),
+        )
+        jump = parser.instructions[2]
+        self.assertEqual((jump.line_raw, jump.arguments), ("JUMP= 4", (4,)))
+        for instruction in parser.instructions:
+            self.assertIsNotNone(instruction.handler)
+
+    def test_repeated_lines(self):
+        """Lines with the same command and registers share their function, but keep their own line number"""
+        parser = self.parse(["ADDI ACC 1;", "", "ADDI ACC 5;", "addi acc 1; # comment"])
+        first, second, third = parser.instructions
+        self.assertEqual([i.line_number for i in parser.instructions], [1, 3, 4])
+        self.assertIs(first.handler.__func__, second.handler.__func__)
+        self.assertEqual(third.line_raw, "addi acc 1")
+        self.assertEqual(third.arguments, ("acc", 1))
+
+    def test_slow_path(self):
+        """Lines the regular expression doesn't take are parsed by strip and parse_line to the same result"""
+        lines = [
+            "LOADI ACC -3;",
+            "\tloadi  acc\t+7 ;  # comment",
+            "ADDI IN1 5;;",
+            "  MOVE ACC IN1;#",
+            "move acc in2 ;",
+            "JUMP= 2;",
+            "JUMP -1;",
+            "LOADIN IN1 ACC 4;",
+            "NOP;",
+        ]
+        parser = self.parse(lines)
+        self.assertEqual(len(parser.instructions), len(lines))
+        for line, instruction in zip(lines, parser.instructions):
+            line_raw = parser.strip(line, instruction.line_number)
+            indent = len(line) - len(line.lstrip())
+            command, arguments, handler = parser.parse_line(
+                line_raw, instruction.line_number, indent
+            )
+            self.assertEqual(
+                (instruction.line_raw, instruction.command, instruction.arguments),
+                (line_raw, command, arguments),
+            )
+            expected, actual = (
+                Assembler(s={6: 4}, max_pc=9, in1=2, pc=5) for _ in "ab"
+            )
+            self.assertEqual(handler(expected), instruction.handler(actual), line)
+            self.assertEqual(expected, actual, line)
+
+    def test_case_sensitive(self):
+        """Lowercase commands and registers are only accepted if the parser is not case sensitive"""
+        self.assertEqual(
+            self.parse(["loadi acc 3;"]).instructions[0].arguments, ("acc", 3)
+        )
+        with self.assertRaises(KeyError):
+            self.parse(["loadi ACC 3;"], case_sensitive=True)
+        with self.assertRaises(KeyError):
+            self.parse(["LOADI acc 3;"], case_sensitive=True)
+
+    def test_errors(self):
+        """Invalid lines raise an error that names the line"""
+        for lines, error in (
+            (["LOADI ACC 3"], ValueError),  # semicolon missing
+            (["LOADX ACC 3;"], KeyError),  # unknown command
+            (["LOADI ACC;"], ValueError),  # argument missing
+            (["LOADI XYZ 3;"], KeyError),  # unknown register
+            (["LOADI ACC three;"], ValueError),  # no integer
+            (["LOADI ACC 99999999999;"], ValueError),  # integer too large
+            (["# only a comment"], ValueError),  # no instructions
+        ):
+            with self.assertRaises(error, msg=lines):
+                self.parse(["NOP;"] + lines if lines[0][0] != "#" else lines)
+        with self.assertRaisesRegex(ValueError, "line: '2'"):
+            self.parse(["LOADI ACC 3;", "LOADI ACC 3"])
+        self.assertEqual(
+            len(self.parse(["LOADI ACC 3"], expect_semicolon=False).instructions), 1
+        )
+
+    def test_collect_errors(self):
+        """All errors of the program are collected with line and column, valid lines are still parsed"""
+        parser = self.parse(
+            [
+                "LOADI ACC 3;",
+                "  LOADX ACC 3;",
+                "LOADI XYZ three; # two errors",
+                "LOADI ACC 3",
+                "LOADI ACC 3 4;",
+                "LOADI ACC;",
+                "  LOADX ACC 3;",
+                "ADDI ACC 1;",
+            ],
+            collect_errors=True,
+        )
+        self.assertEqual(
+            [(d.line_number, d.column) for d in parser.diagnostics],
+            [(2, 3), (3, 7), (3, 11), (4, 12), (5, 13), (6, 10), (7, 3)],
+        )
+        self.assertIn("'LOADX' is not a valid command", parser.diagnostics[0].message)
+        self.assertTrue(str(parser.diagnostics[0]).startswith("Line 2, column 3: "))
+        self.assertEqual([i.line_number for i in parser.instructions], [1, 8])
+
+        parser = self.parse(["LOADI ACC 3;"], collect_errors=True)
+        self.assertEqual(parser.diagnostics, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
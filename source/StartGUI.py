@@ -3,11 +3,15 @@
 # License: MIT (view License.txt)
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
+import os
 import tkinter as tk
 from Assembler import *
 from tkinter import filedialog
 import tkinter.messagebox as messagebox
-from Parser import create_memory, InstructionParser
+from Parser import create_memory, InstructionParser, MemoryRangeError
+from ParseCache import ParseCache
+from MemoryImage import EXTENSION as MEMORY_IMAGE_EXTENSION
+from Memory import PagedMemory
 from TkinterHelper import create_labeled_checkbox, Text, FONT, ToolTip
 from dataclasses import dataclass, field
 from Instruction import Instruction
@@ -94,6 +98,8 @@ class StartGUI:
         self.semicolonVar = tk.BooleanVar()
         self.caseSensitivityVar = tk.BooleanVar(value=True)
         self.debugVar = tk.BooleanVar(value=True)
+        self.fullStateVar = tk.BooleanVar(value=False)
+        self.logFileVar = tk.BooleanVar(value=False)
 
         create_labeled_checkbox(
             self.optionsFrame,
@@ -110,6 +116,16 @@ class StartGUI:
             "I will provide additional detailed debug messages:        ",
             self.debugVar,
         )
+        create_labeled_checkbox(
+            self.optionsFrame,
+            "I will print all memory cells after every step:           ",
+            self.fullStateVar,
+        )
+        create_labeled_checkbox(
+            self.optionsFrame,
+            "I will save all status messages next to the program (.log):",
+            self.logFileVar,
+        )
 
     def setup_control_frame(self) -> None:
         """Setup the control frame with all needed buttons and a text field for output messages"""
@@ -180,6 +196,8 @@ class StartGUI:
             self.backend.instructions,
             self.debugVar.get(),
             self.backend.raw_text,
+            self.fullStateVar.get(),
+            self.backend.log_path() if self.logFileVar.get() else None,
         )
 
 
@@ -189,11 +207,13 @@ class Start:
 
     program_path: str = ""
     memory_path: str = ""
-    memory: dict[int, int] = field(default_factory=dict)
+    memory: PagedMemory = field(default_factory=PagedMemory)
     instructions: list[Instruction] = field(default_factory=list)
     raw_text: list[str] = field(default_factory=list)
     program_error: bool = False
     memory_error: bool = False
+    # Analyzing the same program again skips the parser, also in later sessions. None to always parse.
+    parse_cache: ParseCache | None = field(default_factory=ParseCache)
 
     def select_memory(self, label: tk.Label, error: Callable) -> tk.Label:
         """Handles memory file selection.
@@ -209,8 +229,11 @@ class Start:
         if not file_path:
             error("File Error", "No memory file selected")
             return label
-        if not file_path.endswith(".json"):
-            error("File Error", "Memory file needs to be a .json")
+        if not file_path.endswith((".json", MEMORY_IMAGE_EXTENSION)):
+            error(
+                "File Error",
+                f"Memory file needs to be a .json or a memory image ({MEMORY_IMAGE_EXTENSION})",
+            )
             return label
         self.memory_path = file_path
         label.configure(text=file_path)
@@ -250,6 +273,13 @@ class Start:
             self.memory, message = create_memory(self.memory_path)
             output.append(message)
             return output
+        except MemoryRangeError as e:
+            # list every invalid cell, the message box only shows the first ones
+            for violation in e.violations:
+                output.append(violation)
+            error("Parsing Error", str(e))
+            self.memory_error = True
+            return output
         except (SyntaxError, FileNotFoundError) as e:
             error("Parsing Error", str(e))
             self.memory_error = True
@@ -267,14 +297,22 @@ class Start:
         Returns:
             str: Status messages from the parsing process.
         """
-        parser = InstructionParser(semicolon_check, case_sensitive)
+        parser = InstructionParser(semicolon_check, case_sensitive, collect_errors=True)
         try:
-            output.append(parser.read_instructions(self.program_path))
-            output.append(parser.convert_commands())
-            output.append(parser.convert_arguments())
+            output.append(parser.parse(self.program_path, self.parse_cache))
         except (KeyError, ValueError) as e:
             error("Parsing Error", str(e))
             self.program_error = True
+        if parser.diagnostics:
+            # list every error, so the program can be fixed in one go
+            for diagnostic in parser.diagnostics:
+                output.append(str(diagnostic))
+            first = parser.diagnostics[0]
+            error(
+                "Parsing Error",
+                f"I found {len(parser.diagnostics)} errors in the program. All of them are listed in the status messages. The first one is:\n{first}",
+            )
+            self.program_error = True
 
         self.instructions = parser.instructions
         self.raw_text = parser.raw_text
@@ -302,6 +340,10 @@ class Start:
             execute.configure(state="normal")
         return (output, execute)
 
+    def log_path(self) -> str:
+        """Path of the file that saves the status messages: the program path with the extension .log"""
+        return os.path.splitext(self.program_path)[0] + ".log"
+
     def reset_errors(self):
         """Resets errors of the backend."""
         self.program_error = False
@@ -0,0 +1,220 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Status messages of the DebuggerGUI. The messages are kept in a ring buffer (Log), the oldest ones are dropped
+# or written to a spill file. The status text field only holds a bounded window of the messages (StatusLog):
+# new messages are inserted once per idle round of Tk, old ones are deleted from the top, and scrolling to the
+# top or the bottom of the text field loads the neighbouring messages. So every insert costs the same, no
+# matter how long the session is running.
+
+from collections import deque
+from itertools import islice
+from typing import TextIO
+import tkinter as tk
+from TkinterHelper import Text
+
+# Default number of messages kept in memory
+MAX_LOG_ENTRIES = 20_000
+# Number of messages shown in the text field at once
+VIEW_ENTRIES = 500
+# Number of messages loaded when scrolling beyond the shown ones
+PAGE_ENTRIES = 100
+
+
+class Log:
+    """Ring buffer of status messages. Has the append / insert methods of Text, so the Debugger can write into it."""
+
+    def __init__(
+        self, max_entries: int = MAX_LOG_ENTRIES, spill_path: str | None = None
+    ) -> None:
+        """
+        Args:
+            max_entries (int): number of messages kept in memory
+            spill_path (str | None): file that receives the dropped messages (and all others on close()).
+                None to forget dropped messages.
+        """
+        self.entries: deque[str] = deque(maxlen=max_entries)
+        self.end = 0  # number of messages appended so far, the index of the next message
+        self.spill: TextIO | None = (
+            open(spill_path, "w", encoding="utf-8") if spill_path else None
+        )
+
+    @property
+    def start(self) -> int:
+        """Index of the oldest message that is still kept"""
+        return self.end - len(self.entries)
+
+    def append(self, message: str) -> None:
+        """Adds a message
+
+        Args:
+            message (str): message to add
+        """
+        if len(self.entries) == self.entries.maxlen and self.spill is not None:
+            self.spill.write(self.entries[0])
+        self.entries.append(message)
+        self.end += 1
+
+    def insert(self, index, message: str) -> None:
+        """Adds a message. Messages can only be added at the end, index is ignored."""
+        self.append(message)
+
+    def get(self, start: int, stop: int) -> list[str]:
+        """Messages with the indices start to stop - 1, as far as they are still kept
+
+        Args:
+            start (int): index of the first message
+            stop (int): index after the last message
+
+        Returns:
+            list[str]: messages
+        """
+        offset = self.start
+        return list(
+            islice(self.entries, max(start - offset, 0), max(stop - offset, 0))
+        )
+
+    def close(self) -> None:
+        """Writes the kept messages to the spill file and closes it"""
+        if self.spill is not None:
+            self.spill.writelines(self.entries)
+            self.spill.close()
+            self.spill = None
+
+
+class StatusLog(Log):
+    """Log that shows a window of at most view_entries messages in a text field"""
+
+    def __init__(
+        self,
+        text: Text,
+        scrollbar: tk.Scrollbar,
+        max_entries: int = MAX_LOG_ENTRIES,
+        spill_path: str | None = None,
+        view_entries: int = VIEW_ENTRIES,
+    ) -> None:
+        """
+        Args:
+            text (Text): text field that shows the messages
+            scrollbar (tk.Scrollbar): vertical scrollbar of the text field
+            max_entries (int): number of messages kept in memory
+            spill_path (str | None): file that receives the dropped messages
+            view_entries (int): maximum number of messages in the text field
+        """
+        Log.__init__(self, max_entries, spill_path)
+        self.text = text
+        self.scrollbar = scrollbar
+        self.view_entries = view_entries
+        # the text field shows the messages shown_start to shown_end - 1, shown_lengths holds their lengths
+        self.shown_start = 0
+        self.shown_end = 0
+        self.shown_lengths: deque[int] = deque()
+        # new messages are shown as they come, as long as the text field is scrolled to the bottom.
+        # Otherwise they are loaded once the user scrolls down again.
+        self.following = True
+        self.flush_id: str | None = None
+        self.page_id: str | None = None
+        self.text.configure(yscrollcommand=self.on_scroll)
+
+    def append(self, message: str) -> None:
+        """Adds a message, it is shown in the next idle round of Tk"""
+        Log.append(self, message)
+        if self.following and self.flush_id is None:
+            self.flush_id = self.text.after_idle(self.flush)
+
+    def flush(self) -> None:
+        """Shows the messages that were added since the last flush"""
+        self.flush_id = None
+        if not self.following:
+            return
+        if self.end - self.shown_end > self.view_entries:
+            # too many new messages, only the newest ones are shown
+            self.show(self.end - self.view_entries)
+        else:
+            self.show_newer(self.end)
+        self.text.see(tk.END)
+
+    def show(self, start: int) -> None:
+        """Replaces the content of the text field with the messages from start on
+
+        Args:
+            start (int): index of the first message to show
+        """
+        start = max(start, self.start)
+        messages = self.get(start, start + self.view_entries)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "".join(messages))
+        self.shown_start = start
+        self.shown_end = start + len(messages)
+        self.shown_lengths = deque(len(message) for message in messages)
+
+    def show_newer(self, stop: int) -> None:
+        """Adds the messages up to stop - 1 at the bottom of the text field and removes old ones at the top
+
+        Args:
+            stop (int): index after the last message to show
+        """
+        if self.shown_end < self.start:
+            self.show(self.start)
+            return
+        messages = self.get(self.shown_end, stop)
+        self.text.insert(tk.END, "".join(messages))
+        self.shown_end += len(messages)
+        self.shown_lengths.extend(len(message) for message in messages)
+        remove = 0
+        while len(self.shown_lengths) > self.view_entries:
+            remove += self.shown_lengths.popleft()
+            self.shown_start += 1
+        if remove:
+            self.text.delete("1.0", f"1.0 + {remove} chars")
+
+    def show_older(self, start: int) -> None:
+        """Adds the messages from start on at the top of the text field and removes new ones at the bottom
+
+        Args:
+            start (int): index of the first message to show
+        """
+        start = max(start, self.start)
+        messages = self.get(start, self.shown_start)
+        inserted = "".join(messages)
+        self.text.insert("1.0", inserted)
+        self.shown_start -= len(messages)
+        self.shown_lengths.extendleft(len(message) for message in reversed(messages))
+        remove = 0
+        while len(self.shown_lengths) > self.view_entries:
+            remove += self.shown_lengths.pop()
+            self.shown_end -= 1
+        if remove:
+            self.text.delete(f"end - 1 chars - {remove} chars", "end - 1 chars")
+        # keep the line that was at the top in view
+        self.text.yview(f"1.0 + {len(inserted)} chars")
+
+    def on_scroll(self, first: str, last: str) -> None:
+        """yscrollcommand of the text field: loads the neighbouring messages at the top / bottom"""
+        self.scrollbar.set(first, last)
+        self.following = float(last) >= 1.0
+        if self.page_id is not None:
+            return
+        if float(first) <= 0.0 and self.shown_start > self.start:
+            self.page_id = self.text.after_idle(self.page, -1)
+        elif self.following and self.shown_end < self.end:
+            self.page_id = self.text.after_idle(self.page, 1)
+
+    def page(self, direction: int) -> None:
+        """Loads PAGE_ENTRIES older (direction -1) or newer (direction 1) messages"""
+        self.page_id = None
+        if direction < 0:
+            self.show_older(self.shown_start - PAGE_ENTRIES)
+        elif self.end - self.shown_end > self.view_entries:
+            self.show(self.end - self.view_entries)
+        else:
+            self.show_newer(self.shown_end + PAGE_ENTRIES)
+
+    def close(self) -> None:
+        """Stops showing messages and closes the spill file"""
+        for after_id in (self.flush_id, self.page_id):
+            if after_id is not None:
+                self.text.after_cancel(after_id)
+        Log.close(self)
@@ -0,0 +1,39 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import os
+import tempfile
+from StatusLog import Log
+
+
+class TestLog(unittest.TestCase):
+    def test_ring_buffer(self):
+        """Only the newest messages are kept, their indices keep counting"""
+        log = Log(max_entries=5)
+        for i in range(12):
+            log.append(f"{i}\n")
+        log.insert("end", "12\n")
+        self.assertEqual((log.start, log.end), (8, 13))
+        self.assertEqual(log.get(10, 12), ["10\n", "11\n"])
+        self.assertEqual(log.get(0, 10), ["8\n", "9\n"])
+        self.assertEqual(log.get(12, 20), ["12\n"])
+        self.assertEqual(log.get(0, 3), [])
+
+    def test_spill(self):
+        """Dropped messages go to the spill file, the kept ones follow on close"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "status.log")
+            log = Log(max_entries=3, spill_path=path)
+            for i in range(10):
+                log.append(f"{i}\n")
+            log.close()
+            log.close()
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(file.read(), "".join(f"{i}\n" for i in range(10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
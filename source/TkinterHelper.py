@@ -75,8 +75,8 @@ def highlight_line(
 
 class Text(tk.Text):
     """
-    A subclass to tk.Text that has two additional methods:
-    'highlight_line' and 'append'
+    A subclass to tk.Text that has three additional methods:
+    'highlight_line', 'mark_breakpoint' and 'append'
     """
 
     def __init__(self, master, *args, **kwargs):
@@ -100,6 +100,20 @@ class Text(tk.Text):
         # Scroll to ensure the line is visible at the top
         self.yview_moveto((current_line - 1) / int(self.index("end-1c").split(".")[0]))
 
+    def mark_breakpoint(self, line: int, marked: bool):
+        """Shows or hides the breakpoint mark of a line. The highlighted line is drawn above the mark.
+
+        Parameters:
+        line (int): The line number to mark
+        marked (bool): True to show the mark, False to remove it
+        """
+        if marked:
+            self.tag_add("breakpoint", f"{line}.0", f"{line}.end")
+            self.tag_config("breakpoint", background="tomato", font=FONT)
+            self.tag_lower("breakpoint")
+        else:
+            self.tag_remove("breakpoint", f"{line}.0", f"{line}.end")
+
     def append(self, message: str):
         """Inserts the message at the End of the Text. Then Scrolls down to the end
 
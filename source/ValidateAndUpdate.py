@@ -3,7 +3,7 @@
 # License: MIT (view License.txt)
 # inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
 
-
+from typing import Iterable
 from Assembler import (
     Assembler,
     MAX_REGISTER_SIZE,
@@ -125,7 +125,9 @@ def validate_value_entries(
             continue
 
         def update_memory_cell(value):
-            assembler.s[cell_key] = value
+            # empty cells read as 0, don't write them if the value is unchanged
+            if assembler.s.get(cell_key, 0) != value:
+                assembler.s[cell_key] = value
 
         validate_and_update(
             entry_pair[0],
@@ -219,7 +221,7 @@ def validate_binary_value_entries(
         decimal_value = validate_and_convert(
             value, MAX_MEMORY_CELL_SIZE, f"Memory cell at key {key}"
         )
-        if decimal_value is not None:
+        if decimal_value is not None and assembler.s.get(key, 0) != decimal_value:
             assembler.s[key] = decimal_value
     return assembler
 
@@ -238,33 +240,44 @@ def validate_select_entries(
         except ValueError:
             showerror(
                 "Input Error",
-                f"The string '{select.get()}' inside memory trace '{i}' is invalid.{RESET}",
+                f"The string '{select.get()}' inside the address of memory row '{i}' is invalid.{RESET}",
             )
             select.set("0")
         if key < 0:
             showerror(
                 "Input Error",
-                f"The number '{select.get()}' inside memory trace '{i}' is negative and invalid.{RESET}",
+                f"The number '{select.get()}' inside the address of memory row '{i}' is negative and invalid.{RESET}",
             )
             select.set("0")
         if key > 2**MAX_MEMORY_ADDRESS:
             showerror(
                 "Input Error",
-                f"The number '{select.get()}' inside memory trace '{i}' is higher than MAX_MEMORY_ADDRESS={2 ** MAX_MEMORY_ADDRESS} and invalid.{RESET}",
+                f"The number '{select.get()}' inside the address of memory row '{i}' is higher than MAX_MEMORY_ADDRESS={2 ** MAX_MEMORY_ADDRESS} and invalid.{RESET}",
             )
             select.set("0")
     return memory_cell_entries
 
 
 def update_register_entries(
-    register_entries: dict[str, tuple[Entry, Entry]], assembler: Assembler
+    register_entries: dict[str, tuple[Entry, Entry]],
+    assembler: Assembler,
+    registers: Iterable[str] | None = None,
 ) -> dict[str, tuple[Entry, Entry]]:
     """Updates the register entries (both decimal and binary) to reflect the  current state of the Assembler
 
+    Args:
+        registers (Iterable[str] | None): member variables of the registers that changed. None updates all entries.
+
     Returns:
         dict[str, (Entry, Entry)]: Updated the register entries
     """
-    for register, entry_pair in register_entries.items():
+    if registers is None:
+        names = register_entries.keys()
+    else:
+        registers = set(registers)
+        names = [name for name, key in REGISTERS.items() if key in registers]
+    for register in names:
+        entry_pair = register_entries[register]
         # Extract the internal name of the register and get the attribute
         key = REGISTERS[register]
         value = getattr(assembler, key)
@@ -277,29 +290,3 @@ def update_register_entries(
         entry_pair[1].set(str(value_binary))
 
     return register_entries
-
-
-def update_memory_entries(
-    memory_cell_entries: dict[Entry, tuple[Entry, Entry]], assembler: Assembler
-) -> dict[Entry, tuple[Entry, Entry]]:
-    """Updates the memory entries (both decimal and binary) to reflect the current state of the Assembler
-
-    Returns:
-        dict[Entry, tuple[Entry, Entry]]: updated memory entries
-    """
-    memory_cell_entries = validate_select_entries(
-        memory_cell_entries
-    )  # To ensure that key = int(select.get()) is valid
-    for select, entry_pair in memory_cell_entries.items():
-        # Extract which memory cell is selected and get the attribute
-        key = int(select.get())
-        value = assembler.s.get(key, 0)
-
-        # Convert value into binary representation (as Two's complement)
-        mask = (1 << MAX_MEMORY_CELL_SIZE) - 1
-        value_binary = "{:0{}b}".format(value & mask, MAX_MEMORY_CELL_SIZE)
-
-        entry_pair[0].set(str(value))
-        entry_pair[1].set(str(value_binary))
-
-    return memory_cell_entries
@@ -0,0 +1,201 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+# Memory watchpoints of the Debugger: "stop when M[4711] changes" or "stop when anything in M[1000] to M[1999] is
+# read". Every instruction reads and writes the memory through PagedMemory.get and PagedMemory.__setitem__, so
+# the watchpoints hook into the memory instead of every single instruction of the Assembler (see Memory.py).
+# The Debugger sets PagedMemory.watch only while an instruction is computed and only if there are watchpoints,
+# so accesses of the GUI, the status messages and runs without watchpoints pay nothing but one test for None.
+# The watched addresses of reads and of writes are each merged into sorted, disjoint intervals. An access is
+# looked up with a range test and a binary search over the interval starts, independent of the interval sizes.
+# A write is a hit if it changes the value of the cell, a read is always a hit. Hits are collected during the
+# instruction, the Debugger pauses after it and reports them.
+
+from bisect import bisect_right
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Watchpoint:
+    start: int  # first watched address
+    stop: int  # first address after the watched cells
+    read: bool  # reads of the cells are hits
+    write: bool  # writes that change the value of a cell are hits
+
+    def __str__(self) -> str:
+        if self.read and self.write:
+            kinds = "reads and changes"
+        else:
+            kinds = "reads" if self.read else "changes"
+        if self.stop - self.start == 1:
+            return f"M[{self.start}] ({kinds})"
+        return f"M[{self.start}] to M[{self.stop - 1}] ({kinds})"
+
+
+@dataclass
+class Hit:
+    address: int  # address of the cell
+    kind: str  # "read" or "write"
+    old: object  # value before the access
+    new: object  # value after the access, the same as old for reads
+
+    def __str__(self) -> str:
+        if self.kind == "read":
+            return f"read M[{self.address}] = {self.new}"
+        return f"changed M[{self.address}] from {self.old} to {self.new}"
+
+
+class IntervalIndex:
+    """Sorted, disjoint address intervals with a fast test whether an address lies in one of them"""
+
+    def __init__(self, intervals: list[tuple[int, int]] = ()) -> None:
+        """
+        Args:
+            intervals (list[tuple[int, int]]): (start, stop) of the intervals, they may overlap
+        """
+        self.starts: list[int] = []
+        self.stops: list[int] = []
+        for start, stop in sorted(intervals):
+            if self.stops and start <= self.stops[-1]:
+                self.stops[-1] = max(self.stops[-1], stop)
+            else:
+                self.starts.append(start)
+                self.stops.append(stop)
+        # the range of all intervals, most accesses are rejected by this test alone
+        self.low = self.starts[0] if self.starts else 0
+        self.high = self.stops[-1] if self.stops else 0
+
+    def __contains__(self, address) -> bool:
+        try:
+            if not self.low <= address < self.high:
+                return False
+        except TypeError:
+            return False  # no address, the memory raises the error itself
+        return address < self.stops[bisect_right(self.starts, address) - 1]
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+
+class Watchpoints:
+    """Watchpoints of a Debugger and the hits of the instruction that is computed"""
+
+    def __init__(self) -> None:
+        self.watchpoints: list[Watchpoint] = []
+        self.reads = IntervalIndex()
+        self.writes = IntervalIndex()
+        # (kind, address) -> hit of the current instruction. A cell that is accessed twice is reported once.
+        self.hits: dict[tuple[str, int], Hit] = dict()
+
+    def add(
+        self,
+        start: int,
+        stop: int | None = None,
+        read: bool = False,
+        write: bool = True,
+    ) -> Watchpoint:
+        """Watches the cells start to stop - 1
+
+        Args:
+            start (int): first address
+            stop (int | None): first address after the watched cells, None to watch only M[start]
+            read (bool): stop when one of the cells is read
+            write (bool): stop when the value of one of the cells changes
+
+        Raises:
+            ValueError: the interval is empty or nothing is watched
+
+        Returns:
+            Watchpoint: the new watchpoint
+        """
+        stop = start + 1 if stop is None else stop
+        if start < 0 or stop <= start:
+            raise ValueError(
+                f"The watched addresses {start} to {stop - 1} are no valid interval of memory cells.\n"
+            )
+        if not (read or write):
+            raise ValueError("A watchpoint has to watch reads, writes or both.\n")
+        watchpoint = Watchpoint(start, stop, read, write)
+        self.watchpoints.append(watchpoint)
+        self.update()
+        return watchpoint
+
+    def remove(self, watchpoint: Watchpoint) -> None:
+        self.watchpoints.remove(watchpoint)
+        self.update()
+
+    def clear(self) -> None:
+        self.watchpoints.clear()
+        self.update()
+
+    def update(self) -> None:
+        """Builds the indexes of the watched addresses again"""
+        self.reads = IntervalIndex(
+            [(w.start, w.stop) for w in self.watchpoints if w.read]
+        )
+        self.writes = IntervalIndex(
+            [(w.start, w.stop) for w in self.watchpoints if w.write]
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.watchpoints)
+
+    def read(self, address: int, value) -> None:
+        """Called by PagedMemory.get for every read while the watchpoints are enabled"""
+        if address in self.reads:
+            if ("read", address) not in self.hits:
+                self.hits[("read", address)] = Hit(address, "read", value, value)
+
+    def written(self, address: int, old, new) -> None:
+        """Called by PagedMemory.__setitem__ for every write while the watchpoints are enabled"""
+        if old != new and address in self.writes:
+            hit = self.hits.get(("write", address))
+            if hit is None:
+                self.hits[("write", address)] = Hit(address, "write", old, new)
+            else:
+                hit.new = new
+
+    def watching(self, hit: Hit) -> list[Watchpoint]:
+        """Watchpoints that caught the hit"""
+        return [
+            w
+            for w in self.watchpoints
+            if w.start <= hit.address < w.stop
+            and (w.read if hit.kind == "read" else w.write)
+        ]
+
+
+def parse_watchpoint(text: str) -> tuple[int, int, bool, bool]:
+    """Reads a watchpoint the user typed in: an address or an interval of addresses (decimal or 0x hex),
+    optionally preceded by "r" (reads), "w" (changes, the default) or "rw" (both).
+    Examples: "4711", "r 1000-1999", "rw 0x10-0x1f"
+
+    Args:
+        text (str): text of the user
+
+    Raises:
+        ValueError: the text is no watchpoint
+
+    Returns:
+        tuple[int, int, bool, bool]: start, stop, read and write, the arguments of Watchpoints.add
+    """
+    words = text.split()
+    kinds = {"r": (True, False), "w": (False, True), "rw": (True, True)}
+    read, write = False, True
+    if len(words) == 2 and words[0].lower() in kinds:
+        read, write = kinds[words[0].lower()]
+        words = words[1:]
+    if len(words) != 1:
+        raise ValueError(
+            f"'{text}' is no watchpoint. Enter an address or an interval like 1000-1999, "
+            f"optionally preceded by r (reads), w (changes) or rw (both).\n"
+        )
+    first, _, last = words[0].partition("-")
+    try:
+        start = int(first, 0)
+        stop = int(last or first, 0) + 1
+    except ValueError:
+        raise ValueError(f"'{words[0]}' is no address or interval of addresses.\n")
+    return (start, stop, read, write)
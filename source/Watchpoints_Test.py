@@ -0,0 +1,66 @@
+# Project: Reti Debugger
+# Author: Robin Sonner
+# License: MIT (view License.txt)
+# inspired by the lectures "Technische Informatik" and "Betriebssysteme" at Albert-Ludwig Universität, Freiburg
+
+import unittest
+import random
+from Memory import PagedMemory
+from Watchpoints import IntervalIndex, Watchpoints, parse_watchpoint
+
+
+class TestWatchpoints(unittest.TestCase):
+    def test_interval_index(self):
+        """The index contains exactly the addresses of the intervals, also if they overlap"""
+        random.seed(4)
+        for _ in range(200):
+            intervals = []
+            for _ in range(random.randint(0, 6)):
+                start = random.randint(0, 100)
+                intervals.append((start, start + random.randint(1, 20)))
+            index = IntervalIndex(intervals)
+            for address in range(-5, 130):
+                expected = any(start <= address < stop for start, stop in intervals)
+                self.assertEqual(address in index, expected)
+        self.assertNotIn(None, IntervalIndex([(0, 10)]))
+
+    def test_memory(self):
+        """Reads and changing writes of watched cells are hits, the rest is not"""
+        memory = PagedMemory({5: 1, 1500: 9})
+        watchpoints = Watchpoints()
+        watchpoints.add(5)
+        watchpoints.add(1000, 2000, read=True, write=False)
+        memory.watch = watchpoints
+        memory[5] = 1  # same value
+        memory[6] = 3
+        memory.get(999, 0)
+        self.assertEqual(watchpoints.hits, dict())
+
+        memory[5] = 2
+        memory[5] = 4
+        self.assertEqual(memory.get(1500, 0), 9)
+        memory.get(1700, 0)
+        memory.get(1700, 0)
+        self.assertEqual(
+            [str(hit) for hit in watchpoints.hits.values()],
+            ["changed M[5] from 1 to 4", "read M[1500] = 9", "read M[1700] = 0"],
+        )
+        self.assertEqual(
+            [str(w) for w in watchpoints.watching(watchpoints.hits[("read", 1700)])],
+            ["M[1000] to M[1999] (reads)"],
+        )
+        self.assertIsNone(memory.copy().watch)
+
+    def test_parse(self):
+        self.assertEqual(parse_watchpoint("4711"), (4711, 4712, False, True))
+        self.assertEqual(parse_watchpoint("r 1000-1999"), (1000, 2000, True, False))
+        self.assertEqual(parse_watchpoint("RW 0x10-0x1f"), (16, 32, True, True))
+        for text in ("", "x 5", "5 6", "a-b"):
+            with self.assertRaises(ValueError):
+                parse_watchpoint(text)
+        with self.assertRaises(ValueError):
+            Watchpoints().add(10, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()